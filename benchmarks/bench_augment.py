@@ -0,0 +1,154 @@
+"""
+Benchmark: chained vs fused geometric augmentation
+
+Usage:
+    python -m benchmarks.bench_augment [--size 1920x1080] [--count 50] [--boxes 20]
+                                       [--multiplier 10]
+
+Renders the same random variants (scale, rotation, crop and flips) of a
+synthetic image twice: once resampling after every operation, once through
+the single composed warp of transforms.apply_geometry. Reports the time per
+variant and the peak image memory allocated per variant (NumPy reports OpenCV's
+output arrays to tracemalloc).
+
+Then writes --multiplier variants with all operations of one JPEG source,
+decoding it for every variant and encoding serially, against
+engine.augment_file (one decode, reused buffers, encode threads).
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from src.modules.augmentation.engine import augment_file, get_workspace
+from src.modules.augmentation.image_io import read_image, write_image, variant_name
+from src.modules.augmentation.transforms import (OPS, GEOMETRIC_OPS, OP_CROP, OP_HFLIP, OP_VFLIP,
+                                                 FILL_VALUE, variant_rng, sample_params,
+                                                 geometry_steps, geometry_matrix, apply_geometry,
+                                                 transform_boxes, augment, _pixel_matrix)
+from src.modules.sampling.label_store import parse_label_text
+from src.modules.sampling.tiling import format_label_rows
+
+
+def chained(image, rows, params):
+    """Reference: one resampling (or copy) per operation, boxes mapped step by step"""
+    height, width = image.shape[:2]
+    for op, matrix, w, h in geometry_steps(params, width, height):
+        if op == OP_CROP:
+            x0, y0 = int(-matrix[0, 2]), int(-matrix[1, 2])
+            image = image[y0:y0 + h, x0:x0 + w]
+        elif op == OP_HFLIP:
+            image = cv2.flip(image, 1)
+        elif op == OP_VFLIP:
+            image = cv2.flip(image, 0)
+        else:
+            image = cv2.warpAffine(image, _pixel_matrix(matrix), (w, h), flags=cv2.INTER_LINEAR,
+                                   borderMode=cv2.BORDER_CONSTANT, borderValue=FILL_VALUE)
+        step = np.vstack([matrix, (0, 0, 1)])
+        rows, _ = transform_boxes(rows, step, width, height, w, h, min_visibility=0.0)
+        width, height = w, h
+    return image, rows
+
+
+def fused(image, rows, params):
+    height, width = image.shape[:2]
+    matrix, w, h = geometry_matrix(params, width, height)
+    rows, _ = transform_boxes(rows, matrix, width, height, w, h, min_visibility=0.0)
+    return apply_geometry(image, matrix, w, h), rows
+
+
+def measure(render, image, rows, variants):
+    """Return (seconds per variant, peak bytes allocated per variant)"""
+    start = time.perf_counter()
+    for params in variants:
+        render(image, rows, params)
+    elapsed = (time.perf_counter() - start) / len(variants)
+
+    peaks = []
+    for params in variants[:10]:
+        tracemalloc.start()
+        render(image, rows, params)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return elapsed, sum(peaks) / len(peaks)
+
+
+def per_variant_decode(image_path, label_path, out_dir, multiplier):
+    """Reference: decode, render into new arrays and encode once per variant"""
+    for variant in range(multiplier):
+        image = read_image(image_path)
+        with open(label_path, 'r', encoding='utf-8') as f:
+            rows = parse_label_text(f.read())
+        params = sample_params(OPS, variant_rng(0, 'source.jpg', variant))
+        out_image, out_rows, _ = augment(image, rows, params)
+        name = variant_name('source', variant)
+        write_image(out_image, '.jpg', os.path.join(out_dir, name + '.jpg'))
+        with open(os.path.join(out_dir, name + '.txt'), 'w', encoding='utf-8') as f:
+            f.write(format_label_rows(out_rows))
+
+
+def decode_once(image_path, label_path, out_dir, multiplier):
+    augment_file(image_path, label_path, out_dir, out_dir, 'source.jpg', OPS, multiplier, 0)
+
+
+def time_sources(func, args, repeat=5):
+    func(*args)  # warm up (creates the workspace and its buffers)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(*args)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', default='1920x1080', help="Image size WIDTHxHEIGHT")
+    parser.add_argument('--count', type=int, default=50, help="Variants rendered per method")
+    parser.add_argument('--boxes', type=int, default=20, help="Boxes per image")
+    parser.add_argument('--multiplier', type=int, default=10, help="Variants per source image")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split('x'))
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    rows = np.column_stack([rng.integers(0, 10, args.boxes), rng.uniform(0.2, 0.8, (args.boxes, 2)),
+                            rng.uniform(0.05, 0.2, (args.boxes, 2))]).astype(np.float32)
+    variants = [sample_params(GEOMETRIC_OPS, variant_rng(0, 'bench', i)) for i in range(args.count)]
+    # Both paths must render the same variants at the same output size
+    for params in variants[:5]:
+        a, b = chained(image, rows, params)[0], fused(image, rows, params)[0]
+        assert a.shape == b.shape, (a.shape, b.shape)
+
+    chained_cost, chained_bytes = measure(chained, image, rows, variants)
+    fused_cost, fused_bytes = measure(fused, image, rows, variants)
+
+    print(f"Image:          {width}x{height}, {args.boxes} boxes, {args.count} variants")
+    print(f"Chained ops:    {chained_cost * 1e3:8.2f} ms/variant, {chained_bytes / 1e6:6.1f} MB")
+    print(f"Fused warp:     {fused_cost * 1e3:8.2f} ms/variant, {fused_bytes / 1e6:6.1f} MB")
+    print(f"Speedup:        {chained_cost / fused_cost:8.1f}x")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Smooth content so the JPEG source is a realistic size
+        source = cv2.GaussianBlur(image, (0, 0), 8)
+        image_path, label_path = os.path.join(tmp, 'source.jpg'), os.path.join(tmp, 'source.txt')
+        write_image(source, '.jpg', image_path)
+        with open(label_path, 'w', encoding='utf-8') as f:
+            f.write(format_label_rows(rows))
+        decode_cost = time_sources(read_image, (image_path,))
+        job = (image_path, label_path, tmp, args.multiplier)
+        naive_cost = time_sources(per_variant_decode, job)
+        pipeline_cost = time_sources(decode_once, job)
+        get_workspace().executor.shutdown()
+
+    print(f"Source decode:  {decode_cost * 1e3:8.2f} ms")
+    print(f"{args.multiplier} variants, decode per variant: {naive_cost * 1e3:8.1f} ms/source")
+    print(f"{args.multiplier} variants, decode once:        {pipeline_cost * 1e3:8.1f} ms/source")
+    print(f"Speedup:        {naive_cost / pipeline_cost:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
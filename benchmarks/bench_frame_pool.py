@@ -0,0 +1,79 @@
+"""
+Benchmark: handing decoded frames to worker processes by pickling vs shared-memory slots
+
+Usage:
+    python -m benchmarks.bench_frame_pool [--size 3840x2160] [--tasks 64] [--workers 2]
+
+Every task reads one tile from a full frame, as the tiling and augmentation
+workers do. The pickled path sends the frame with each task (what a pool of
+workers sharing a decoded image would otherwise need); the frame pool path
+fills one slot per frame in a worker and sends only the slot reference.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import numpy as np
+
+from src.modules.sampling.analysis import pool_context
+from src.utils.frame_pool import FramePool, slot_array
+
+
+def tile_sum(frame, x0, y0):
+    return int(frame[y0:y0 + 640, x0:x0 + 640].sum(dtype=np.uint64))
+
+
+def tile_sum_slot(ref, shape, x0, y0):
+    return tile_sum(slot_array(ref, shape), x0, y0)
+
+
+def fill_slot(ref, shape, seed):
+    frame = slot_array(ref, shape)
+    frame[...] = np.random.default_rng(seed).integers(0, 256, shape, dtype=np.uint8)
+    return shape
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', default='3840x2160', help="Frame size WIDTHxHEIGHT")
+    parser.add_argument('--tasks', type=int, default=64, help="Tile tasks per frame")
+    parser.add_argument('--workers', type=int, default=min(os.cpu_count() or 1, 4),
+                        help="Worker processes")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split('x'))
+    shape = (height, width, 3)
+    rng = np.random.default_rng(1)
+    origins = [(int(rng.integers(0, width - 640)), int(rng.integers(0, height - 640)))
+               for _ in range(args.tasks)]
+    frame = np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8)
+
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=pool_context()) as executor:
+        wait([executor.submit(tile_sum, frame, 0, 0) for _ in range(args.workers)])  # warm up
+        start = time.perf_counter()
+        expected = [f.result() for f in [executor.submit(tile_sum, frame, x0, y0)
+                                         for x0, y0 in origins]]
+        pickled_cost = (time.perf_counter() - start) / args.tasks
+
+    with FramePool(args.workers, mp_context=pool_context()) as pool:
+        ref = pool.acquire(frame.nbytes)
+        pool.submit(ref, fill_slot, shape, 0).result()
+        wait([pool.submit(ref, tile_sum_slot, shape, 0, 0) for _ in range(args.workers)])
+        start = time.perf_counter()
+        results = [f.result() for f in [pool.submit(ref, tile_sum_slot, shape, x0, y0)
+                                        for x0, y0 in origins]]
+        slot_cost = (time.perf_counter() - start) / args.tasks
+        pool.release(ref)
+    assert results == expected
+
+    print(f"Frame:          {width}x{height} ({frame.nbytes / 1e6:.1f} MB), {args.tasks} tile tasks, "
+          f"{args.workers} worker(s)")
+    print(f"Pickled frame:  {pickled_cost * 1e3:8.2f} ms/task")
+    print(f"Frame slot:     {slot_cost * 1e3:8.2f} ms/task")
+    print(f"Speedup:        {pickled_cost / slot_cost:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
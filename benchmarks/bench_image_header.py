@@ -0,0 +1,83 @@
+"""
+Benchmark: header-only dimension probe vs PIL.Image.open
+
+Usage:
+    python -m benchmarks.bench_image_header [folder] [--count N]
+
+Without a folder, a temporary set of JPEG/PNG/BMP/TIFF files is generated.
+Reports the per-file cost of both paths on the same files.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from PIL import Image
+
+from src.utils.file_utils import IMAGE_EXTENSIONS
+from src.utils.image_header import read_image_size
+
+
+def make_samples(folder, count):
+    """Write count small images cycling through the supported formats"""
+    formats = [('JPEG', '.jpg'), ('PNG', '.png'), ('BMP', '.bmp'), ('TIFF', '.tif')]
+    image = Image.new('RGB', (1920, 1080), (40, 80, 120))
+    for fmt, ext in formats:
+        image.save(os.path.join(folder, f"template{ext}"), fmt)
+    paths = []
+    for i in range(count):
+        _, ext = formats[i % len(formats)]
+        path = os.path.join(folder, f"frame_{i:06d}{ext}")
+        with open(os.path.join(folder, f"template{ext}"), 'rb') as src, open(path, 'wb') as dst:
+            dst.write(src.read())
+        paths.append(path)
+    return paths
+
+
+def pil_size(path):
+    with Image.open(path) as img:
+        return img.width, img.height
+
+
+def time_per_file(func, paths):
+    start = time.perf_counter()
+    for path in paths:
+        func(path)
+    return (time.perf_counter() - start) / len(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('folder', nargs='?', help="Folder of images to probe")
+    parser.add_argument('--count', type=int, default=2000, help="Files to generate without a folder")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.folder:
+            paths = [os.path.join(args.folder, f) for f in os.listdir(args.folder)
+                     if os.path.splitext(f)[1].lower() in IMAGE_EXTENSIONS]
+        else:
+            paths = make_samples(tmp, args.count)
+
+        if not paths:
+            print("No images found")
+            return
+
+        # Warm the page cache so both paths measure parsing, not disk reads
+        for path in paths:
+            read_image_size(path)
+
+        mismatches = sum(1 for path in paths if read_image_size(path) != pil_size(path))
+        pil_cost = time_per_file(pil_size, paths)
+        header_cost = time_per_file(read_image_size, paths)
+
+        print(f"Files:           {len(paths)}")
+        print(f"PIL.Image.open:  {pil_cost * 1e6:8.1f} us/file")
+        print(f"read_image_size: {header_cost * 1e6:8.1f} us/file")
+        print(f"Speedup:         {pil_cost / header_cost:8.1f}x")
+        print(f"Mismatches:      {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: random sample reads from loose files vs a packed dataset
+
+Usage:
+    python -m benchmarks.bench_packed [folder] [--count N]
+
+The folder is a Standard images/labels dataset; without one, a temporary
+dataset of small JPEG frames is generated. Both paths return the encoded
+image bytes and parsed boxes of the same randomly ordered samples.
+"""
+
+import argparse
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from src.modules.sampling.dataset_index import DatasetIndex
+from src.modules.sampling.label_store import parse_label_text
+from src.modules.sampling.standard import collect_tree_pairs
+from src.utils.packed import PackedDataset, write_packed
+
+
+def make_samples(folder, count):
+    """Write count JPEG frames with one-box labels under images/ and labels/"""
+    os.makedirs(os.path.join(folder, 'images'))
+    os.makedirs(os.path.join(folder, 'labels'))
+    buffer = io.BytesIO()
+    Image.new('RGB', (640, 480), (40, 80, 120)).save(buffer, 'JPEG')
+    data = buffer.getvalue()
+    for i in range(count):
+        with open(os.path.join(folder, 'images', f"frame_{i:06d}.jpg"), 'wb') as f:
+            f.write(data)
+        with open(os.path.join(folder, 'labels', f"frame_{i:06d}.txt"), 'w') as f:
+            f.write(f"{i % 5} 0.5 0.5 0.1 0.2\n")
+
+
+def read_loose(pair):
+    with open(pair['image'], 'rb') as f:
+        image = f.read()
+    with open(pair['label'], 'r', encoding='utf-8') as f:
+        return image, parse_label_text(f.read())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('folder', nargs='?', help="Standard dataset to read")
+    parser.add_argument('--count', type=int, default=5000, help="Frames to generate without a folder")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset = args.folder or os.path.join(tmp, 'dataset')
+        if not args.folder:
+            make_samples(dataset, args.count)
+
+        index = DatasetIndex(dataset)
+        try:
+            table = collect_tree_pairs(dataset, index)
+        finally:
+            index.close()
+        pairs = table.pairs(range(len(table)))
+        if not pairs:
+            print("No image/label pairs found")
+            return
+
+        packed = os.path.join(tmp, 'packed')
+        os.makedirs(packed)
+        write_packed([(str(i), pair['image'], pair['label']) for i, pair in enumerate(pairs)],
+                     packed, parse_label_text)
+        order = np.random.default_rng(0).permutation(len(pairs)).tolist()
+
+        # Warm the page cache so both paths measure lookups, not disk reads
+        for pair in pairs:
+            read_loose(pair)
+
+        start = time.perf_counter()
+        for i in order:
+            read_loose(pairs[i])
+        loose_cost = (time.perf_counter() - start) / len(order)
+
+        start = time.perf_counter()
+        with PackedDataset(packed) as ds:
+            open_cost = time.perf_counter() - start
+            start = time.perf_counter()
+            for i in order:
+                image, boxes = ds[i]
+                image.tobytes()
+            packed_cost = (time.perf_counter() - start) / len(order)
+
+        print(f"Samples:        {len(pairs)}")
+        print(f"Packed open:    {open_cost * 1e3:8.2f} ms")
+        print(f"Loose files:    {loose_cost * 1e6:8.1f} us/sample")
+        print(f"Packed dataset: {packed_cost * 1e6:8.1f} us/sample")
+        print(f"Speedup:        {loose_cost / packed_cost:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Check: sampling datasets whose folders share frame names writes one file per pair
+
+Usage:
+    python -m benchmarks.check_output_names [--folders 6] [--frames 40] [--size 170]
+
+Builds a synthetic dataset in a temporary folder in which every video
+folder numbers its frames from f0000 (plus a frame whose own name equals a
+folder-prefixed one), then runs the Video Frame, String folder and Standard
+sampling jobs in copy, hardlink and symlink mode. Every run must leave as
+many images and labels on disk as the pairs it reports, and every output
+image must sit next to the label of the same source pair. Exits with status
+1 on the first mismatch.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+from src.utils.materialize import MODE_COPY, MODE_HARDLINK, MODE_SYMLINK
+from src.modules.sampling.engine import run_sampling, output_folders
+from src.modules.sampling.string_folder import run_string_folder_sampling
+from src.modules.sampling.standard import run_standard_sampling, METHOD_ALL
+
+MODES = (MODE_COPY, MODE_HARDLINK, MODE_SYMLINK)
+
+
+def write_pair(image_path, label_path, pair_id):
+    """Image bytes and label class both carry pair_id, so mixed-up outputs show"""
+    with open(image_path, 'w', encoding='utf-8') as f:
+        f.write(str(pair_id))
+    with open(label_path, 'w', encoding='utf-8') as f:
+        f.write(f"{pair_id} 0.5 0.5 0.1 0.1\n")
+
+
+def make_video_dataset(root, folders, frames):
+    """folders x frames pairs named f0000.jpg, ... in every folder; returns the pair count"""
+    pair_id = 0
+    for f in range(folders):
+        frames_dir = os.path.join(root, f"video_{f}", 'frames')
+        labels_dir = os.path.join(root, f"video_{f}", 'labels')
+        os.makedirs(frames_dir)
+        os.makedirs(labels_dir)
+        stems = [f"f{i:04d}" for i in range(frames)]
+        if f == 1:
+            stems.append('video_0_f0000')  # the name video_0/f0000 gets once prefixed
+        for stem in stems:
+            write_pair(os.path.join(frames_dir, stem + '.jpg'),
+                       os.path.join(labels_dir, stem + '.txt'), pair_id)
+            pair_id += 1
+    return pair_id
+
+
+def make_tree_dataset(root, frames):
+    """images/{train,val} + labels/{train,val} sharing their file names; returns the pair count"""
+    pair_id = 0
+    for split in ('train', 'val'):
+        images_dir = os.path.join(root, 'images', split)
+        labels_dir = os.path.join(root, 'labels', split)
+        os.makedirs(images_dir)
+        os.makedirs(labels_dir)
+        for i in range(frames):
+            write_pair(os.path.join(images_dir, f"{i:04d}.jpg"),
+                       os.path.join(labels_dir, f"{i:04d}.txt"), pair_id)
+            pair_id += 1
+    return pair_id
+
+
+def check_output(output_path, reported):
+    """
+    Compare the files of a job with the pairs it reported
+
+    Returns:
+        List of problems (empty if the output is consistent)
+    """
+    images_dir, labels_dir = output_folders(output_path)
+    images, labels = os.listdir(images_dir), os.listdir(labels_dir)
+    problems = []
+    if not len(images) == len(labels) == reported:
+        problems.append(f"{reported} pairs reported, {len(images)} images and "
+                        f"{len(labels)} labels on disk")
+    ids = set()
+    for name in images:
+        with open(os.path.join(images_dir, name), 'r', encoding='utf-8') as f:
+            image_id = f.read()
+        label_path = os.path.join(labels_dir, os.path.splitext(name)[0] + '.txt')
+        try:
+            with open(label_path, 'r', encoding='utf-8') as f:
+                label_id = f.read().split()[0]
+        except OSError:
+            label_id = None
+        if label_id != image_id:
+            problems.append(f"{name}: image of pair {image_id} next to label of pair {label_id}")
+        ids.add(image_id)
+    if len(ids) != len(images):
+        problems.append(f"{len(images) - len(ids)} image(s) duplicate another pair")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--folders', type=int, default=6, help="Video folders")
+    parser.add_argument('--frames', type=int, default=40, help="Frames per folder")
+    parser.add_argument('--size', type=int, default=170, help="Pairs sampled per job")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the dataset indexes of the synthetic datasets out of the user cache
+        os.environ['XDG_CACHE_HOME'] = os.path.join(tmp, 'cache')
+        videos, tree = os.path.join(tmp, 'videos'), os.path.join(tmp, 'tree')
+        make_video_dataset(videos, args.folders, args.frames)
+        make_tree_dataset(tree, args.frames)
+
+        def quiet(message):
+            pass
+
+        jobs = {
+            'video frame': lambda out, mode: run_sampling(
+                videos, out, sample_size=args.size, mode=mode, log=quiet),
+            'string folder': lambda out, mode: run_string_folder_sampling(
+                videos, out, include='video_*', sample_size=args.size, mode=mode, log=quiet),
+            'standard': lambda out, mode: run_standard_sampling(
+                tree, out, method=METHOD_ALL, mode=mode, log=quiet),
+        }
+        failed = False
+        for name, job in jobs.items():
+            for mode in MODES:
+                output_path = os.path.join(tmp, f"out_{name.replace(' ', '_')}_{mode}")
+                reported = job(output_path, mode)
+                problems = check_output(output_path, reported)
+                status = "OK" if not problems else f"{len(problems)} problem(s)"
+                print(f"{name:14s} {mode:9s} {reported:5d} pairs: {status}")
+                for problem in problems[:5]:
+                    print(f"    {problem}")
+                failed = failed or bool(problems)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""
+AI Data Processing Tool - Command line interface
+Runs the same processing as the GUI in batch jobs, without importing Qt
+
+Usage:
+    python -m cli analyze --input DATASET [--folders A B ...]
+    python -m cli sample --input DATASET --output OUT [--size 50] [--seed 42]
+                         [--weighting inverse_frequency] [--min-per-class N] [--quota 3=50]
+    python -m cli standard --input DATASET --output OUT [--method stratified] [--size 50]
+    python -m cli strings --input ROOT --output OUT --folders 'cam0[1-3]_*' [--cap 20]
+    python -m cli tile --images IMAGES --labels LABELS --output OUT [--tile-size 640] [--overlap 128]
+    python -m cli augment --input DATASET --output OUT --ops rotate hflip noise [--multiplier 2]
+    python -m cli verify --packed OUT/packed [--count 16]
+    python -m cli verify --recipes OUT/recipes [--count 16]
+
+GitHub: https://github.com/davidvct/AI_data_processing_tool
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+
+from src.modules.sampling.engine import (run_sampling, list_video_folders, parse_class_quotas,
+                                         SamplingError, ON_EXISTING_KEEP, ON_EXISTING_DELETE,
+                                         ON_EXISTING_ABORT)
+from src.modules.sampling.samplers import WEIGHTINGS, WEIGHT_UNIFORM
+from src.utils.materialize import MODES, MODE_COPY
+from src.utils.shards import MODE_TAR
+from src.utils.packed import MODE_PACKED
+
+# Output modes: per-file placement, streaming into tar shards, or one packed dataset
+OUTPUT_MODES = MODES + (MODE_TAR, MODE_PACKED)
+
+
+def cmd_analyze(args):
+    """Analyze a Video Frame - Yolo dataset and print its statistics"""
+    # Imported lazily: analysis pulls in NumPy and PIL
+    from src.modules.sampling.analysis import analyze_dataset
+    from src.utils.file_utils import format_file_size
+
+    folders = args.folders or list_video_folders(args.input)
+    stats = analyze_dataset(args.input, folders, max_workers=args.workers)
+
+    p50, p95, p99 = stats.file_sizes.percentiles()
+    print(f"Total images: {stats.total_images}")
+    print(f"Total labels: {stats.total_labels}")
+    print(f"Video folders analyzed: {stats.folders_with_images}")
+    print(f"Image file size p50/p95/p99: {format_file_size(int(p50))} / "
+          f"{format_file_size(int(p95))} / {format_file_size(int(p99))}")
+    p50, p95, p99 = stats.annotation_counts.percentiles()
+    print(f"Annotations per file p50/p95/p99: {p50:.1f} / {p95:.1f} / {p99:.1f}")
+    print(f"Classes found: {len(stats.classes)}")
+    if stats.labels is not None:
+        for class_id, count in sorted(stats.labels.class_counts().items()):
+            print(f"  class {class_id}: {count} instance(s)")
+    return 0
+
+
+def cmd_sample(args):
+    """Sample image/label pairs from a Video Frame - Yolo dataset"""
+    run_sampling(args.input, args.output,
+                 folders=args.folders or None,
+                 sample_size=args.size,
+                 random_seed=args.seed,
+                 on_existing=args.on_existing,
+                 mode=args.mode,
+                 max_workers=args.workers,
+                 weighting=args.weighting,
+                 min_per_class=args.min_per_class,
+                 class_quotas=parse_class_quotas(','.join(args.quota or [])),
+                 dedup_distance=args.dedup_distance,
+                 shard_size=args.shard_size << 20,
+                 dry_run=args.dry_run)
+    return 0
+
+
+def cmd_standard(args):
+    """Sample image/label pairs from a Standard images/labels dataset"""
+    from src.modules.sampling.standard import run_standard_sampling
+
+    run_standard_sampling(args.input, args.output,
+                          method=args.method,
+                          sample_size=args.size,
+                          random_seed=args.seed,
+                          on_existing=args.on_existing,
+                          mode=args.mode,
+                          max_workers=args.workers,
+                          shard_size=args.shard_size << 20,
+                          dry_run=args.dry_run)
+    return 0
+
+
+def cmd_strings(args):
+    """Sample frames from folders selected by name patterns"""
+    from src.modules.sampling.string_folder import run_string_folder_sampling
+
+    run_string_folder_sampling(args.input, args.output,
+                               include=args.folders,
+                               exclude=args.exclude,
+                               frame_pattern=args.frames,
+                               syntax='regex' if args.regex else 'glob',
+                               sample_size=args.size,
+                               per_folder_cap=args.cap,
+                               random_seed=args.seed,
+                               on_existing=args.on_existing,
+                               mode=args.mode,
+                               max_workers=args.workers,
+                               shard_size=args.shard_size << 20,
+                               dry_run=args.dry_run)
+    return 0
+
+
+def cmd_tile(args):
+    """Cut large images into overlapping tiles with clipped YOLO labels"""
+    # Imported lazily: tiling pulls in NumPy and PIL
+    from src.modules.sampling.tiling import run_tiling
+
+    run_tiling(args.images, args.labels, args.output,
+               tile_size=args.tile_size,
+               overlap=args.overlap,
+               empty_policy=args.empty,
+               empty_ratio=args.empty_ratio,
+               min_visibility=args.min_visibility,
+               output_ext=args.format,
+               random_seed=args.seed,
+               on_existing=args.on_existing,
+               max_workers=args.workers)
+    return 0
+
+
+def cmd_augment(args):
+    """Write augmented variants of every image with transformed YOLO labels"""
+    # Imported lazily: augmentation pulls in NumPy and OpenCV
+    from src.modules.augmentation.engine import run_augmentation
+
+    run_augmentation(args.input, args.output, args.ops,
+                     multiplier=args.multiplier,
+                     random_seed=args.seed,
+                     min_visibility=args.min_visibility,
+                     on_existing=args.on_existing,
+                     max_workers=args.workers,
+                     output_mode=args.mode)
+    return 0
+
+
+def cmd_verify(args):
+    """Re-read samples of a packed dataset (or recipe table) and compare them with their sources"""
+    if args.recipes:
+        return _verify_recipes(args)
+    from src.modules.sampling.label_store import parse_label_text
+    from src.utils.packed import PackedDataset, verify_packed
+
+    start = time.perf_counter()
+    try:
+        with PackedDataset(args.packed) as dataset:
+            elapsed = time.perf_counter() - start
+            print(f"Opened {len(dataset)} samples, {len(dataset.boxes)} boxes "
+                  f"in {elapsed * 1000:.1f} ms")
+        checked, problems = verify_packed(args.packed, parse_label_text, count=args.count,
+                                          seed=args.seed)
+    except (OSError, ValueError) as e:
+        raise SamplingError(f"Cannot read packed dataset: {e}")
+    for problem in problems:
+        print(problem)
+    print(f"Checked {checked} sample(s): {'OK' if not problems else f'{len(problems)} problem(s)'}")
+    return 1 if problems else 0
+
+
+def _verify_recipes(args):
+    from src.modules.augmentation.recipes import verify_recipes
+
+    try:
+        checked, problems = verify_recipes(args.recipes, count=args.count, seed=args.seed)
+    except (OSError, ValueError, KeyError) as e:
+        raise SamplingError(f"Cannot read recipe table: {e}")
+    for problem in problems:
+        print(problem)
+    print(f"Checked {checked} variant(s): {'OK' if not problems else f'{len(problems)} problem(s)'}")
+    return 1 if problems else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m cli",
+                                     description="AI Data Processing Tool (command line)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    analyze = subparsers.add_parser('analyze', help="Print dataset statistics")
+    analyze.add_argument('--input', required=True, help="Folder containing video subfolders")
+    analyze.add_argument('--folders', nargs='*', help="Video subfolders to use (default: all)")
+    analyze.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    analyze.set_defaults(func=cmd_analyze)
+
+    sample = subparsers.add_parser('sample', help="Video Frame - Yolo sampling")
+    sample.add_argument('--input', required=True, help="Folder containing video subfolders")
+    sample.add_argument('--output', required=True, help="Folder receiving 'images' and 'labels'")
+    sample.add_argument('--folders', nargs='*', help="Video subfolders to use (default: all)")
+    sample.add_argument('--size', type=int, default=50, help="Number of pairs to sample")
+    sample.add_argument('--seed', type=int, default=42, help="Random seed")
+    sample.add_argument('--on-existing', default=ON_EXISTING_ABORT,
+                        choices=[ON_EXISTING_KEEP, ON_EXISTING_DELETE, ON_EXISTING_ABORT],
+                        help="What to do with files already in the output folders")
+    sample.add_argument('--mode', default=MODE_COPY, choices=OUTPUT_MODES,
+                        help="How sampled files are placed (unsupported modes fall back to copy); "
+                             "tar writes WebDataset shards to OUT/shards, packed a memory-mapped "
+                             "dataset to OUT/packed")
+    sample.add_argument('--workers', type=int, default=None, help="Threads placing files in parallel")
+    sample.add_argument('--weighting', default=WEIGHT_UNIFORM, choices=WEIGHTINGS,
+                        help="Frame weighting; inverse_frequency favours frames with rare classes")
+    sample.add_argument('--min-per-class', type=int, default=0,
+                        help="Frames required for every class before filling up by weighting")
+    sample.add_argument('--quota', action='append', metavar="CLASS=FRAMES",
+                        help="Frames required for one class (repeatable, overrides --min-per-class)")
+    sample.add_argument('--dedup-distance', type=int, default=0,
+                        help="Skip frames within this perceptual-hash Hamming distance of "
+                             "already sampled ones (0: off)")
+    sample.add_argument('--shard-size', type=int, default=1024,
+                        help="Maximum shard size in MB with --mode tar")
+    sample.add_argument('--dry-run', action='store_true',
+                        help="Only report how many pairs are left to place (an interrupted "
+                             "run of the same job resumes with --on-existing keep)")
+    sample.set_defaults(func=cmd_sample)
+
+    standard = subparsers.add_parser('standard', help="Standard images/labels sampling")
+    standard.add_argument('--input', required=True,
+                          help="Dataset folder with images/ and labels/ trees (nested splits allowed)")
+    standard.add_argument('--output', required=True, help="Folder receiving 'images' and 'labels'")
+    standard.add_argument('--method', default='random',
+                          choices=['random', 'systematic', 'stratified', 'all'],
+                          help="Random draws, evenly spaced pairs, proportional per class set, "
+                               "or every pair (--size is ignored)")
+    standard.add_argument('--size', type=int, default=50, help="Number of pairs to sample")
+    standard.add_argument('--seed', type=int, default=42, help="Random seed")
+    standard.add_argument('--on-existing', default=ON_EXISTING_ABORT,
+                          choices=[ON_EXISTING_KEEP, ON_EXISTING_DELETE, ON_EXISTING_ABORT],
+                          help="What to do with files already in the output folders")
+    standard.add_argument('--mode', default=MODE_COPY, choices=OUTPUT_MODES,
+                          help="How sampled files are placed (unsupported modes fall back to copy); "
+                               "tar writes WebDataset shards to OUT/shards, packed a memory-mapped "
+                               "dataset to OUT/packed")
+    standard.add_argument('--workers', type=int, default=None, help="Threads placing files in parallel")
+    standard.add_argument('--shard-size', type=int, default=1024,
+                          help="Maximum shard size in MB with --mode tar")
+    standard.add_argument('--dry-run', action='store_true',
+                          help="Only report how many pairs are left to place (an interrupted "
+                               "run of the same job resumes with --on-existing keep)")
+    standard.set_defaults(func=cmd_standard)
+
+    strings = subparsers.add_parser('strings', help="String folder sampling (folders chosen by pattern)")
+    strings.add_argument('--input', required=True, help="Folder containing the video folders")
+    strings.add_argument('--output', required=True, help="Folder receiving 'images' and 'labels'")
+    strings.add_argument('--folders', default='',
+                         help="Folder patterns, one per level ('site*/cam0?'), ';' between alternatives")
+    strings.add_argument('--exclude', default='', help="Folder names to skip with their subtrees")
+    strings.add_argument('--frames', default='', help="Frame file name patterns (default: all)")
+    strings.add_argument('--regex', action='store_true',
+                         help="Patterns are regular expressions, not globs")
+    strings.add_argument('--size', type=int, default=50, help="Number of pairs to sample")
+    strings.add_argument('--cap', type=int, default=0, help="Maximum pairs per folder (0: no cap)")
+    strings.add_argument('--seed', type=int, default=42, help="Random seed")
+    strings.add_argument('--on-existing', default=ON_EXISTING_ABORT,
+                         choices=[ON_EXISTING_KEEP, ON_EXISTING_DELETE, ON_EXISTING_ABORT],
+                         help="What to do with files already in the output folders")
+    strings.add_argument('--mode', default=MODE_COPY, choices=OUTPUT_MODES,
+                         help="How sampled files are placed (unsupported modes fall back to copy); "
+                              "tar writes WebDataset shards to OUT/shards, packed a memory-mapped "
+                              "dataset to OUT/packed")
+    strings.add_argument('--workers', type=int, default=None, help="Threads placing files in parallel")
+    strings.add_argument('--shard-size', type=int, default=1024,
+                         help="Maximum shard size in MB with --mode tar")
+    strings.add_argument('--dry-run', action='store_true',
+                         help="Only report how many pairs are left to place (an interrupted "
+                              "run of the same job resumes with --on-existing keep)")
+    strings.set_defaults(func=cmd_strings)
+
+    # Choices mirror src.modules.sampling.tiling, which is only imported when tiling runs
+    tile = subparsers.add_parser('tile', help="Tile large images and their YOLO labels")
+    tile.add_argument('--images', required=True, help="Folder containing the source images")
+    tile.add_argument('--labels', default='', help="Folder containing YOLO labels with the same names")
+    tile.add_argument('--output', required=True, help="Folder receiving 'images' and 'labels'")
+    tile.add_argument('--tile-size', type=int, default=640, help="Tile width and height in pixels")
+    tile.add_argument('--overlap', type=int, default=128, help="Overlap between tiles in pixels")
+    tile.add_argument('--empty', default='sample', choices=['keep', 'drop', 'sample'],
+                      help="What to do with tiles without boxes")
+    tile.add_argument('--empty-ratio', type=float, default=0.1,
+                      help="Fraction of empty tiles kept with --empty sample")
+    tile.add_argument('--min-visibility', type=float, default=0.3,
+                      help="Minimum visible fraction of a cut box to keep it")
+    tile.add_argument('--format', default='same', choices=['same', '.jpg', '.png'],
+                      help="Tile image format (default: same as the source)")
+    tile.add_argument('--seed', type=int, default=42, help="Random seed for sampled empty tiles")
+    tile.add_argument('--on-existing', default=ON_EXISTING_ABORT,
+                      choices=[ON_EXISTING_KEEP, ON_EXISTING_DELETE, ON_EXISTING_ABORT],
+                      help="What to do with files already in the output folders")
+    tile.add_argument('--workers', type=int, default=None, help="Worker processes (default: up to 4)")
+    tile.set_defaults(func=cmd_tile)
+
+    # Choices mirror src.modules.augmentation.transforms.OPS and recipes.OUTPUT_MODES
+    augment = subparsers.add_parser('augment', help="Augment images/labels with YOLO-aware transforms")
+    augment.add_argument('--input', required=True, help="Dataset with 'images' and 'labels' trees")
+    augment.add_argument('--output', required=True, help="Folder receiving 'images' and 'labels'")
+    augment.add_argument('--ops', nargs='+', required=True,
+                         choices=['scale', 'rotate', 'crop', 'hflip', 'vflip', 'brightness',
+                                  'contrast', 'color_jitter', 'blur', 'noise'],
+                         help="Augmentations applied to every variant")
+    augment.add_argument('--multiplier', type=int, default=2, help="Variants per source image")
+    augment.add_argument('--seed', type=int, default=42, help="Random seed for reproducible variants")
+    augment.add_argument('--min-visibility', type=float, default=0.3,
+                         help="Minimum visible fraction of a cut box to keep it")
+    augment.add_argument('--on-existing', default=ON_EXISTING_ABORT,
+                         choices=[ON_EXISTING_KEEP, ON_EXISTING_DELETE, ON_EXISTING_ABORT],
+                         help="What to do with files already in the output folders")
+    augment.add_argument('--workers', type=int, default=None,
+                         help="Worker processes (default: CPU count)")
+    augment.add_argument('--mode', default='images', choices=['images', 'recipes'],
+                         help="Write the images, or only a recipe table rendering them on demand")
+    augment.set_defaults(func=cmd_augment)
+
+    verify = subparsers.add_parser('verify', help="Check a packed dataset or recipe table")
+    target = verify.add_mutually_exclusive_group(required=True)
+    target.add_argument('--packed', help="Packed dataset folder (OUT/packed)")
+    target.add_argument('--recipes', help="Augmentation recipe table folder (OUT/recipes)")
+    verify.add_argument('--count', type=int, default=16, help="Number of random samples re-read")
+    verify.add_argument('--seed', type=int, default=0, help="Random seed choosing the samples")
+    verify.set_defaults(func=cmd_verify)
+
+    return parser
+
+
+def main(argv=None):
+    """Command line entry point"""
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except SamplingError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -7,6 +7,7 @@ GitHub: https://github.com/davidvct/AI_data_processing_tool
 """
 
 import sys
+import multiprocessing
 from PySide6.QtWidgets import QApplication
 
 from src.app import ImageLabelProcessor
@@ -14,6 +15,7 @@ from src.app import ImageLabelProcessor
 
 def main():
     """Main entry point for the application"""
+    multiprocessing.freeze_support()  # Worker pools use 'spawn', needed for frozen builds
     app = QApplication(sys.argv)
     window = ImageLabelProcessor()
     window.show()
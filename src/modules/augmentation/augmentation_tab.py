@@ -2,9 +2,22 @@
 Augmentation Tab - UI for image augmentation operations
 """
 
+import time
+
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
-                              QLineEdit, QTextEdit, QGroupBox, QSpinBox, QCheckBox,
-                              QProgressBar)
+                              QLineEdit, QGroupBox, QSpinBox, QCheckBox,
+                              QProgressBar, QFileDialog, QComboBox)
+from PySide6.QtCore import QTimer
+
+from src.utils.log_view import LogView
+from src.modules.sampling.workers import SamplingWorker, start_in_thread
+from src.modules.sampling.engine import find_existing_outputs, ON_EXISTING_KEEP, ON_EXISTING_ABORT
+from src.modules.sampling.dialogs import ask_existing_files
+from src.modules.augmentation.engine import run_augmentation, MAX_MULTIPLIER
+from src.modules.augmentation.recipes import MODE_IMAGES, MODE_RECIPES, find_existing_recipes
+from src.modules.augmentation.transforms import (OP_ROTATE, OP_HFLIP, OP_VFLIP, OP_BRIGHTNESS,
+                                                 OP_CONTRAST, OP_NOISE, OP_BLUR, OP_CROP, OP_SCALE,
+                                                 OP_COLOR_JITTER)
 
 
 class AugmentationTab(QWidget):
@@ -12,6 +25,13 @@ class AugmentationTab(QWidget):
 
     def __init__(self):
         super().__init__()
+        self.augmentation_thread = None
+        self.augmentation_worker = None
+        self.started_at = None
+
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(50)
+        self.progress_timer.timeout.connect(self.update_progress)
         self.init_ui()
 
     def init_ui(self):
@@ -24,8 +44,10 @@ class AugmentationTab(QWidget):
         path_layout = QHBoxLayout()
         path_layout.addWidget(QLabel("Dataset Path:"))
         self.dataset_path = QLineEdit()
+        self.dataset_path.setPlaceholderText("Folder with 'images' and 'labels' (flat or nested)...")
         path_layout.addWidget(self.dataset_path)
         self.browse_btn = QPushButton("Browse")
+        self.browse_btn.clicked.connect(lambda: self.browse_folder(self.dataset_path, "Dataset"))
         path_layout.addWidget(self.browse_btn)
         input_layout.addLayout(path_layout)
 
@@ -75,12 +97,31 @@ class AugmentationTab(QWidget):
         multiplier_layout = QHBoxLayout()
         multiplier_layout.addWidget(QLabel("Augmentation Multiplier:"))
         self.aug_multiplier = QSpinBox()
-        self.aug_multiplier.setRange(1, 10)
+        self.aug_multiplier.setRange(1, MAX_MULTIPLIER)
         self.aug_multiplier.setValue(2)
+        self.aug_multiplier.setToolTip("Augmented variants written per source image")
         multiplier_layout.addWidget(self.aug_multiplier)
+        multiplier_layout.addWidget(QLabel("Random Seed:"))
+        self.random_seed = QSpinBox()
+        self.random_seed.setRange(0, 999999)
+        self.random_seed.setValue(42)
+        self.random_seed.setToolTip("The same seed gives the same variants on every run")
+        multiplier_layout.addWidget(self.random_seed)
         multiplier_layout.addStretch()
         aug_layout.addLayout(multiplier_layout)
 
+        mode_layout = QHBoxLayout()
+        mode_layout.addWidget(QLabel("Output Mode:"))
+        self.output_mode = QComboBox()
+        self.output_mode.addItem("Augmented images", MODE_IMAGES)
+        self.output_mode.addItem("Recipes only (render on demand)", MODE_RECIPES)
+        self.output_mode.setToolTip("Recipes only writes a small table of the drawn operation\n"
+                                    "parameters to a 'recipes' folder instead of the images;\n"
+                                    "recipes.RecipeDataset renders each variant when read.")
+        mode_layout.addWidget(self.output_mode)
+        mode_layout.addStretch()
+        aug_layout.addLayout(mode_layout)
+
         aug_group.setLayout(aug_layout)
         layout.addWidget(aug_group)
 
@@ -91,8 +132,10 @@ class AugmentationTab(QWidget):
         output_path_layout = QHBoxLayout()
         output_path_layout.addWidget(QLabel("Output Path:"))
         self.output_path = QLineEdit()
+        self.output_path.setPlaceholderText("Will create 'images' and 'labels' folders here...")
         output_path_layout.addWidget(self.output_path)
         self.output_browse_btn = QPushButton("Browse")
+        self.output_browse_btn.clicked.connect(lambda: self.browse_folder(self.output_path, "Output"))
         output_path_layout.addWidget(self.output_browse_btn)
         output_layout.addLayout(output_path_layout)
 
@@ -100,14 +143,21 @@ class AugmentationTab(QWidget):
         layout.addWidget(output_group)
 
         # Progress and buttons
+        progress_layout = QHBoxLayout()
         self.progress_bar = QProgressBar()
-        layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.progress_bar)
+        self.speed_label = QLabel("")
+        self.speed_label.setMinimumWidth(120)
+        progress_layout.addWidget(self.speed_label)
+        layout.addLayout(progress_layout)
 
         button_layout = QHBoxLayout()
         self.start_btn = QPushButton("Start Augmentation")
         self.start_btn.setStyleSheet("QPushButton { background-color: #4CAF50; color: white; }")
         self.stop_btn = QPushButton("Stop")
         self.stop_btn.setEnabled(False)
+        self.start_btn.clicked.connect(self.start_augmentation)
+        self.stop_btn.clicked.connect(self.stop_augmentation)
         button_layout.addWidget(self.start_btn)
         button_layout.addWidget(self.stop_btn)
         layout.addLayout(button_layout)
@@ -115,8 +165,7 @@ class AugmentationTab(QWidget):
         # Log area
         log_group = QGroupBox("Log")
         log_layout = QVBoxLayout()
-        self.log_text = QTextEdit()
-        self.log_text.setReadOnly(True)
+        self.log_text = LogView('augmentation')
         self.log_text.setMaximumHeight(150)
         log_layout.addWidget(self.log_text)
         log_group.setLayout(log_layout)
@@ -124,3 +173,96 @@ class AugmentationTab(QWidget):
 
         layout.addStretch()
         self.setLayout(layout)
+
+    def operation_checks(self):
+        """Return (operation, checkbox) for every augmentation option"""
+        return ((OP_ROTATE, self.rotate_check), (OP_HFLIP, self.flip_horizontal_check),
+                (OP_VFLIP, self.flip_vertical_check), (OP_BRIGHTNESS, self.brightness_check),
+                (OP_CONTRAST, self.contrast_check), (OP_NOISE, self.noise_check),
+                (OP_BLUR, self.blur_check), (OP_CROP, self.crop_check),
+                (OP_SCALE, self.scale_check), (OP_COLOR_JITTER, self.color_jitter_check))
+
+    def browse_folder(self, line_edit, name):
+        """Browse for a folder and put it into line_edit"""
+        folder = QFileDialog.getExistingDirectory(self, f"Select {name} Folder", line_edit.text())
+        if folder:
+            line_edit.setText(folder)
+            self.log_text.append(f"{name} folder selected: {folder}")
+
+    def is_busy(self):
+        return self.augmentation_worker is not None
+
+    def start_augmentation(self):
+        """Start augmentation in a background worker"""
+        if self.is_busy():
+            self.log_text.append("Error: Augmentation is already running")
+            return
+
+        on_existing = ON_EXISTING_KEEP
+        output_path = self.output_path.text()
+        output_mode = self.output_mode.currentData()
+        if output_path:
+            if output_mode == MODE_RECIPES:
+                existing_images, existing_labels = find_existing_recipes(output_path)
+            else:
+                existing_images, existing_labels = find_existing_outputs(output_path)
+            if existing_images or existing_labels:
+                on_existing = ask_existing_files(self, existing_images, existing_labels, output_mode)
+                if on_existing == ON_EXISTING_ABORT:
+                    self.log_text.append("Augmentation cancelled by user")
+                    return
+
+        self.progress_bar.setValue(0)
+        self.speed_label.setText("")
+        self.augmentation_worker = SamplingWorker(run_augmentation,
+                                                  dataset_path=self.dataset_path.text(),
+                                                  output_path=output_path,
+                                                  ops=[op for op, check in self.operation_checks()
+                                                       if check.isChecked()],
+                                                  multiplier=self.aug_multiplier.value(),
+                                                  random_seed=self.random_seed.value(),
+                                                  on_existing=on_existing,
+                                                  output_mode=output_mode)
+        self.augmentation_worker.message.connect(self.log_text.append)
+        self.augmentation_worker.failed.connect(self.log_text.append)
+        self.augmentation_thread = start_in_thread(
+            self.augmentation_worker, self,
+            (self.augmentation_worker.finished, self.augmentation_worker.failed))
+        self.augmentation_thread.finished.connect(self.on_augmentation_thread_finished)
+
+        self.start_btn.setEnabled(False)
+        self.start_btn.setText("Augmentation in progress...")
+        self.start_btn.setStyleSheet("QPushButton { background-color: #FFC107; color: white; }")
+        self.stop_btn.setEnabled(True)
+        self.started_at = time.perf_counter()
+        self.progress_timer.start()
+        self.augmentation_thread.start()
+
+    def stop_augmentation(self):
+        """Ask the running augmentation worker to stop"""
+        if self.augmentation_worker is not None and not self.augmentation_worker.is_cancelled():
+            self.augmentation_worker.cancel()
+            self.log_text.append("Stopping augmentation after the images in progress...")
+
+    def update_progress(self):
+        """Poll the worker's latest progress and show the output rate (timer driven)"""
+        if self.augmentation_worker is None:
+            return
+        done, total = self.augmentation_worker.progress_snapshot()
+        if total:
+            self.progress_bar.setMaximum(total)
+            self.progress_bar.setValue(done)
+        elapsed = time.perf_counter() - self.started_at
+        if done and elapsed > 0:
+            self.speed_label.setText(f"{done / elapsed:.1f} images/s")
+
+    def on_augmentation_thread_finished(self):
+        """Clean up once the augmentation worker thread has exited"""
+        self.update_progress()
+        self.progress_timer.stop()
+        self.augmentation_worker = None
+        self.augmentation_thread = None
+        self.start_btn.setEnabled(True)
+        self.start_btn.setText("Start Augmentation")
+        self.start_btn.setStyleSheet("QPushButton { background-color: #4CAF50; color: white; }")
+        self.stop_btn.setEnabled(False)
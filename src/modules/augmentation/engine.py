@@ -0,0 +1,375 @@
+"""
+Augmentation engine
+Streams source images through decode -> augment -> encode in worker
+processes and writes the variants with their transformed YOLO labels.
+Decoded sources are shared between the workers through shared-memory
+frame slots. Pure-Python functions (no Qt imports)
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+
+from src.utils.file_utils import split_name
+from src.utils.frame_pool import FramePool, slot_array
+from src.utils.image_header import read_image_size
+from src.modules.sampling.analysis import pool_context
+from src.modules.sampling.dataset_index import DatasetIndex
+from src.modules.sampling.engine import (SamplingError, prepare_output, output_folders,
+                                         check_cancelled, print_log, unique_output_names,
+                                         ON_EXISTING_KEEP, ON_EXISTING_DELETE, ON_EXISTING_ABORT)
+from src.modules.sampling.standard import collect_tree_pairs
+from src.modules.sampling.tiling import format_label_rows
+from src.modules.augmentation.image_io import (read_image, write_image, read_labels,
+                                               variant_name)
+from src.modules.augmentation.recipes import (MODE_IMAGES, MODE_RECIPES, OUTPUT_MODES,
+                                              recipe_folder, find_existing_recipes, write_recipes)
+from src.modules.augmentation.transforms import (OPS, MIN_VISIBILITY, variant_rng, sample_params,
+                                                 output_size, augment)
+
+
+MAX_MULTIPLIER = 10
+
+# Threads encoding and writing variants while the next ones render (cv2 releases the GIL)
+ENCODE_THREADS = 2
+
+
+class VariantWorkspace:
+    """Render buffers and encode threads reused across the images of one process
+
+    Variants render into one of ENCODE_THREADS + 1 slots; a slot's buffer is
+    only reused once the encode submitted from it has finished, so rendering
+    the next variant overlaps encoding the previous ones without a variant
+    ever allocating a full-size image.
+    """
+
+    def __init__(self, threads=ENCODE_THREADS):
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+        self.buffers = [np.empty(0, dtype=np.uint8) for _ in range(threads + 1)]
+        self.pending = [None] * (threads + 1)
+        self.noise = np.empty(0, dtype=np.int16)
+        self._next = 0
+
+    @staticmethod
+    def _view(buffer, shape):
+        size = int(np.prod(shape))
+        if buffer.size < size:
+            buffer = np.empty(size, dtype=buffer.dtype)
+        return buffer, buffer[:size].reshape(shape)
+
+    def slot(self, shape):
+        """Return (slot, contiguous uint8 array of shape) once the slot's last encode is done"""
+        slot = self._next
+        self._next = (slot + 1) % len(self.buffers)
+        if self.pending[slot] is not None:
+            future, self.pending[slot] = self.pending[slot], None
+            future.result()
+        self.buffers[slot], view = self._view(self.buffers[slot], shape)
+        return slot, view
+
+    def noise_buffer(self, shape):
+        """Return an int16 scratch array of shape (variants render one at a time)"""
+        self.noise, view = self._view(self.noise, shape)
+        return view
+
+    def submit(self, slot, fn, *args):
+        """Run fn(*args) on an encode thread; the slot is busy until it returns"""
+        self.pending[slot] = self.executor.submit(fn, *args)
+
+    def drain(self):
+        """Wait for every submitted encode, raising the first error"""
+        error = None
+        for slot, future in enumerate(self.pending):
+            if future is None:
+                continue
+            self.pending[slot] = None
+            try:
+                future.result()
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+
+
+_workspace = None
+
+
+def get_workspace():
+    """Return the workspace of this process, created on first use"""
+    global _workspace
+    if _workspace is None:
+        _workspace = VariantWorkspace()
+    return _workspace
+
+
+def write_variants(image, rows, images_out, labels_out, filename, ops, variants, seed,
+                   min_visibility=MIN_VISIBILITY):
+    """
+    Write variants of one decoded image and its labels
+
+    Each variant renders into a reused buffer and is encoded on the
+    process's encode threads.
+
+    Args:
+        image: Decoded BGR source (not modified)
+        rows: float32 (n, 5) YOLO rows of the source
+        images_out, labels_out: Output folders
+        filename: Output file name of the source (variants add a suffix to its stem)
+        ops: Enabled operations
+        variants: Iterable of variant numbers to write
+        seed: Job seed; every variant draws its parameters from (seed, filename, variant)
+        min_visibility: Minimum share of a box left inside a variant to keep it
+
+    Returns:
+        Tuple (variants written, boxes written, boxes dropped)
+    """
+    stem, ext = split_name(filename)
+    workspace = get_workspace()
+    height, width, channels = image.shape
+    written = boxes = dropped = 0
+    try:
+        for variant in variants:
+            params = sample_params(ops, variant_rng(seed, filename, variant))
+            out_w, out_h = output_size(params, width, height)
+            slot, buffer = workspace.slot((out_h, out_w, channels))
+            out_image, out_rows, lost = augment(image, rows, params, min_visibility, dst=buffer,
+                                                noise=workspace.noise_buffer(buffer.shape))
+            name = variant_name(stem, variant)
+            workspace.submit(slot, write_image, out_image, ext, os.path.join(images_out, name + ext))
+            with open(os.path.join(labels_out, name + '.txt'), 'w', encoding='utf-8') as f:
+                f.write(format_label_rows(out_rows))
+            written += 1
+            boxes += len(out_rows)
+            dropped += lost
+    finally:
+        # Also after an error: the next image must not render into buffers still being encoded
+        workspace.drain()
+    return written, boxes, dropped
+
+
+def augment_file(image_path, label_path, images_out, labels_out, filename, ops, multiplier,
+                 seed, min_visibility=MIN_VISIBILITY):
+    """
+    Decode one image and write all its variants (runs in worker processes)
+
+    Used for sources whose size cannot be read from the header, so no frame
+    slot can be sized for them; arguments as in write_variants, with
+    multiplier the number of variants.
+    """
+    return write_variants(read_image(image_path), read_labels(label_path), images_out, labels_out,
+                          filename, ops, range(multiplier), seed, min_visibility)
+
+
+def frame_bytes(image_path):
+    """Bytes of the decoded BGR frame of an image, or None if its header cannot be read"""
+    try:
+        width, height = read_image_size(image_path)
+    except OSError:
+        return None
+    return width * height * 3
+
+
+def decode_into(ref, image_path):
+    """Decode an image into a frame slot (runs in worker processes) and return its shape"""
+    image = read_image(image_path)
+    slot_array(ref, image.shape)[...] = image
+    return image.shape
+
+
+def augment_frame(ref, shape, label_path, images_out, labels_out, filename, ops, variants, seed,
+                  min_visibility=MIN_VISIBILITY):
+    """Write variants of a source decoded into a frame slot (runs in worker processes)"""
+    return write_variants(slot_array(ref, shape), read_labels(label_path), images_out, labels_out,
+                          filename, ops, variants, seed, min_visibility)
+
+
+def prepare_recipe_output(output_path, on_existing=ON_EXISTING_KEEP, log=print_log):
+    """
+    Create the recipe folder of a job and handle a table already in it
+
+    A table is only replaced once the new one is complete, so keeping it
+    and deleting it first differ only if the job is stopped.
+
+    Returns:
+        The recipe folder
+
+    Raises:
+        SamplingError: If the policy is ON_EXISTING_ABORT and files exist
+    """
+    folder = recipe_folder(output_path)
+    os.makedirs(folder, exist_ok=True)
+    table, others = find_existing_recipes(output_path)
+    if table or others:
+        if on_existing == ON_EXISTING_ABORT:
+            raise SamplingError(f"Recipe folder already contains {len(table) + len(others)} file(s)")
+        elif on_existing == ON_EXISTING_DELETE:
+            log("Deleting existing files...")
+            for name in table + others:
+                os.remove(os.path.join(folder, name))
+            log(f"Deleted {len(table) + len(others)} file(s)")
+        else:
+            log("The existing recipe table is replaced once the new one is complete")
+    log(f"Output folder ready: {folder}")
+    return folder
+
+
+def run_augmentation(dataset_path, output_path, ops, multiplier=2, random_seed=42,
+                     min_visibility=MIN_VISIBILITY, on_existing=ON_EXISTING_KEEP, max_workers=None,
+                     output_mode=MODE_IMAGES, log=print_log, progress=None, is_cancelled=None):
+    """
+    Run an augmentation job over an images/labels dataset
+
+    Args:
+        dataset_path: Dataset root with images and labels trees (flat or nested, as in
+            Standard sampling)
+        output_path: Folder receiving 'images' and 'labels' (or 'recipes')
+        ops: Enabled operations (see transforms.OPS)
+        multiplier: Variants written per source image
+        random_seed: Seed for reproducible variants
+        min_visibility: Minimum share of a box left inside a variant to keep it
+        on_existing: Policy for files already in the output folders
+        max_workers: Worker processes (default: CPU count)
+        output_mode: MODE_IMAGES renders every variant; MODE_RECIPES only records
+            each variant's parameters, for RecipeDataset to render on demand
+        log: Callable receiving messages
+        progress: Optional callable(done, total) counted in output images
+        is_cancelled: Optional callable returning True to stop early
+
+    Returns:
+        Number of images (or recipes) written
+
+    Raises:
+        SamplingError: If the job cannot run
+    """
+    if not dataset_path or not os.path.isdir(dataset_path):
+        raise SamplingError("Invalid dataset folder path")
+    if not output_path:
+        raise SamplingError("Please select an output folder")
+    ops = [op for op in OPS if op in ops]
+    if not ops:
+        raise SamplingError("Please select at least one augmentation")
+    if not 1 <= multiplier <= MAX_MULTIPLIER:
+        raise SamplingError(f"Multiplier must be between 1 and {MAX_MULTIPLIER}")
+    if output_mode not in OUTPUT_MODES:
+        raise SamplingError(f"Unknown output mode: {output_mode}")
+
+    log("=" * 50)
+    log("Starting augmentation process...")
+    log(f"Dataset folder: {dataset_path}")
+    log(f"Output folder: {output_path}")
+    log(f"Augmentations: {', '.join(ops)}")
+    log(f"Multiplier: {multiplier}, random seed: {random_seed}")
+    log(f"Output: {'recipes (rendered on demand)' if output_mode == MODE_RECIPES else 'images'}")
+    log("=" * 50)
+
+    log("Step 1: Collecting image/label pairs...")
+    index = DatasetIndex(dataset_path, log=log)
+    try:
+        table = collect_tree_pairs(dataset_path, index, log=log, is_cancelled=is_cancelled)
+    finally:
+        index.close()
+    pairs = unique_output_names(table.pairs(range(len(table))), log=log)
+    log(f"Found {len(pairs)} valid image/label pairs")
+    if not pairs:
+        raise SamplingError("No valid image/label pairs found")
+
+    if output_mode == MODE_RECIPES:
+        return _record_recipes(pairs, output_path, ops, multiplier, random_seed, min_visibility,
+                               on_existing, log, progress, is_cancelled)
+
+    log("Step 2: Preparing output folders...")
+    prepare_output(output_path, on_existing, log=log)
+    images_out, labels_out = output_folders(output_path)
+
+    log(f"Step 3: Writing {len(pairs) * multiplier} augmented images...")
+    total = len(pairs) * multiplier
+    totals = [0, 0, 0]
+    start = time.perf_counter()
+    workers = max_workers or os.cpu_count() or 1
+    # A source is decoded once into a frame slot, then its variants are split
+    # into one task per worker, so a few large images still use every core
+    chunk = -(-multiplier // workers)
+
+    def cancelled():
+        return is_cancelled is not None and is_cancelled()
+
+    with FramePool(workers, mp_context=pool_context()) as pool:
+        pending = {}  # future -> (pair, frame slot or None, True if it decodes the frame)
+        pair_iter = iter(pairs)
+        queued = None  # (pair, frame bytes) waiting for a free slot
+        while True:
+            # Backpressure: the next source is only decoded once a frame slot is free
+            while not cancelled() and len(pending) < 2 * workers:
+                if queued is None:
+                    pair = next(pair_iter, None)
+                    if pair is None:
+                        break
+                    queued = (pair, frame_bytes(pair['image']))
+                pair, nbytes = queued
+                if nbytes is None:
+                    future = pool.executor.submit(augment_file, pair['image'], pair['label'],
+                                                  images_out, labels_out, pair['filename'], ops,
+                                                  multiplier, random_seed, min_visibility)
+                    pending[future] = (pair, None, False)
+                else:
+                    ref = pool.acquire(nbytes, block=not pending)
+                    if ref is None:
+                        break
+                    pending[pool.submit(ref, decode_into, pair['image'])] = (pair, ref, True)
+                queued = None
+            if not pending:
+                break
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                pair, ref, decoding = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    log(f"Warning: Could not augment {os.path.basename(pair['image'])}: {e}")
+                    result = None
+                if not decoding:
+                    for i, value in enumerate(result or ()):
+                        totals[i] += value
+                    continue
+                if result is not None and not cancelled():
+                    for first in range(0, multiplier, chunk):
+                        task = pool.submit(ref, augment_frame, result, pair['label'], images_out,
+                                           labels_out, pair['filename'], ops,
+                                           range(first, min(first + chunk, multiplier)),
+                                           random_seed, min_visibility)
+                        pending[task] = (pair, ref, False)
+                pool.release(ref)
+            if progress is not None:
+                progress(totals[0], total)
+
+    check_cancelled(is_cancelled)
+    elapsed = time.perf_counter() - start
+    written, boxes, dropped = totals
+    log("=" * 50)
+    log("✓ Augmentation completed successfully!")
+    log(f"✓ {written} images with {boxes} boxes written ({dropped} boxes dropped at the borders)")
+    log(f"✓ {elapsed:.1f} s, {written / max(elapsed, 1e-9):.1f} images/s with {workers} worker(s)")
+    log("=" * 50)
+    return written
+
+
+def _record_recipes(pairs, output_path, ops, multiplier, random_seed, min_visibility,
+                    on_existing, log, progress, is_cancelled):
+    log("Step 2: Preparing recipe folder...")
+    folder = prepare_recipe_output(output_path, on_existing, log=log)
+
+    log(f"Step 3: Recording {len(pairs) * multiplier} variant recipes...")
+    written = write_recipes(pairs, folder, ops, multiplier, random_seed, min_visibility,
+                            progress=progress, is_cancelled=is_cancelled)
+    check_cancelled(is_cancelled)
+    size = sum(os.path.getsize(os.path.join(folder, name))
+               for name in find_existing_recipes(output_path)[0])
+    log("=" * 50)
+    log("✓ Augmentation recipes recorded successfully!")
+    log(f"✓ {written} variants of {len(pairs)} images in {size / 1024:.1f} KiB "
+        f"(render them with recipes.RecipeDataset)")
+    log("=" * 50)
+    return written
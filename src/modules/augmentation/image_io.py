@@ -0,0 +1,54 @@
+"""
+Augmentation image I/O
+Decoding and encoding of source images and variants with OpenCV, and the
+label and file naming shared by the image and recipe output modes
+"""
+
+import cv2
+import numpy as np
+
+from src.modules.sampling.label_store import parse_label_text
+
+
+JPEG_QUALITY = 95
+
+
+def read_image(path):
+    """
+    Decode an image file into a BGR uint8 array
+
+    Reads the bytes first, so paths OpenCV cannot open itself (non-ASCII
+    names on Windows) work too.
+
+    Raises:
+        ValueError: If the file is not a decodable image
+    """
+    image = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("not a decodable image")
+    return image
+
+
+def encode_image(image, ext):
+    """Encode a BGR array in the format of ext ('.jpg', '.png', ...)"""
+    params = [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY] if ext in ('.jpg', '.jpeg') else []
+    ok, data = cv2.imencode(ext, image, params)
+    if not ok:
+        raise ValueError(f"cannot encode {ext} images")
+    return data
+
+
+def write_image(image, ext, path):
+    """Encode image and write it to path"""
+    encode_image(image, ext).tofile(path)
+
+
+def read_labels(label_path):
+    """Parse a YOLO label file into float32 (n, 5) rows"""
+    with open(label_path, 'r', encoding='utf-8', errors='replace') as f:
+        return parse_label_text(f.read())
+
+
+def variant_name(stem, variant):
+    """Output stem of a variant (variants are numbered from 1)"""
+    return f"{stem}_aug{variant + 1}"
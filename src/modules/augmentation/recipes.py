@@ -0,0 +1,278 @@
+"""
+Augmentation recipes
+Virtual output mode: instead of rendered images, a job writes one fixed-width
+record per variant (source, variant number and the drawn operation
+parameters). RecipeDataset renders any variant on demand from its source,
+exactly as the image mode writes it, and keeps recently rendered variants in
+a size-bounded LRU cache. Pure-Python functions (no Qt imports)
+"""
+
+import json
+import os
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from src.utils.file_utils import split_name
+from src.modules.augmentation.image_io import read_image, read_labels, variant_name
+from src.modules.augmentation.transforms import (OPS, OP_SCALE, OP_ROTATE, OP_CROP, OP_HFLIP,
+                                                 OP_VFLIP, OP_BRIGHTNESS, OP_CONTRAST,
+                                                 OP_COLOR_JITTER, OP_BLUR, OP_NOISE, variant_rng,
+                                                 sample_params, augment)
+
+
+MODE_IMAGES = 'images'
+MODE_RECIPES = 'recipes'
+OUTPUT_MODES = (MODE_IMAGES, MODE_RECIPES)
+
+FORMAT_NAME = 'yolo-augment-recipes'
+FORMAT_VERSION = 1
+
+RECIPES_FILE = 'recipes.npy'  # RECIPE_DTYPE record per variant, in source then variant order
+SOURCES_FILE = 'sources.tsv'  # "image path<TAB>label path<TAB>output file name" per source
+META_FILE = 'meta.json'
+RECIPE_FILES = (RECIPES_FILE, SOURCES_FILE, META_FILE)
+
+# Files are written under this suffix and renamed once complete
+PARTIAL_SUFFIX = '.partial'
+
+DEFAULT_CACHE_BYTES = 512 << 20
+
+# Parameters are stored as drawn (float64), so rendering from a record matches the image mode
+RECIPE_DTYPE = np.dtype([('source', '<u4'), ('variant', '<u2'),
+                         ('ops', '<u2'),  # bit i set: OPS[i] is part of the variant
+                         ('scale', '<f8'), ('rotate', '<f8'), ('crop', '<f8', (3,)),
+                         ('brightness', '<f8'), ('contrast', '<f8'), ('color_jitter', '<f8', (2,)),
+                         ('blur', '<u1'), ('noise_sigma', '<f8'), ('noise_seed', '<u4')])
+
+_VALUE_FIELDS = (OP_SCALE, OP_ROTATE, OP_BRIGHTNESS, OP_CONTRAST)
+
+
+def params_to_record(record, params):
+    """Store variant parameters (see transforms.sample_params) in a RECIPE_DTYPE record"""
+    record['ops'] = sum(1 << i for i, op in enumerate(OPS) if op in params)
+    for op in _VALUE_FIELDS:
+        record[op] = params.get(op, 0.0)
+    record['crop'] = params.get(OP_CROP, (0.0, 0.0, 0.0))
+    record['color_jitter'] = params.get(OP_COLOR_JITTER, (0.0, 0.0))
+    record['blur'] = params.get(OP_BLUR, 0)
+    record['noise_sigma'], record['noise_seed'] = params.get(OP_NOISE, (0.0, 0))
+
+
+def record_to_params(record):
+    """Rebuild the parameters dict of a RECIPE_DTYPE record"""
+    mask = int(record['ops'])
+    params = {}
+    for i, op in enumerate(OPS):
+        if not mask & (1 << i):
+            continue
+        if op in _VALUE_FIELDS:
+            params[op] = float(record[op])
+        elif op in (OP_HFLIP, OP_VFLIP):
+            params[op] = True
+        elif op in (OP_CROP, OP_COLOR_JITTER):
+            params[op] = record[op].tolist()
+        elif op == OP_BLUR:
+            params[op] = int(record['blur'])
+        elif op == OP_NOISE:
+            params[op] = [float(record['noise_sigma']), int(record['noise_seed'])]
+    return params
+
+
+def recipe_folder(output_path):
+    """Return the folder of the recipe table of a job writing to output_path"""
+    return os.path.join(output_path, 'recipes')
+
+
+def find_existing_recipes(output_path):
+    """
+    List files already in the recipe folder of output_path
+
+    Returns:
+        Tuple (recipe table files, other files such as leftovers of a stopped job)
+    """
+    try:
+        with os.scandir(recipe_folder(output_path)) as it:
+            names = [entry.name for entry in it if entry.is_file()]
+    except OSError:
+        names = []
+    table = [name for name in names if name in RECIPE_FILES]
+    return table, [name for name in names if name not in table]
+
+
+def write_recipes(pairs, output_dir, ops, multiplier, seed, min_visibility, progress=None,
+                  is_cancelled=None):
+    """
+    Draw the parameters of every variant and write the recipe table
+
+    The files are written with PARTIAL_SUFFIX and renamed once all are
+    complete, so a cancelled job leaves a previous table in output_dir intact.
+
+    Args:
+        pairs: Source pairs with 'image', 'label' and 'filename'
+        output_dir: Existing folder receiving the recipe files
+        ops: Enabled operations
+        multiplier: Variants per source
+        seed: Job seed (variants draw from (seed, filename, variant) as in the image mode)
+        min_visibility: Minimum share of a box left inside a variant to keep it
+        progress: Optional callable(done, total) counted in variants
+        is_cancelled: Optional callable returning True to stop early
+
+    Returns:
+        Number of variants written, 0 if the job was cancelled
+    """
+    total = len(pairs) * multiplier
+    recipes = np.zeros(total, dtype=RECIPE_DTYPE)
+    for source, pair in enumerate(pairs):
+        if is_cancelled is not None and is_cancelled():
+            return 0
+        for variant in range(multiplier):
+            record = recipes[source * multiplier + variant]
+            record['source'], record['variant'] = source, variant
+            params = sample_params(ops, variant_rng(seed, pair['filename'], variant))
+            params_to_record(record, params)
+        if progress is not None and (source % 256 == 255 or source == len(pairs) - 1):
+            progress((source + 1) * multiplier, total)
+
+    def partial(name):
+        return os.path.join(output_dir, name + PARTIAL_SUFFIX)
+
+    with open(partial(RECIPES_FILE), 'wb') as f:
+        np.save(f, recipes)
+    with open(partial(SOURCES_FILE), 'w', encoding='utf-8') as f:
+        f.writelines(f"{pair['image']}\t{pair['label']}\t{pair['filename']}\n" for pair in pairs)
+    with open(partial(META_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'format': FORMAT_NAME, 'version': FORMAT_VERSION, 'ops': list(ops),
+                   'multiplier': multiplier, 'seed': seed, 'min_visibility': min_visibility,
+                   'sources': len(pairs), 'variants': total, 'created': int(time.time())},
+                  f, indent=2)
+    for name in RECIPE_FILES:
+        os.replace(partial(name), os.path.join(output_dir, name))
+    return total
+
+
+class RecipeDataset:
+    """Render the variants of a recipe table on demand
+
+    ds[i] returns (image, rows) of variant i: the BGR uint8 image and float32
+    (n, 5) YOLO rows the image mode would have written. Rendered variants are
+    kept (read-only) in an LRU cache holding at most cache_bytes of images;
+    the last decoded source is kept too, so reading the variants of a source
+    one after another decodes it once.
+    """
+
+    def __init__(self, path, cache_bytes=DEFAULT_CACHE_BYTES):
+        self.path = path
+        with open(os.path.join(path, META_FILE), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('format') != FORMAT_NAME or self.meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Not a {FORMAT_NAME} v{FORMAT_VERSION} table: {path}")
+        self.recipes = np.load(os.path.join(path, RECIPES_FILE), mmap_mode='r')
+        with open(os.path.join(path, SOURCES_FILE), 'r', encoding='utf-8') as f:
+            self.sources = [tuple(line.split('\t')) for line in f.read().splitlines()]
+        self.cache_bytes = cache_bytes
+        self.cached_bytes = 0
+        self.hits = self.misses = 0
+        self._cache = OrderedDict()
+        self._source = (None, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.recipes)
+
+    def __getitem__(self, i):
+        i = range(len(self))[i]
+        entry = self._cache.get(i)
+        if entry is not None:
+            self._cache.move_to_end(i)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        image, rows = self.render(i)
+        image.flags.writeable = rows.flags.writeable = False
+        if image.nbytes <= self.cache_bytes:
+            self._cache[i] = (image, rows)
+            self.cached_bytes += image.nbytes
+            while self.cached_bytes > self.cache_bytes:
+                _, (old, _) = self._cache.popitem(last=False)
+                self.cached_bytes -= old.nbytes
+        return image, rows
+
+    def name(self, i):
+        """Output file name the image mode gives variant i"""
+        record = self.recipes[i]
+        stem, ext = split_name(self.sources[int(record['source'])][2])
+        return variant_name(stem, int(record['variant'])) + ext
+
+    def params(self, i):
+        """Parameters of variant i"""
+        return record_to_params(self.recipes[i])
+
+    def load_source(self, source):
+        """Decoded image and YOLO rows of a source (the last one is kept)"""
+        if self._source[0] != source:
+            image_path, label_path, _ = self.sources[source]
+            self._source = (source, (read_image(image_path), read_labels(label_path)))
+        return self._source[1]
+
+    def render(self, i):
+        """Render variant i without the cache"""
+        record = self.recipes[i]
+        image, rows = self.load_source(int(record['source']))
+        out_image, out_rows, _ = augment(image, rows, record_to_params(record),
+                                         self.meta['min_visibility'])
+        return out_image, out_rows
+
+    def close(self):
+        self._cache.clear()
+        self.cached_bytes = 0
+        self._source = (None, None)
+        self.recipes = None
+
+
+def verify_recipes(path, count=16, seed=0):
+    """
+    Check that random variants of a recipe table are reproducible from the job seed
+
+    Every checked record must equal the parameters drawn again from
+    (seed, source, variant), so the current code renders the same variants
+    as the code that wrote the table, and its source must still render.
+
+    Args:
+        path: Recipe table folder
+        count: Number of variants checked (all if larger than the table)
+        seed: Seed choosing the variants
+
+    Returns:
+        Tuple (checked, problems) with problems a list of messages
+    """
+    problems = []
+    with RecipeDataset(path, cache_bytes=0) as dataset:
+        meta = dataset.meta
+        if meta.get('variants') != len(dataset):
+            problems.append(f"meta.json lists {meta.get('variants')} variants, "
+                            f"table has {len(dataset)}")
+        rows = np.random.default_rng(seed).permutation(len(dataset))[:count]
+        for i in sorted(rows.tolist()):
+            record = dataset.recipes[i]
+            source, variant = int(record['source']), int(record['variant'])
+            filename = dataset.sources[source][2]
+            drawn = np.zeros((), dtype=RECIPE_DTYPE)
+            drawn['source'], drawn['variant'] = source, variant
+            params_to_record(drawn, sample_params(meta['ops'], variant_rng(meta['seed'], filename,
+                                                                          variant)))
+            if drawn.tobytes() != record.tobytes():
+                problems.append(f"Variant {i} ({dataset.name(i)}): parameters differ from the "
+                                f"ones drawn from seed {meta['seed']}")
+                continue
+            try:
+                dataset.render(i)
+            except (OSError, ValueError) as e:
+                problems.append(f"Variant {i} ({dataset.name(i)}): cannot render: {e}")
+    return len(rows), problems
@@ -0,0 +1,387 @@
+"""
+Augmentation transforms
+Random variant parameters, pixel operations on OpenCV (BGR uint8) arrays and
+the matching YOLO box transforms; no Qt imports
+"""
+
+import zlib
+
+import cv2
+import numpy as np
+
+
+# Operations (one per AugmentationTab checkbox)
+OP_ROTATE = 'rotate'
+OP_HFLIP = 'hflip'
+OP_VFLIP = 'vflip'
+OP_BRIGHTNESS = 'brightness'
+OP_CONTRAST = 'contrast'
+OP_NOISE = 'noise'
+OP_BLUR = 'blur'
+OP_CROP = 'crop'
+OP_SCALE = 'scale'
+OP_COLOR_JITTER = 'color_jitter'
+
+# Application order: geometry first (a crop leaves fewer pixels for the rest), then colour
+GEOMETRIC_OPS = (OP_SCALE, OP_ROTATE, OP_CROP, OP_HFLIP, OP_VFLIP)
+PHOTOMETRIC_OPS = (OP_BRIGHTNESS, OP_CONTRAST, OP_COLOR_JITTER, OP_BLUR, OP_NOISE)
+OPS = GEOMETRIC_OPS + PHOTOMETRIC_OPS
+
+# Parameter ranges
+MAX_ROTATION = 15.0  # degrees, either direction
+SCALE_RANGE = (0.8, 1.2)
+CROP_RANGE = (0.6, 1.0)  # kept fraction of width and height
+FLIP_PROBABILITY = 0.5
+MAX_BRIGHTNESS = 0.25  # shift as a fraction of the 0-255 range
+CONTRAST_RANGE = (0.75, 1.25)
+MAX_HUE_SHIFT = 10  # OpenCV hue units (0-179)
+SATURATION_RANGE = (0.7, 1.3)
+NOISE_SIGMA_RANGE = (3.0, 12.0)
+BLUR_KERNELS = (3, 5, 7)
+
+# Border fill where rotation or zooming out uncovers the canvas (YOLO letterbox grey)
+FILL_VALUE = (114, 114, 114)
+
+# Boxes cut by the new image border are kept if this share of their area remains
+MIN_VISIBILITY = 0.3
+MIN_BOX_PIXELS = 2
+
+
+def variant_rng(seed, source_key, variant):
+    """
+    Random generator of one variant of one source image
+
+    The same (seed, source, variant) gives the same parameters in every
+    process and run, whatever order the images are processed in.
+    """
+    return np.random.default_rng([seed, zlib.crc32(source_key.encode('utf-8')), variant])
+
+
+def sample_params(ops, rng):
+    """
+    Draw the parameters of one variant
+
+    Args:
+        ops: Enabled operations
+        rng: numpy Generator (see variant_rng)
+
+    Returns:
+        Dict {op: parameters} of plain floats, ints and bools; flips that were
+        not drawn are left out
+    """
+    params = {}
+    for op in OPS:
+        if op not in ops:
+            continue
+        if op == OP_SCALE:
+            params[op] = float(rng.uniform(*SCALE_RANGE))
+        elif op == OP_ROTATE:
+            params[op] = float(rng.uniform(-MAX_ROTATION, MAX_ROTATION))
+        elif op == OP_CROP:
+            # Kept fraction, then the crop origin as a fraction of the free margin
+            params[op] = [float(rng.uniform(*CROP_RANGE)), float(rng.random()), float(rng.random())]
+        elif op in (OP_HFLIP, OP_VFLIP):
+            if rng.random() < FLIP_PROBABILITY:
+                params[op] = True
+        elif op == OP_BRIGHTNESS:
+            params[op] = float(rng.uniform(-MAX_BRIGHTNESS, MAX_BRIGHTNESS) * 255)
+        elif op == OP_CONTRAST:
+            params[op] = float(rng.uniform(*CONTRAST_RANGE))
+        elif op == OP_COLOR_JITTER:
+            params[op] = [float(rng.uniform(-MAX_HUE_SHIFT, MAX_HUE_SHIFT)),
+                          float(rng.uniform(*SATURATION_RANGE))]
+        elif op == OP_BLUR:
+            params[op] = int(rng.choice(BLUR_KERNELS))
+        elif op == OP_NOISE:
+            params[op] = [float(rng.uniform(*NOISE_SIGMA_RANGE)), int(rng.integers(1 << 31))]
+    return params
+
+
+def geometry_steps(params, width, height):
+    """
+    Affine steps of a variant's geometric operations
+
+    Matrices map continuous image coordinates (pixel edges at integers, so
+    a box spans [x0, x1]) of one step's input to its output.
+
+    Args:
+        params: Variant parameters (see sample_params)
+        width, height: Source image size in pixels
+
+    Returns:
+        List of (op, 2x3 float64 matrix, output width, output height)
+    """
+    steps = []
+    w, h = width, height
+    for op in GEOMETRIC_OPS:
+        value = params.get(op)
+        if not value:
+            continue
+        if op == OP_SCALE:
+            matrix = np.array([[value, 0, (1 - value) * w / 2], [0, value, (1 - value) * h / 2]])
+        elif op == OP_ROTATE:
+            matrix = cv2.getRotationMatrix2D((w / 2, h / 2), value, 1.0)
+        elif op == OP_CROP:
+            fraction, fx, fy = value
+            crop_w, crop_h = max(1, round(w * fraction)), max(1, round(h * fraction))
+            x0, y0 = round(fx * (w - crop_w)), round(fy * (h - crop_h))
+            matrix = np.array([[1.0, 0, -x0], [0, 1.0, -y0]])
+            w, h = crop_w, crop_h
+        elif op == OP_HFLIP:
+            matrix = np.array([[-1.0, 0, w], [0, 1.0, 0]])
+        else:
+            matrix = np.array([[1.0, 0, 0], [0, -1.0, h]])
+        steps.append((op, matrix, w, h))
+    return steps
+
+
+def geometry_matrix(params, width, height):
+    """
+    Compose a variant's geometric operations into one affine transform
+
+    Args:
+        params: Variant parameters (see sample_params)
+        width, height: Source image size in pixels
+
+    Returns:
+        Tuple (3x3 float64 matrix in continuous coordinates, output width, output height)
+    """
+    matrix = np.eye(3)
+    for _, step, width, height in geometry_steps(params, width, height):
+        matrix = np.vstack([step, (0, 0, 1)]) @ matrix
+    return matrix, width, height
+
+
+def clipped_extent(quads, width, height):
+    """
+    Axis-aligned extent of convex quadrilaterals intersected with the image
+
+    Clipping the bounding box of a rotated box would keep corners that lie
+    outside the image; the extent of the intersection polygon is found from
+    its candidate vertices instead: quad corners inside the image, image
+    corners inside the quad and edge/border crossings.
+
+    Args:
+        quads: float64 (n, 4, 2) corners in order around each quad
+        width, height: Image size
+
+    Returns:
+        Tuple (left, top, right, bottom) arrays; right < left where a quad misses the image
+    """
+    eps = 1e-6
+    x, y = quads[..., 0], quads[..., 1]
+    points = [quads]
+    valid = [(x >= -eps) & (x <= width + eps) & (y >= -eps) & (y <= height + eps)]
+
+    # Image corners inside the quad: on the same side of all four edges
+    image_corners = np.array([[0, 0], [width, 0], [width, height], [0, height]], dtype=np.float64)
+    edges = np.roll(quads, -1, axis=1) - quads
+    offsets = image_corners[None, :, None, :] - quads[:, None, :, :]
+    cross = edges[:, None, :, 0] * offsets[..., 1] - edges[:, None, :, 1] * offsets[..., 0]
+    points.append(np.broadcast_to(image_corners, quads.shape))
+    valid.append(np.all(cross >= -eps, axis=2) | np.all(cross <= eps, axis=2))
+
+    # Edge crossings with the four image borders
+    x1, y1 = np.roll(x, -1, axis=1), np.roll(y, -1, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for border, vertical in ((0, True), (width, True), (0, False), (height, False)):
+            start, end, other, other_end, limit = ((x, x1, y, y1, height) if vertical
+                                                   else (y, y1, x, x1, width))
+            t = (border - start) / (end - start)
+            cut = other + t * (other_end - other)
+            fixed = np.full_like(cut, border)
+            points.append(np.stack([fixed, cut] if vertical else [cut, fixed], axis=-1))
+            valid.append((t >= 0) & (t <= 1) & (cut >= -eps) & (cut <= limit + eps))
+
+    points = np.concatenate(points, axis=1)
+    valid = np.concatenate(valid, axis=1)
+    px = np.clip(points[..., 0], 0, width)
+    py = np.clip(points[..., 1], 0, height)
+    left = np.where(valid, px, np.inf).min(axis=1)
+    right = np.where(valid, px, -np.inf).max(axis=1)
+    top = np.where(valid, py, np.inf).min(axis=1)
+    bottom = np.where(valid, py, -np.inf).max(axis=1)
+    return left, top, right, bottom
+
+
+def transform_boxes(rows, matrix, width, height, out_w, out_h, min_visibility=MIN_VISIBILITY,
+                    min_pixels=MIN_BOX_PIXELS):
+    """
+    Map YOLO boxes through an affine transform, clip them to the output and drop lost ones
+
+    The four corners of every box are transformed, so a rotated box becomes
+    the axis-aligned box around the part of the rotated box left in the image.
+
+    Args:
+        rows: float32 (n, 5) class, cx, cy, w, h normalized to the source image
+        matrix: 3x3 transform (see geometry_matrix)
+        width, height: Source image size in pixels
+        out_w, out_h: Output image size in pixels
+        min_visibility: Minimum share of a transformed box inside the output to keep it
+        min_pixels: Minimum clipped width/height in pixels
+
+    Returns:
+        Tuple (float32 (m, 5) rows normalized to the output image, boxes dropped)
+    """
+    if len(rows) == 0 or ((out_w, out_h) == (width, height) and np.array_equal(matrix, np.eye(3))):
+        return rows.reshape(-1, 5), 0
+
+    cx, cy = rows[:, 1] * width, rows[:, 2] * height
+    half_w, half_h = rows[:, 3] * width / 2, rows[:, 4] * height / 2
+    corners = np.stack([np.stack([cx - half_w, cy - half_h], axis=1),
+                        np.stack([cx + half_w, cy - half_h], axis=1),
+                        np.stack([cx + half_w, cy + half_h], axis=1),
+                        np.stack([cx - half_w, cy + half_h], axis=1)], axis=1).astype(np.float64)
+    corners = corners @ matrix[:2, :2].T + matrix[:2, 2]
+
+    area = np.ptp(corners[..., 0], axis=1) * np.ptp(corners[..., 1], axis=1)
+    left, top, right, bottom = clipped_extent(corners, out_w, out_h)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        clipped_w, clipped_h = right - left, bottom - top
+        visibility = (clipped_w * clipped_h) / area
+    keep = (clipped_w >= min_pixels) & (clipped_h >= min_pixels) & (visibility >= min_visibility)
+
+    left, top, right, bottom = left[keep], top[keep], right[keep], bottom[keep]
+    out = np.empty((len(left), 5), dtype=np.float32)
+    out[:, 0] = rows[keep, 0]
+    out[:, 1] = (left + right) / 2 / out_w
+    out[:, 2] = (top + bottom) / 2 / out_h
+    out[:, 3] = (right - left) / out_w
+    out[:, 4] = (bottom - top) / out_h
+    return out, len(rows) - len(out)
+
+
+def _pixel_matrix(matrix):
+    """Convert a continuous-coordinate matrix to the pixel-centre convention of cv2.warpAffine"""
+    pixel = matrix.copy()
+    pixel[:, 2] += matrix[:, :2] @ (0.5, 0.5) - 0.5
+    return pixel
+
+
+def _source_window(matrix, width, height, out_w, out_h):
+    """
+    Source rectangle of a transform that only crops and flips
+
+    Returns:
+        (x0, y0, flip x, flip y) if matrix maps the output one-to-one onto
+        whole source pixels, else None
+    """
+    a, b, tx = matrix[0]
+    c, d, ty = matrix[1]
+    if b or c or abs(a) != 1 or abs(d) != 1 or tx != round(tx) or ty != round(ty):
+        return None
+    x0 = int(-tx) if a > 0 else int(tx) - out_w
+    y0 = int(-ty) if d > 0 else int(ty) - out_h
+    if x0 < 0 or y0 < 0 or x0 + out_w > width or y0 + out_h > height:
+        return None
+    return x0, y0, a < 0, d < 0
+
+
+def apply_geometry(image, matrix, out_w, out_h, dst=None):
+    """
+    Render an image through a composed affine transform
+
+    The whole chain of geometric operations costs one resampling pass
+    straight into the output size; crops and flips alone need none (a
+    slice and at most one cv2.flip).
+
+    Args:
+        image: BGR uint8 source array
+        matrix: 3x3 transform (see geometry_matrix)
+        out_w, out_h: Output size
+        dst: Optional contiguous (out_h, out_w, channels) uint8 array written in place
+
+    Returns:
+        BGR uint8 array: dst if given, else a new array or, when nothing is
+        resampled or flipped, a view of image
+    """
+    height, width = image.shape[:2]
+    window = _source_window(matrix, width, height, out_w, out_h)
+    if window is None:
+        return cv2.warpAffine(image, _pixel_matrix(matrix[:2]), (out_w, out_h), dst=dst,
+                              flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT,
+                              borderValue=FILL_VALUE)
+    x0, y0, flip_x, flip_y = window
+    image = image[y0:y0 + out_h, x0:x0 + out_w]
+    if flip_x or flip_y:
+        return cv2.flip(image, -1 if flip_x and flip_y else (1 if flip_x else 0), dst=dst)
+    if dst is not None:
+        np.copyto(dst, image)
+        return dst
+    return image
+
+
+def apply_photometric(image, params, noise=None):
+    """
+    Apply the colour operations of a variant in place
+
+    Args:
+        image: Contiguous BGR uint8 array, overwritten
+        params: Variant parameters (see sample_params)
+        noise: Optional int16 array of image's shape used as scratch for noise
+
+    Returns:
+        image
+    """
+    if OP_BRIGHTNESS in params or OP_CONTRAST in params:
+        # One lookup table for both: contrast around the image mean, then the shift
+        alpha = params.get(OP_CONTRAST, 1.0)
+        mean = float(image.mean()) if OP_CONTRAST in params else 0.0
+        lut = (np.arange(256) - mean) * alpha + mean + params.get(OP_BRIGHTNESS, 0.0)
+        cv2.LUT(image, np.clip(lut, 0, 255).astype(np.uint8), dst=image)
+
+    if OP_COLOR_JITTER in params:
+        # Hue and saturation in one per-channel lookup table, value unchanged
+        hue_shift, saturation = params[OP_COLOR_JITTER]
+        levels = np.arange(256)
+        lut = np.stack([(levels + round(hue_shift)) % 180,
+                        np.clip(levels * saturation, 0, 255), levels], axis=-1)
+        cv2.cvtColor(image, cv2.COLOR_BGR2HSV, dst=image)
+        cv2.LUT(image, lut.astype(np.uint8).reshape(1, 256, 3), dst=image)
+        cv2.cvtColor(image, cv2.COLOR_HSV2BGR, dst=image)
+
+    if OP_BLUR in params:
+        kernel = params[OP_BLUR]
+        cv2.GaussianBlur(image, (kernel, kernel), 0, dst=image)
+
+    if OP_NOISE in params:
+        # OpenCV's (per-thread) generator in int16 with a saturating add is about 3x
+        # faster than float noise from NumPy; reseeding keeps variants reproducible
+        sigma, seed = params[OP_NOISE]
+        if noise is None:
+            noise = np.empty(image.shape, dtype=np.int16)
+        cv2.setRNGSeed(seed)
+        cv2.randn(noise, (0,) * image.shape[2], (sigma,) * image.shape[2])
+        cv2.add(image, noise, dst=image, dtype=cv2.CV_8U)
+    return image
+
+
+def output_size(params, width, height):
+    """Return the (width, height) of a variant of a width x height image"""
+    return geometry_matrix(params, width, height)[1:]
+
+
+def augment(image, rows, params, min_visibility=MIN_VISIBILITY, dst=None, noise=None):
+    """
+    Render one variant of an image and its boxes
+
+    Args:
+        image: BGR uint8 source array (not modified)
+        rows: float32 (n, 5) YOLO rows of the source
+        params: Variant parameters (see sample_params)
+        min_visibility: Minimum share of a box left inside the output to keep it
+        dst: Optional contiguous uint8 array of the variant's shape (see output_size)
+            receiving the image, so a caller can reuse buffers across variants
+        noise: Optional int16 scratch array of the variant's shape
+
+    Returns:
+        Tuple (image, rows, boxes dropped)
+    """
+    height, width = image.shape[:2]
+    matrix, out_w, out_h = geometry_matrix(params, width, height)
+    rows, dropped = transform_boxes(rows, matrix, width, height, out_w, out_h, min_visibility)
+    if dst is None and any(op in params for op in PHOTOMETRIC_OPS):
+        # The colour operations work in place and must not write through a view of image
+        dst = np.empty((out_h, out_w) + image.shape[2:], dtype=np.uint8)
+    image = apply_geometry(image, matrix, out_w, out_h, dst)
+    return apply_photometric(image, params, noise), rows, dropped
@@ -3,9 +3,11 @@ Dataset Split Tab - UI for splitting datasets into train/val/test sets
 """
 
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
-                              QLineEdit, QTextEdit, QGroupBox, QSpinBox, QComboBox,
+                              QLineEdit, QGroupBox, QSpinBox, QComboBox,
                               QCheckBox, QProgressBar, QGridLayout)
 
+from src.utils.log_view import LogView
+
 
 class DatasetSplitTab(QWidget):
     """Tab for dataset splitting functionality"""
@@ -125,8 +127,7 @@ class DatasetSplitTab(QWidget):
         # Log area
         log_group = QGroupBox("Log")
         log_layout = QVBoxLayout()
-        self.log_text = QTextEdit()
-        self.log_text.setReadOnly(True)
+        self.log_text = LogView('dataset_split')
         self.log_text.setMaximumHeight(150)
         log_layout.addWidget(self.log_text)
         log_group.setLayout(log_layout)
@@ -3,10 +3,12 @@ Prefix/Postfix Tab - UI for file renaming operations
 """
 
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
-                              QLineEdit, QTextEdit, QGroupBox, QSpinBox, QComboBox,
+                              QLineEdit, QGroupBox, QSpinBox, QComboBox,
                               QCheckBox, QRadioButton, QProgressBar, QTableWidget,
                               QGridLayout)
 
+from src.utils.log_view import LogView
+
 
 class PrefixPostfixTab(QWidget):
     """Tab for prefix/postfix file renaming functionality"""
@@ -169,8 +171,7 @@ class PrefixPostfixTab(QWidget):
         # Log area
         log_group = QGroupBox("Log")
         log_layout = QVBoxLayout()
-        self.log_text = QTextEdit()
-        self.log_text.setReadOnly(True)
+        self.log_text = LogView('prefix_postfix')
         self.log_text.setMaximumHeight(150)
         log_layout.addWidget(self.log_text)
         log_group.setLayout(log_layout)
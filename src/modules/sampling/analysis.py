@@ -0,0 +1,291 @@
+"""
+Dataset analysis for Video Frame - Yolo datasets
+Pure-Python functions (no Qt imports); probes run inside worker processes
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+
+from src.utils.file_utils import split_name
+from src.utils.image_header import read_image_size
+from src.utils.stream_stats import StreamingStats
+from src.modules.sampling.dataset_index import DatasetIndex, scan_dir, KIND_IMAGE, KIND_LABEL
+from src.modules.sampling.label_store import LabelStore, parse_label_text
+
+
+class DatasetStats:
+    """Partial or merged statistics for a set of video folders
+
+    Per-file quantities are kept in StreamingStats accumulators, so memory
+    does not grow with the number of frames (except for the optional
+    LabelStore, which holds the boxes themselves).
+    """
+
+    def __init__(self):
+        self.total_images = 0
+        self.total_labels = 0
+        self.folders_with_images = 0
+        self.folder_image_counts = StreamingStats()
+        self.resolutions = {}
+        self.file_sizes = StreamingStats()
+        self.pixel_counts = StreamingStats()
+        self.annotation_counts = StreamingStats()
+        self.classes = set()
+        self.labels = None  # LabelStore with every box, when available
+
+    def add_folder(self, image_count):
+        """Account the number of images of one video folder"""
+        self.folder_image_counts.add(image_count)
+        if image_count > 0:
+            self.folders_with_images += 1
+
+    def add_images(self, sizes, widths, heights):
+        """
+        Account a batch of images
+
+        Args:
+            sizes: File sizes in bytes
+            widths: Pixel widths; 0 marks unreadable files
+            heights: Pixel heights; 0 marks unreadable files
+        """
+        self.file_sizes.add_many(sizes)
+
+        widths = np.asarray(widths, dtype=np.int64)
+        heights = np.asarray(heights, dtype=np.int64)
+        readable = (widths > 0) & (heights > 0)
+        widths, heights = widths[readable], heights[readable]
+        if widths.size == 0:
+            return
+        self.pixel_counts.add_many(widths * heights)
+
+        pairs, counts = np.unique(np.stack([widths, heights], axis=1), axis=0, return_counts=True)
+        for (width, height), count in zip(pairs.tolist(), counts.tolist()):
+            resolution = f"{width}x{height}"
+            self.resolutions[resolution] = self.resolutions.get(resolution, 0) + count
+
+    def add_labels(self, annotation_counts, class_ids):
+        """
+        Account a batch of label files
+
+        Args:
+            annotation_counts: Boxes per file; -1 marks unreadable files
+            class_ids: Iterable of class IDs seen in the batch
+        """
+        counts = np.asarray(annotation_counts, dtype=np.int64)
+        self.annotation_counts.add_many(counts[counts >= 0])
+        self.classes.update(class_ids)
+
+    def merge(self, other):
+        """
+        Merge another partial result into this one
+
+        Args:
+            other: DatasetStats produced by a worker
+
+        Returns:
+            self, to allow chaining
+        """
+        self.total_images += other.total_images
+        self.total_labels += other.total_labels
+        self.folders_with_images += other.folders_with_images
+        self.folder_image_counts.merge(other.folder_image_counts)
+        for resolution, count in other.resolutions.items():
+            self.resolutions[resolution] = self.resolutions.get(resolution, 0) + count
+        self.file_sizes.merge(other.file_sizes)
+        self.pixel_counts.merge(other.pixel_counts)
+        self.annotation_counts.merge(other.annotation_counts)
+        self.classes.update(other.classes)
+        if other.labels is not None:
+            self.labels = LabelStore.concat([self.labels, other.labels])
+        return self
+
+
+def probe_images(frames_folder, image_files):
+    """
+    Read the resolution of a chunk of frames
+
+    Args:
+        frames_folder: Folder containing the frames
+        image_files: File names inside frames_folder
+
+    Returns:
+        List of (name, width, height); unreadable files are reported as 0x0
+    """
+    records = []
+    for image_file in image_files:
+        image_path = os.path.join(frames_folder, image_file)
+        try:
+            # Parses the header bytes directly; PIL is only used for unusual files
+            width, height = read_image_size(image_path)
+            records.append((image_file, width, height))
+        except Exception:
+            records.append((image_file, 0, 0))
+    return records
+
+
+def probe_labels(labels_folder, label_files):
+    """
+    Parse a chunk of YOLO label files into box arrays
+
+    Args:
+        labels_folder: Folder containing the label files
+        label_files: File names inside labels_folder
+
+    Returns:
+        List of (name, annotation_count, class_ids, boxes) where boxes is the
+        float32 (n, 5) array as bytes; unreadable files have a count of -1
+    """
+    records = []
+    for label_file in label_files:
+        label_path = os.path.join(labels_folder, label_file)
+        try:
+            with open(label_path, 'r') as f:
+                rows = parse_label_text(f.read())
+            classes = set(rows[:, 0].astype(np.int64).tolist())
+            records.append((label_file, len(rows), classes, rows.tobytes()))
+        except Exception:
+            records.append((label_file, -1, set(), b''))
+    return records
+
+
+def iter_chunks(items, chunk_size):
+    """Yield consecutive slices of at most chunk_size items"""
+    for start in range(0, len(items), chunk_size):
+        yield items[start:start + chunk_size]
+
+
+def pool_context():
+    """Start worker processes with 'spawn': forking a process that runs Qt threads is unsafe"""
+    return multiprocessing.get_context('spawn')
+
+
+def analyze_dataset(input_path, folders, max_workers=None, chunk_size=500,
+                    progress=None, is_cancelled=None):
+    """
+    Analyze video folders on a process pool, fanning out per folder and per chunk
+
+    Only directories whose mtime changed since the last run are listed again
+    and only files missing from the dataset index are probed.
+
+    Args:
+        input_path: Folder containing the video subfolders
+        folders: Names of the video subfolders to analyze
+        max_workers: Worker processes (CPU count if None)
+        chunk_size: Files per probe task
+        progress: Optional callable(done, total, message)
+        is_cancelled: Optional callable returning True to stop early
+
+    Returns:
+        Merged DatasetStats, or None if cancelled
+    """
+    index = DatasetIndex(input_path)
+    try:
+        return _analyze(index, input_path, list(folders), max_workers or os.cpu_count() or 1,
+                        chunk_size, progress, is_cancelled)
+    finally:
+        index.close()
+
+
+def _analyze(index, input_path, folders, max_workers, chunk_size, progress, is_cancelled):
+    """Body of analyze_dataset; the caller owns the index"""
+    folders = [(folder,
+                os.path.join(input_path, folder, 'frames'),
+                os.path.join(input_path, folder, 'labels'))
+               for folder in folders]
+    dirs = [(frames_dir, KIND_IMAGE) for _, frames_dir, _ in folders] + \
+           [(labels_dir, KIND_LABEL) for _, _, labels_dir in folders]
+
+    exists = {}
+    counters = {'done': 0, 'total': 0, 'scanned': 0}
+
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=pool_context()) as executor:
+        pending = {}
+
+        # Only directories whose mtime changed since the last run are listed again
+        for dir_path, kind in dirs:
+            if index.is_fresh(dir_path):
+                exists[dir_path] = True
+                counters['scanned'] += 1
+                _submit_probes(executor, pending, index, dir_path, kind, chunk_size, counters)
+            else:
+                pending[executor.submit(scan_dir, dir_path)] = ('scan', dir_path, kind, 0)
+
+        while pending:
+            if is_cancelled is not None and is_cancelled():
+                for future in pending:
+                    future.cancel()
+                return None
+
+            done, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                task, dir_path, kind, size = pending.pop(future)
+                result = future.result()
+
+                if task == 'scan':
+                    counters['scanned'] += 1
+                    exists[dir_path] = result is not None
+                    if result is None:
+                        index.forget(dir_path)
+                        continue
+                    index.store_listing(dir_path, *result)
+                    _submit_probes(executor, pending, index, dir_path, kind, chunk_size, counters)
+                elif kind == KIND_IMAGE:
+                    index.store_image_meta(dir_path, result)
+                    counters['done'] += size
+                else:
+                    index.store_label_meta(dir_path, result)
+                    counters['done'] += size
+
+                if progress is not None:
+                    progress(counters['done'], counters['total'],
+                             f"Folders listed {counters['scanned']}/{len(dirs)}, "
+                             f"new files analyzed {counters['done']}/{counters['total']}")
+
+    # Aggregate cached and freshly probed metadata from the index
+    stats = DatasetStats()
+    blobs = []
+    label_sizes = []
+    for folder, frames_dir, labels_dir in folders:
+        if not exists.get(frames_dir) or not exists.get(labels_dir):
+            continue
+
+        image_rows = index.image_rows(frames_dir).fetchall()
+        if image_rows:
+            names, sizes, widths, heights = zip(*image_rows)
+            widths = [w or 0 for w in widths]
+            heights = [h or 0 for h in heights]
+            stats.add_images(sizes, widths, heights)
+            sizes_by_stem = {split_name(name)[0]: (w, h)
+                             for name, w, h in zip(names, widths, heights)}
+        else:
+            sizes_by_stem = {}
+        stats.total_images += len(image_rows)
+        stats.add_folder(len(image_rows))
+
+        counts = []
+        classes = set()
+        for name, annotations, class_text, boxes in index.label_rows(labels_dir):
+            counts.append(-1 if annotations is None else annotations)
+            if class_text:
+                classes.update(int(c) for c in class_text.split())
+            blobs.append(boxes or b'')
+            label_sizes.append(sizes_by_stem.get(name[:-4], (0, 0)))
+        stats.add_labels(counts, classes)
+        stats.total_labels += len(counts)
+
+    # Columnar box store for the vectorized label analytics
+    stats.labels = LabelStore.from_blobs(blobs, label_sizes if label_sizes else None)
+
+    return stats
+
+
+def _submit_probes(executor, pending, index, dir_path, kind, chunk_size, counters):
+    """Queue header/label probes for files of a directory that are not indexed yet"""
+    missing = index.missing_meta(dir_path, kind)
+    probe = probe_images if kind == KIND_IMAGE else probe_labels
+    for chunk in iter_chunks(missing, chunk_size):
+        pending[executor.submit(probe, dir_path, chunk)] = ('probe', dir_path, kind, len(chunk))
+    counters['total'] += len(missing)
@@ -0,0 +1,342 @@
+"""
+Persistent dataset index
+Caches directory listings and per-file metadata in SQLite so that repeated
+analysis and sampling runs only rescan directories that changed on disk
+"""
+
+import hashlib
+import os
+import sqlite3
+import sys
+
+from src.utils.file_utils import is_image_name
+
+
+SCHEMA_VERSION = 3
+
+KIND_DIR = 'dir'
+KIND_IMAGE = 'image'
+KIND_LABEL = 'label'
+KIND_OTHER = 'other'
+
+
+def default_cache_dir():
+    """
+    Return the per-user cache folder used for dataset indexes
+
+    Returns:
+        Path of the cache folder (not created)
+    """
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ai_data_processing_tool', 'index')
+
+
+def classify_entry(name, is_dir):
+    """Return the index kind of a directory entry"""
+    if is_dir:
+        return KIND_DIR
+    if name.endswith('.txt'):
+        return KIND_LABEL
+    if is_image_name(name):
+        return KIND_IMAGE
+    return KIND_OTHER
+
+
+def scan_dir(dir_path):
+    """
+    List one directory with size and mtime of every entry
+
+    Runs in worker processes, so it only touches the filesystem.
+
+    Args:
+        dir_path: Directory to list
+
+    Returns:
+        Tuple (dir_mtime_ns, entries) where entries is a list of
+        (name, is_dir, size, mtime_ns), or None if the directory is missing
+    """
+    try:
+        dir_mtime_ns = os.stat(dir_path).st_mtime_ns
+        entries = []
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                is_dir = entry.is_dir()
+                if is_dir:
+                    entries.append((entry.name, True, 0, 0))
+                else:
+                    st = entry.stat()
+                    entries.append((entry.name, False, st.st_size, st.st_mtime_ns))
+    except OSError:
+        return None
+    return dir_mtime_ns, entries
+
+
+class DatasetIndex:
+    """SQLite cache of directory listings and per-file metadata for one dataset root
+
+    Directories are keyed by their mtime: a directory whose mtime is unchanged
+    since the last scan is served from the index without listing it again.
+    File metadata (resolution, annotation count, class IDs, perceptual hash) is keyed by
+    path, size and mtime and survives rescans of its directory when the file
+    itself is unchanged. Files rewritten in place without any entry being
+    added, removed or renamed in their directory are not detected.
+
+    A connection must only be used from the thread that created it.
+    """
+
+    def __init__(self, root, cache_dir=None, log=None):
+        self.root = os.path.abspath(root)
+        cache_dir = cache_dir or default_cache_dir()
+        digest = hashlib.sha1(self.root.encode('utf-8')).hexdigest()[:16]
+        self.db_path = os.path.join(cache_dir, f"{digest}.sqlite")
+
+        self.conn = None
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.conn = sqlite3.connect(self.db_path, timeout=30)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self._init_schema()
+        except (OSError, sqlite3.Error) as e:
+            # Read-only home or cache folder: index this run in memory instead
+            if self.conn is not None:
+                self.conn.close()
+            (log or print)(f"Warning: Cannot open the dataset index in {cache_dir} ({e}); "
+                           f"using a temporary in-memory index")
+            self.db_path = ':memory:'
+            self.conn = sqlite3.connect(self.db_path)
+            self._init_schema()
+
+    def _init_schema(self):
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self.conn.executescript("""
+                DROP TABLE IF EXISTS dirs;
+                DROP TABLE IF EXISTS files;
+            """)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS dirs (
+                dir TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS files (
+                dir TEXT NOT NULL,
+                name TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                width INTEGER,
+                height INTEGER,
+                annotations INTEGER,
+                classes TEXT,
+                boxes BLOB,
+                dhash INTEGER,
+                PRIMARY KEY (dir, name)
+            ) WITHOUT ROWID;
+        """)
+        self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def _key(self, dir_path):
+        """Store directories relative to the dataset root"""
+        return os.path.relpath(os.path.abspath(dir_path), self.root)
+
+    def is_fresh(self, dir_path):
+        """
+        Check whether the cached listing of a directory is still valid
+
+        Args:
+            dir_path: Directory to check
+
+        Returns:
+            True if the directory exists and its mtime matches the index
+        """
+        try:
+            mtime_ns = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            return False
+        row = self.conn.execute("SELECT mtime_ns FROM dirs WHERE dir = ?",
+                                (self._key(dir_path),)).fetchone()
+        return row is not None and row[0] == mtime_ns
+
+    def store_listing(self, dir_path, dir_mtime_ns, entries):
+        """
+        Replace the cached listing of a directory
+
+        Metadata of files whose size and mtime are unchanged is carried over.
+
+        Args:
+            dir_path: Directory that was scanned
+            dir_mtime_ns: mtime of the directory at scan time
+            entries: List of (name, is_dir, size, mtime_ns) from scan_dir
+        """
+        key = self._key(dir_path)
+        previous = {row[0]: row[1:] for row in self.conn.execute(
+            "SELECT name, size, mtime_ns, width, height, annotations, classes, boxes, dhash "
+            "FROM files WHERE dir = ?", (key,))}
+
+        rows = []
+        for name, is_dir, size, mtime_ns in entries:
+            meta = (None, None, None, None, None, None)
+            old = previous.get(name)
+            if old is not None and old[0] == size and old[1] == mtime_ns:
+                meta = old[2:]
+            rows.append((key, name, classify_entry(name, is_dir), size, mtime_ns) + tuple(meta))
+
+        with self.conn:
+            self.conn.execute("DELETE FROM files WHERE dir = ?", (key,))
+            self.conn.executemany("INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?)", (key, dir_mtime_ns))
+
+    def forget(self, dir_path):
+        """Drop a directory (e.g. one that no longer exists) from the index"""
+        key = self._key(dir_path)
+        with self.conn:
+            self.conn.execute("DELETE FROM files WHERE dir = ?", (key,))
+            self.conn.execute("DELETE FROM dirs WHERE dir = ?", (key,))
+
+    def refresh(self, dir_path):
+        """
+        Rescan a directory if its mtime changed since the last scan
+
+        Args:
+            dir_path: Directory to refresh
+
+        Returns:
+            True if the directory exists (cached or rescanned), False otherwise
+        """
+        if self.is_fresh(dir_path):
+            return True
+        result = scan_dir(dir_path)
+        if result is None:
+            self.forget(dir_path)
+            return False
+        self.store_listing(dir_path, *result)
+        return True
+
+    def names(self, dir_path, kind):
+        """
+        Return cached entry names of one kind, rescanning the directory if stale
+
+        Args:
+            dir_path: Directory to list
+            kind: One of KIND_DIR, KIND_IMAGE, KIND_LABEL, KIND_OTHER
+
+        Returns:
+            List of names, empty if the directory does not exist
+        """
+        if not self.refresh(dir_path):
+            return []
+        return [row[0] for row in self.conn.execute(
+            "SELECT name FROM files WHERE dir = ? AND kind = ?", (self._key(dir_path), kind))]
+
+    def listing(self, dir_path, kind):
+        """
+        Return cached (name, size) of entries of one kind, rescanning the directory if stale
+
+        Args:
+            dir_path: Directory to list
+            kind: One of KIND_DIR, KIND_IMAGE, KIND_LABEL, KIND_OTHER
+
+        Returns:
+            List of (name, size), or None if the directory does not exist
+        """
+        if not self.refresh(dir_path):
+            return None
+        return self.conn.execute("SELECT name, size FROM files WHERE dir = ? AND kind = ?",
+                                 (self._key(dir_path), kind)).fetchall()
+
+    def missing_meta(self, dir_path, kind):
+        """Return names of images/labels in a directory that have no metadata yet"""
+        column = 'width' if kind == KIND_IMAGE else 'annotations'
+        return [row[0] for row in self.conn.execute(
+            f"SELECT name FROM files WHERE dir = ? AND kind = ? AND {column} IS NULL",
+            (self._key(dir_path), kind))]
+
+    def store_image_meta(self, dir_path, records):
+        """
+        Store probed image resolutions
+
+        Args:
+            dir_path: Directory containing the images
+            records: List of (name, width, height); 0x0 marks unreadable files
+        """
+        key = self._key(dir_path)
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE files SET width = ?, height = ? WHERE dir = ? AND name = ?",
+                [(width, height, key, name) for name, width, height in records])
+
+    def store_label_meta(self, dir_path, records):
+        """
+        Store parsed label metadata
+
+        Args:
+            dir_path: Directory containing the labels
+            records: List of (name, annotation_count, class_ids, boxes) where
+                class_ids is an iterable of ints and boxes the float32 (n, 5) rows
+                as bytes; a count of -1 marks unreadable files
+        """
+        key = self._key(dir_path)
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE files SET annotations = ?, classes = ?, boxes = ? WHERE dir = ? AND name = ?",
+                [(count, ' '.join(str(c) for c in sorted(classes)), boxes, key, name)
+                 for name, count, classes, boxes in records])
+
+    def image_rows(self, dir_path):
+        """Yield (name, size, width, height) for every indexed image of a directory"""
+        return self.conn.execute(
+            "SELECT name, size, width, height FROM files WHERE dir = ? AND kind = ?",
+            (self._key(dir_path), KIND_IMAGE))
+
+    def label_rows(self, dir_path):
+        """Yield (name, annotations, classes, boxes) for every indexed label of a directory"""
+        return self.conn.execute(
+            "SELECT name, annotations, classes, boxes FROM files WHERE dir = ? AND kind = ?",
+            (self._key(dir_path), KIND_LABEL))
+
+    def store_hashes(self, dir_path, records):
+        """
+        Store perceptual hashes of images
+
+        Args:
+            dir_path: Directory containing the images
+            records: List of (name, hash) with 64-bit unsigned hashes; None for unreadable files
+        """
+        key = self._key(dir_path)
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE files SET dhash = ? WHERE dir = ? AND name = ?",
+                [(None if h is None else h - (1 << 64) if h >= (1 << 63) else h, key, name)
+                 for name, h in records])
+
+    def hashes(self, dir_path, names):
+        """
+        Return cached perceptual hashes of some images of a directory
+
+        Args:
+            dir_path: Directory containing the images
+            names: Image names to look up
+
+        Returns:
+            Dict {name: unsigned 64-bit hash} for the names that have one
+        """
+        key = self._key(dir_path)
+        result = {}
+        names = list(names)
+        # Stay below SQLite's bound parameter limit
+        for start in range(0, len(names), 500):
+            chunk = names[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT name, dhash FROM files WHERE dir = ? AND dhash IS NOT NULL "
+                f"AND name IN ({', '.join('?' * len(chunk))})", [key] + chunk)
+            for name, h in rows:
+                result[name] = h & 0xFFFFFFFFFFFFFFFF
+        return result
@@ -0,0 +1,203 @@
+"""
+Near-duplicate frame suppression
+Perceptual (difference) hashes computed in worker processes and cached in the
+dataset index, and a multi-index hash table to reject frames too close to those
+already kept
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from src.modules.sampling.analysis import pool_context, iter_chunks
+
+
+HASH_SIZE = 8  # 8x8 gradient bits = 64-bit hash
+
+
+def dhash(image_path, hash_size=HASH_SIZE):
+    """
+    Compute the difference hash of an image
+
+    JPEGs are decoded at reduced scale (DCT scaling via draft), so the cost
+    is a fraction of a full decode.
+
+    Args:
+        image_path: Path of the image
+        hash_size: Hash is hash_size x hash_size bits
+
+    Returns:
+        Unsigned integer hash
+    """
+    with Image.open(image_path) as img:
+        img.draft('L', (hash_size * 4, hash_size * 4))
+        small = img.convert('L').resize((hash_size + 1, hash_size), Image.BOX)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+def probe_hashes(frames_folder, image_files):
+    """
+    Hash a chunk of frames (runs in worker processes)
+
+    Args:
+        frames_folder: Folder containing the frames
+        image_files: File names inside frames_folder
+
+    Returns:
+        List of (name, hash); hash is None for unreadable files
+    """
+    records = []
+    for image_file in image_files:
+        try:
+            records.append((image_file, dhash(os.path.join(frames_folder, image_file))))
+        except Exception:
+            records.append((image_file, None))
+    return records
+
+
+CHUNK_BITS = 16
+CHUNKS = 64 // CHUNK_BITS
+
+_masks_cache = {}
+
+
+def _chunk_masks(radius):
+    """All CHUNK_BITS-bit masks with at most radius bits set"""
+    masks = _masks_cache.get(radius)
+    if masks is None:
+        masks = [m for m in range(1 << CHUNK_BITS) if bin(m).count('1') <= radius]
+        _masks_cache[radius] = masks
+    return masks
+
+
+class HashIndex:
+    """Multi-index hashing over 64-bit hashes for Hamming range queries
+
+    Each hash is split into 4 chunks of 16 bits, each chunk keyed in its own
+    table. If two hashes are within distance k, one of their chunks differs
+    in at most k // 4 bits (pigeonhole), so a query only probes the buckets
+    of chunk values within that radius and verifies the few candidates
+    found. The cost does not grow with the number of stored hashes; when
+    probing would take more lookups than comparing against every stored
+    hash, it compares directly instead.
+    """
+
+    def __init__(self):
+        self.tables = [{} for _ in range(CHUNKS)]
+        self.hashes = []
+
+    def add(self, h):
+        self.hashes.append(h)
+        for i, table in enumerate(self.tables):
+            table.setdefault((h >> (i * CHUNK_BITS)) & 0xFFFF, []).append(h)
+
+    def has_within(self, h, k):
+        """Return True if some stored hash is within Hamming distance k of h"""
+        masks = _chunk_masks(k // CHUNKS) if k // CHUNKS <= 4 else None
+        if masks is None or len(masks) * CHUNKS > len(self.hashes):
+            return any(hamming(h, other) <= k for other in self.hashes)
+
+        for i, table in enumerate(self.tables):
+            chunk = (h >> (i * CHUNK_BITS)) & 0xFFFF
+            for mask in masks:
+                bucket = table.get(chunk ^ mask)
+                if bucket is not None:
+                    for other in bucket:
+                        if hamming(h, other) <= k:
+                            return True
+        return False
+
+    def __len__(self):
+        return len(self.hashes)
+
+
+def select_diverse(table, order, count, distance, index, max_workers=None, log=None,
+                   is_cancelled=None, batch_size=256):
+    """
+    Walk candidate frames in order, keeping those not near-duplicates of kept ones
+
+    Only candidates actually examined are hashed, in batches on a process
+    pool, and new hashes are written to the dataset index.
+
+    Args:
+        table: PairTable of the candidate pairs
+        order: Sequence of table rows in the order they should be considered
+        count: Number of frames wanted
+        distance: Frames within this Hamming distance of a kept frame are skipped
+        index: DatasetIndex used as hash cache
+        max_workers: Hashing processes (default: CPU count)
+        log: Optional callable receiving messages
+        is_cancelled: Optional callable checked between batches
+        batch_size: Minimum candidates hashed per batch
+
+    Returns:
+        Tuple (kept_rows, skipped) where skipped counts rejected near-duplicates
+    """
+    kept_hashes = HashIndex()
+    kept = []
+    skipped = 0
+    position = 0
+
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count() or 1,
+                             mp_context=pool_context()) as executor:
+        while len(kept) < count and position < len(order):
+            if is_cancelled is not None and is_cancelled():
+                break
+
+            # Examine a few times the number of frames still missing
+            size = max(batch_size, 2 * (count - len(kept)))
+            batch = [int(row) for row in order[position:position + size]]
+            position += len(batch)
+            hashes = _batch_hashes(table, batch, index, executor)
+
+            for row in batch:
+                h = hashes.get(row)
+                if h is not None:
+                    if kept_hashes.has_within(h, distance):
+                        skipped += 1
+                        continue
+                    kept_hashes.add(h)
+                kept.append(row)
+                if len(kept) == count:
+                    break
+
+            if log is not None:
+                log(f"Examined {position} frame(s): kept {len(kept)}, "
+                    f"skipped {skipped} near-duplicate(s)")
+
+    return kept, skipped
+
+
+def _batch_hashes(table, rows, index, executor):
+    """Return {row: hash} for a batch of table rows, hashing uncached frames in parallel"""
+    by_folder = {}
+    for row in rows:
+        by_folder.setdefault(table.folder_ids[row], []).append(row)
+
+    hashes = {}
+    futures = []
+    for folder_id, folder_rows in by_folder.items():
+        frames_dir = table.dirs[folder_id][0]
+        names = {table.filename(row): row for row in folder_rows}
+        cached = index.hashes(frames_dir, names)
+        for name, h in cached.items():
+            hashes[names[name]] = h
+        missing = [name for name in names if name not in cached]
+        for chunk in iter_chunks(missing, 32):
+            futures.append((frames_dir, names, executor.submit(probe_hashes, frames_dir, chunk)))
+
+    for frames_dir, names, future in futures:
+        records = future.result()
+        index.store_hashes(frames_dir, records)
+        for name, h in records:
+            if h is not None:
+                hashes[names[name]] = h
+    return hashes
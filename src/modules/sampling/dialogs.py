@@ -0,0 +1,68 @@
+"""
+Dialogs shared by the sampling modes
+"""
+
+from PySide6.QtWidgets import QMessageBox
+
+from src.utils.materialize import MODE_COPY
+from src.utils.shards import MODE_TAR
+from src.utils.packed import MODE_PACKED
+from src.modules.augmentation.recipes import MODE_RECIPES
+from src.modules.sampling.engine import ON_EXISTING_KEEP, ON_EXISTING_DELETE, ON_EXISTING_ABORT
+
+
+def ask_existing_files(parent, existing_images, existing_labels, mode=MODE_COPY, journal=None):
+    """
+    Ask the user what to do with files already in the output folders
+
+    Args:
+        parent: Parent widget of the dialog
+        existing_images: Names of existing output images
+        existing_labels: Names of existing output labels
+        mode: Output mode; for MODE_TAR the lists are shards and their index files,
+            for MODE_PACKED and MODE_RECIPES the table files and leftovers of a
+            stopped job
+        journal: Optional (done, total, completed) of the job journaled in the
+            output folder (see journal_progress)
+
+    Returns:
+        ON_EXISTING_DELETE, ON_EXISTING_KEEP or ON_EXISTING_ABORT
+    """
+    msg_box = QMessageBox(parent)
+    msg_box.setIcon(QMessageBox.Warning)
+    msg_box.setWindowTitle("Existing Files Found")
+    if mode == MODE_TAR:
+        kinds = ("shard(s)", "shard index file(s)")
+    elif mode == MODE_PACKED:
+        kinds = ("packed dataset file(s)", "other file(s)")
+    elif mode == MODE_RECIPES:
+        kinds = ("recipe file(s)", "other file(s)")
+    else:
+        kinds = ("image(s)", "label(s)")
+    msg_box.setText(f"The output folders already contain files:\n"
+                    f"- {len(existing_images)} {kinds[0]}\n"
+                    f"- {len(existing_labels)} {kinds[1]}\n\n"
+                    f"Do you want to delete all existing files before sampling?")
+    keep_text = "No: Keep existing files (may overwrite files with same names)\n"
+    if journal is not None and not journal[2] and mode not in (MODE_PACKED, MODE_RECIPES):
+        # Tar jobs are journaled by their shard indexes, not per pair
+        done = "wrote shards" if mode == MODE_TAR else f"placed {journal[0]} of {journal[1]} pairs"
+        msg_box.setText(msg_box.text() + f"\n\nAn interrupted job {done} here.")
+        keep_text = ("No: Keep existing files; the same job (same dataset, settings and seed)\n"
+                     "     resumes where it stopped\n")
+    msg_box.setInformativeText("Yes: Delete all existing files and start fresh\n"
+                               + keep_text +
+                               "Cancel: Abort sampling operation")
+
+    yes_btn = msg_box.addButton("Yes", QMessageBox.YesRole)
+    msg_box.addButton("No", QMessageBox.NoRole)
+    cancel_btn = msg_box.addButton("Cancel", QMessageBox.RejectRole)
+
+    msg_box.exec()
+    clicked_button = msg_box.clickedButton()
+
+    if clicked_button == cancel_btn:
+        return ON_EXISTING_ABORT
+    elif clicked_button == yes_btn:
+        return ON_EXISTING_DELETE
+    return ON_EXISTING_KEEP
@@ -0,0 +1,761 @@
+"""
+Headless sampling engine for Video Frame - Yolo datasets
+Pairing, sampling and materialization without any Qt dependency, shared by
+the GUI and the command line interface
+"""
+
+import os
+import random
+
+import numpy as np
+
+from src.utils.file_utils import split_name
+from src.utils.materialize import Materializer, MODE_COPY
+from src.utils.shards import write_shards, indexed_keys, MODE_TAR, DEFAULT_SHARD_SIZE
+from src.utils.packed import write_packed, MODE_PACKED, PACKED_FILES
+from src.utils.journal import JobJournal, job_fingerprint, remove_journal
+from src.modules.sampling.dataset_index import DatasetIndex, KIND_DIR, KIND_LABEL
+from src.modules.sampling.walker import walk_pairs, list_subdirs
+from src.modules.sampling.pair_table import PairTable
+from src.modules.sampling.samplers import (reservoir_sample, class_aware_sample, ClassIndex,
+                                           WEIGHT_UNIFORM)
+from src.modules.sampling.analysis import probe_labels, iter_chunks
+from src.modules.sampling.label_store import parse_label_text
+from src.modules.sampling.dedup import select_diverse
+
+
+# What to do with files already present in the output folders
+ON_EXISTING_KEEP = 'keep'
+ON_EXISTING_DELETE = 'delete'
+ON_EXISTING_ABORT = 'abort'
+
+
+class SamplingError(Exception):
+    """Raised when a sampling job cannot run (bad paths, nothing to sample, ...)"""
+
+
+class SamplingCancelled(SamplingError):
+    """Raised when the user declines to continue a sampling job"""
+
+
+def print_log(message):
+    """Default log callable of the headless jobs: print to stdout"""
+    print(message)
+
+
+def check_cancelled(is_cancelled):
+    """Raise SamplingCancelled if is_cancelled (optional callable) returns True"""
+    if is_cancelled is not None and is_cancelled():
+        raise SamplingCancelled("Sampling stopped by user")
+
+
+def list_video_folders(input_path, index=None):
+    """
+    List the video subfolders of an input folder
+
+    Args:
+        input_path: Folder containing one subfolder per video
+        index: Optional DatasetIndex to serve the listing from
+
+    Returns:
+        Sorted list of subfolder names
+    """
+    if not input_path or not os.path.isdir(input_path):
+        raise SamplingError("Invalid input folder path")
+    if index is not None:
+        return sorted(index.names(input_path, KIND_DIR))
+    return list_subdirs(input_path)
+
+
+def collect_pairs(input_path, folders, index=None, log=print_log, is_cancelled=None):
+    """
+    Collect image/label pairs from the 'frames' and 'labels' folders of each video folder
+
+    Args:
+        input_path: Folder containing the video subfolders
+        folders: Names of the video subfolders to use
+        index: Optional DatasetIndex; a temporary one is opened if None
+        log: Callable receiving progress/warning messages
+        is_cancelled: Optional callable returning True to stop early
+
+    Returns:
+        PairTable of all pairs
+
+    Raises:
+        SamplingCancelled: If is_cancelled returned True
+    """
+    own_index = index is None
+    if own_index:
+        index = DatasetIndex(input_path, log=log)
+
+    try:
+        table = PairTable.from_walk(walk_pairs(input_path, folders, index=index, log=log,
+                                               is_cancelled=is_cancelled))
+    finally:
+        if own_index:
+            index.close()
+
+    check_cancelled(is_cancelled)
+    return table
+
+
+def sample_pairs(pairs, sample_size, random_seed, log=print_log):
+    """
+    Randomly sample pairs, reproducibly for a given seed
+
+    Args:
+        pairs: PairTable from collect_pairs
+        sample_size: Number of pairs to draw
+        random_seed: Seed for the random generator
+        log: Callable receiving messages
+
+    Returns:
+        List of sampled pair dicts (all pairs if sample_size exceeds their number)
+    """
+    rng = random.Random(random_seed)
+
+    if sample_size > len(pairs):
+        log(f"Warning: Sample size ({sample_size}) is larger than available pairs ({len(pairs)})")
+        log("Using all available pairs instead")
+        return pairs.pairs(range(len(pairs)))
+    # Sampling indices draws the same pairs as sampling a list of the pairs
+    return pairs.pairs(rng.sample(range(len(pairs)), sample_size))
+
+
+def parse_class_quotas(text):
+    """
+    Parse per-class quotas written as "class=frames" pairs
+
+    Args:
+        text: e.g. "0=100, 3=50" (':' also accepted as separator); empty for none
+
+    Returns:
+        Dict {class_id: frames}
+
+    Raises:
+        SamplingError: If an entry is malformed
+    """
+    quotas = {}
+    for item in text.replace(';', ',').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        class_id, sep, frames = item.replace(':', '=').partition('=')
+        try:
+            if not sep:
+                raise ValueError
+            quotas[int(class_id)] = int(frames)
+        except ValueError:
+            raise SamplingError(f"Invalid class quota '{item}', expected CLASS=FRAMES")
+    return quotas
+
+
+def output_folders(output_path, mode=MODE_COPY):
+    """
+    Return the (images, labels) output folders of a job; both are 'shards' for
+    MODE_TAR and 'packed' for MODE_PACKED
+    """
+    if mode in (MODE_TAR, MODE_PACKED):
+        folder = os.path.join(output_path, 'shards' if mode == MODE_TAR else 'packed')
+        return folder, folder
+    return os.path.join(output_path, 'images'), os.path.join(output_path, 'labels')
+
+
+def find_existing_outputs(output_path, mode=MODE_COPY):
+    """
+    List files already present in the output folders
+
+    Args:
+        output_path: Output folder of the job
+        mode: Output mode; MODE_TAR and MODE_PACKED look at their single folder
+
+    Returns:
+        Tuple (existing_images, existing_labels) of file names; for MODE_TAR,
+        (shard files, other files such as the shard indexes), for MODE_PACKED,
+        (packed dataset files, other files such as leftovers of a stopped job)
+    """
+    if mode in (MODE_TAR, MODE_PACKED):
+        try:
+            with os.scandir(output_folders(output_path, mode)[0]) as it:
+                names = [entry.name for entry in it if entry.is_file()]
+        except OSError:
+            names = []
+        if mode == MODE_TAR:
+            main = [name for name in names if name.endswith('.tar')]
+        else:
+            main = [name for name in names if name in PACKED_FILES]
+        return main, [name for name in names if name not in main]
+
+    existing = []
+    for folder in output_folders(output_path):
+        try:
+            with os.scandir(folder) as it:
+                existing.append([entry.name for entry in it if entry.is_file()])
+        except OSError:
+            existing.append([])
+    return tuple(existing)
+
+
+def prepare_output(output_path, on_existing=ON_EXISTING_KEEP, log=print_log, mode=MODE_COPY):
+    """
+    Create the output folders and handle files already in them
+
+    Args:
+        output_path: Output folder of the job
+        on_existing: ON_EXISTING_KEEP, ON_EXISTING_DELETE or ON_EXISTING_ABORT, or a
+            callable(existing_images, existing_labels) returning one of them
+            (e.g. to ask the user)
+        log: Callable receiving messages
+        mode: Output mode; MODE_TAR and MODE_PACKED prepare their single folder
+
+    Returns:
+        Tuple (images_folder, labels_folder)
+
+    Raises:
+        SamplingError: If the policy is ON_EXISTING_ABORT and files exist
+        SamplingCancelled: If the callable chose ON_EXISTING_ABORT
+    """
+    output_images_folder, output_labels_folder = output_folders(output_path, mode)
+    os.makedirs(output_images_folder, exist_ok=True)
+    os.makedirs(output_labels_folder, exist_ok=True)
+
+    existing_images, existing_labels = find_existing_outputs(output_path, mode)
+    if existing_images or existing_labels:
+        if callable(on_existing):
+            on_existing = on_existing(existing_images, existing_labels)
+            if on_existing == ON_EXISTING_ABORT:
+                raise SamplingCancelled("Sampling cancelled by user")
+
+        if on_existing == ON_EXISTING_ABORT:
+            raise SamplingError(f"Output folders already contain {len(existing_images)} image(s) "
+                                f"and {len(existing_labels)} label(s)")
+        elif on_existing == ON_EXISTING_DELETE:
+            log("Deleting existing files...")
+            for img_file in existing_images:
+                os.remove(os.path.join(output_images_folder, img_file))
+            for lbl_file in existing_labels:
+                os.remove(os.path.join(output_labels_folder, lbl_file))
+            remove_journal(output_path)
+            log(f"Deleted {len(existing_images)} image(s) and {len(existing_labels)} label(s)")
+        else:
+            if mode == MODE_TAR:
+                log("Keeping existing shards (new shards are numbered after them; "
+                    "an interrupted run of the same job resumes)")
+            elif mode == MODE_PACKED:
+                log("The existing packed dataset is replaced once the new one is complete")
+            else:
+                log("Keeping existing files (may overwrite files with same names; "
+                    "an interrupted run of the same job resumes)")
+
+    log(f"Output folder ready: {output_images_folder}")
+    if output_labels_folder != output_images_folder:
+        log(f"Output folder ready: {output_labels_folder}")
+    return output_images_folder, output_labels_folder
+
+
+def materialize_pairs(pairs, output_path, mode=MODE_COPY, max_workers=None, log=print_log,
+                      progress=None, is_cancelled=None, shard_size=DEFAULT_SHARD_SIZE):
+    """
+    Place sampled pairs into the 'images' and 'labels' output folders
+
+    Finished pairs are journaled in the output folder; when it holds the
+    journal of an interrupted run of the same job (same pairs and mode),
+    pairs whose outputs are unchanged since are skipped.
+
+    Args:
+        pairs: Sampled pairs
+        output_path: Output folder (prepared with prepare_output)
+        mode: MODE_COPY, MODE_HARDLINK, MODE_REFLINK or MODE_SYMLINK; unsupported
+            modes fall back automatically (ultimately to a full copy). MODE_TAR
+            streams the pairs into tar shards in the 'shards' folder instead,
+            MODE_PACKED into one packed dataset in the 'packed' folder
+        max_workers: Threads placing (or, for MODE_TAR and MODE_PACKED, reading)
+            files in parallel
+        log: Callable receiving messages
+        progress: Optional callable(done, total)
+        is_cancelled: Optional callable returning True to stop early
+        shard_size: Maximum bytes per shard with MODE_TAR
+
+    Returns:
+        Number of pairs placed, including those done by an interrupted run
+    """
+    if mode == MODE_PACKED:
+        return _write_pair_packed(pairs, output_path, max_workers, log, progress, is_cancelled)
+
+    journal, items, pending = resume_state(pairs, output_path, mode)
+    skipped = len(items) - len(pending)
+    if journal.resumed:
+        log(f"Resuming: an earlier run of this job already did {skipped} of {len(items)} pairs")
+        if mode == MODE_TAR:
+            _remove_unindexed_shards(output_path, log)
+    if progress is not None and skipped:
+        def progress(done, total, report=progress):
+            report(skipped + done, skipped + total)
+
+    journal.start()
+    with journal:
+        if mode == MODE_TAR:
+            placed = _write_pair_shards(pending, output_path, shard_size, max_workers, log,
+                                        progress, is_cancelled, journal)
+        else:
+            materializer = Materializer(mode, max_workers=max_workers, log=log)
+            placed = materializer.run(pending, progress=progress, is_cancelled=is_cancelled,
+                                      on_done=journal.record)
+            used = ", ".join(f"{count} {m}" for m, count in materializer.counts.items() if count)
+            if used:
+                log(f"Files placed: {used}")
+        journal.close(completed=placed == len(pending))
+    return skipped + placed
+
+
+def _pair_tasks(pairs, output_path):
+    """Materializer tasks placing each pair's image and label"""
+    output_images_folder, output_labels_folder = output_folders(output_path)
+    tasks = []
+    for pair in pairs:
+        label_filename = split_name(pair['filename'])[0] + '.txt'
+        tasks.append([(pair['image'], os.path.join(output_images_folder, pair['filename'])),
+                      (pair['label'], os.path.join(output_labels_folder, label_filename))])
+    return tasks
+
+
+def _shard_samples(pairs):
+    """Tar shard samples: (key, [(member suffix, source path), ...]) per pair"""
+    return [(key, [(split_name(pair['filename'])[1], pair['image']), ('.txt', pair['label'])])
+            for key, pair in zip(shard_keys(pairs), pairs)]
+
+
+def resume_state(pairs, output_path, mode=MODE_COPY):
+    """
+    Match a job against the journal an earlier run left in the output folder
+
+    Args:
+        pairs: Sampled pairs
+        output_path: Output folder of the job
+        mode: Output mode other than MODE_PACKED (packed datasets are always written whole)
+
+    Returns:
+        Tuple (journal, items, pending): the JobJournal of the job (journal.resumed
+        tells whether an earlier run matched), the materializer tasks (tar shard
+        samples for MODE_TAR) of all pairs, and those still to do
+    """
+    if mode == MODE_TAR:
+        items = _shard_samples(pairs)
+        tasks = [[(path, key + suffix) for suffix, path in members] for key, members in items]
+    else:
+        items = tasks = _pair_tasks(pairs, output_path)
+    journal = JobJournal(output_path, job_fingerprint(mode, tasks), mode, len(items))
+    pending = items
+    if journal.load():
+        if mode == MODE_TAR:
+            # Shards this job closed are journaled; their index files list the keys they hold.
+            # Other shards in the folder (e.g. kept from another job) are not trusted
+            shards = [os.path.basename(rel) for rel in journal.done_outputs()]
+            done_keys = indexed_keys(output_folders(output_path, MODE_TAR)[0], shards)[0]
+            pending = [sample for sample in items if sample[0] not in done_keys]
+        else:
+            pending = [task for task in tasks if not journal.is_done(task)]
+    return journal, items, pending
+
+
+def report_remaining(pairs, output_path, mode=MODE_COPY, log=print_log):
+    """
+    Log how much of a job is left, without writing anything (dry run)
+
+    Args:
+        pairs: Sampled pairs
+        output_path: Output folder of the job
+        mode: Output mode of the job
+        log: Callable receiving messages
+
+    Returns:
+        Number of pairs a real run would place
+    """
+    if mode == MODE_PACKED:
+        log(f"Dry run: {len(pairs)} pairs would be packed (packed datasets are always written whole)")
+        return len(pairs)
+
+    journal, items, pending = resume_state(pairs, output_path, mode)
+    if journal.resumed:
+        log(f"Dry run: an earlier run of this job already did {len(items) - len(pending)} "
+            f"of {len(items)} pairs; {len(pending)} remaining")
+    else:
+        log(f"Dry run: no journal of this job in the output folder; all {len(items)} pairs remaining")
+        existing_images, existing_labels = find_existing_outputs(output_path, mode)
+        if existing_images or existing_labels:
+            log(f"The output folders already hold {len(existing_images) + len(existing_labels)} "
+                f"file(s), handled by the existing-files policy")
+    return len(pending)
+
+
+def place_sampled_pairs(pairs, output_path, mode=MODE_COPY, on_existing=ON_EXISTING_KEEP,
+                        max_workers=None, shard_size=DEFAULT_SHARD_SIZE, dry_run=False,
+                        log=print_log, progress=None, is_cancelled=None):
+    """
+    Write sampled pairs to the output folder and log the job summary
+
+    The steps every sampling mode ends with: unique output names, output
+    folder preparation, placement (see materialize_pairs), or only a report
+    of the remaining work for a dry run.
+
+    Args:
+        pairs: Sampled pairs (renamed in place where their names collide)
+        output_path: Output folder
+        mode: How files are placed (see materialize_pairs)
+        on_existing: Policy for files already in the output folders
+        max_workers: Threads placing files in parallel
+        shard_size: Maximum bytes per shard with MODE_TAR
+        dry_run: Only report what a real run would do
+        log: Callable receiving messages
+        progress: Optional callable(done, total)
+        is_cancelled: Optional callable returning True to stop early
+
+    Returns:
+        Number of pairs placed (0 for a dry run)
+    """
+    unique_output_names(pairs, log=log)
+
+    if dry_run:
+        report_remaining(pairs, output_path, mode, log=log)
+        log("=" * 50)
+        return 0
+
+    log("Step 3: Preparing output folders...")
+    prepare_output(output_path, on_existing, log=log, mode=mode)
+
+    log(f"Step 4: Copying files ({mode})...")
+    copied = materialize_pairs(pairs, output_path, mode=mode, max_workers=max_workers, log=log,
+                               progress=progress, is_cancelled=is_cancelled, shard_size=shard_size)
+
+    log("=" * 50)
+    if copied < len(pairs):
+        log(f"Sampling stopped: {copied}/{len(pairs)} image/label pairs copied")
+    else:
+        log("✓ Sampling completed successfully!")
+        log(f"✓ {copied} image/label pairs copied to output folder")
+    log("=" * 50)
+    return copied
+
+
+def unique_output_names(pairs, log=print_log):
+    """
+    Rename sampled pairs whose output names collide
+
+    Pairs from different folders often share a file stem (every video folder
+    numbers its frames from f0000, images/val/0001.jpg meets images/train/
+    0001.jpg). Colliding pairs get their folder prefixed (images_val_0001.jpg),
+    and a counter if that is not enough, so every pair writes its own image
+    and label. Stems are compared, as a.jpg and a.png share the label a.txt.
+
+    Args:
+        pairs: Sampled pair dicts, modified in place
+        log: Callable receiving messages
+
+    Returns:
+        The pairs
+    """
+    stems = [split_name(pair['filename'])[0] for pair in pairs]
+    counts = {}
+    for stem in stems:
+        counts[stem] = counts.get(stem, 0) + 1
+
+    used = set()
+    renamed = 0
+    for stem, pair in zip(stems, pairs):
+        if counts[stem] > 1:
+            base = f"{pair['folder'].replace(os.sep, '_').replace('/', '_')}_{stem}"
+        else:
+            base = stem
+        unique, n = base, 1
+        while unique in used:
+            unique = f"{base}_{n}"
+            n += 1
+        used.add(unique)
+        if unique != stem:
+            pair['filename'] = unique + pair['filename'][len(stem):]
+            renamed += 1
+    if renamed:
+        log(f"Renamed {renamed} file(s) whose names occur in several folders")
+    return pairs
+
+
+def shard_keys(pairs):
+    """
+    Return one WebDataset key per pair
+
+    Keys are the file stems with dots replaced (readers split member names
+    at the first dot); stems occurring in several folders get the folder
+    prepended, and a counter if that is not enough.
+
+    Args:
+        pairs: Sampled pairs
+
+    Returns:
+        List of keys aligned with pairs
+    """
+    def clean(text):
+        return text.replace('.', '_').replace('/', '_').replace(os.sep, '_')
+
+    stems = [clean(split_name(pair['filename'])[0]) for pair in pairs]
+    counts = {}
+    for stem in stems:
+        counts[stem] = counts.get(stem, 0) + 1
+
+    keys = []
+    used = set()
+    for stem, pair in zip(stems, pairs):
+        key = stem if counts[stem] == 1 else f"{clean(pair['folder'])}_{stem}"
+        unique, n = key, 1
+        while unique in used:
+            unique = f"{key}_{n}"
+            n += 1
+        used.add(unique)
+        keys.append(unique)
+    return keys
+
+
+def _write_pair_shards(samples, output_path, shard_size, max_workers, log, progress, is_cancelled,
+                       journal):
+    """Stream shard samples into tar shards as <key>.<image ext> and <key>.txt members"""
+    def on_shard(shard_path, index_path):
+        journal.record([(None, shard_path), (None, index_path)], flush=True)
+
+    writer = write_shards(samples, output_folders(output_path, MODE_TAR)[0], shard_size=shard_size,
+                          max_workers=max_workers, progress=progress, is_cancelled=is_cancelled,
+                          on_shard=on_shard)
+    log(f"Wrote {len(writer.shards)} shard(s), {writer.bytes / (1 << 20):.1f} MB "
+        f"({', '.join(os.path.basename(path) for path in writer.shards[:3])}"
+        f"{', ...' if len(writer.shards) > 3 else ''})")
+    return writer.samples
+
+
+def _remove_unindexed_shards(output_path, log):
+    """Delete shards a killed run left without an index (their samples are written again)"""
+    shards_folder = output_folders(output_path, MODE_TAR)[0]
+    for name in indexed_keys(shards_folder)[1]:
+        os.remove(os.path.join(shards_folder, name))
+        log(f"Removed incomplete shard {name}")
+
+
+def _write_pair_packed(pairs, output_path, max_workers, log, progress, is_cancelled):
+    """Pack pairs into images.bin, boxes.npy and index.npy keyed like tar shards"""
+    samples = [(key, pair['image'], pair['label']) for key, pair in zip(shard_keys(pairs), pairs)]
+    writer = write_packed(samples, output_folders(output_path, MODE_PACKED)[0], parse_label_text,
+                          max_workers=max_workers, progress=progress, is_cancelled=is_cancelled)
+    if not writer.committed:
+        log(f"Stopped after {writer.samples} sample(s); the partial packed dataset was discarded")
+        return 0
+    log(f"Packed {writer.samples} sample(s): {writer.bytes / (1 << 20):.1f} MB of images, "
+        f"{writer.box_count} box(es)")
+    return writer.samples
+
+
+def _uniform_pairs(index, input_path, folders, sample_size, random_seed, log, is_cancelled):
+    """Uniform sample in one streaming pass, keeping only sample_size pairs"""
+    sampled, total = reservoir_sample(
+        walk_pairs(input_path, folders, index=index, log=log, is_cancelled=is_cancelled),
+        sample_size, random.Random(random_seed))
+    check_cancelled(is_cancelled)
+
+    log(f"Found {total} valid image/label pairs")
+    if not total:
+        raise SamplingError("No valid image/label pairs found")
+
+    log(f"Step 2: Randomly sampling {sample_size} pairs...")
+    if sample_size > total:
+        log(f"Warning: Sample size ({sample_size}) is larger than available pairs ({total})")
+        log("Using all available pairs instead")
+
+    # Full paths are only built for the sampled pairs
+    sampled_table = PairTable.from_walk(sampled)
+    sampled_pairs = sampled_table.pairs(range(len(sampled_table)))
+    log(f"Sampled {len(sampled_pairs)} pairs")
+    return sampled_pairs
+
+
+def _diverse_uniform_pairs(index, input_path, folders, sample_size, random_seed, dedup_distance,
+                           max_workers, log, is_cancelled):
+    """Uniform sample that skips near-duplicates, examining frames in a seeded random order"""
+    table = collect_pairs(input_path, folders, index=index, log=log, is_cancelled=is_cancelled)
+    log(f"Found {len(table)} valid image/label pairs")
+    if not len(table):
+        raise SamplingError("No valid image/label pairs found")
+
+    log(f"Step 2: Randomly sampling {sample_size} pairs without near-duplicates...")
+    order = np.random.default_rng(random_seed).permutation(len(table))
+    rows, skipped = select_diverse(table, order, sample_size, dedup_distance, index,
+                                   max_workers=max_workers, log=log, is_cancelled=is_cancelled)
+    check_cancelled(is_cancelled)
+    if len(rows) < sample_size:
+        log(f"Warning: Only {len(rows)} pairs are not near-duplicates of each other")
+    log(f"Sampled {len(rows)} pairs ({skipped} near-duplicate(s) skipped)")
+    return table.pairs(sorted(rows))
+
+
+def _class_aware_pairs(index, input_path, folders, sample_size, random_seed, weighting,
+                       min_per_class, class_quotas, dedup_distance, max_workers, log, is_cancelled):
+    """Class-aware sample over the full pair table and its per-frame class index"""
+    table = collect_pairs(input_path, folders, index=index, log=log, is_cancelled=is_cancelled)
+    log(f"Found {len(table)} valid image/label pairs")
+    if not len(table):
+        raise SamplingError("No valid image/label pairs found")
+
+    log("Reading label classes...")
+    class_index = ClassIndex(frame_class_texts(index, table, is_cancelled))
+    log("Frames per class: " + ", ".join(
+        f"{c}: {n}" for c, n in sorted(class_index.frames_per_class.items())))
+    for class_id in sorted(set(class_quotas or {}) - set(class_index.frames_per_class)):
+        log(f"Warning: Class {class_id} has a quota but does not occur in the selected folders")
+
+    log(f"Step 2: Sampling {sample_size} pairs ({weighting})...")
+    if sample_size > len(table):
+        log(f"Warning: Sample size ({sample_size}) is larger than available pairs ({len(table)})")
+        log("Using all available pairs instead")
+    frame_ids = class_aware_sample(class_index, sample_size, random.Random(random_seed),
+                                   weighting=weighting, min_per_class=min_per_class, quotas=class_quotas)
+    if len(frame_ids) > sample_size:
+        log(f"Warning: Class requirements need {len(frame_ids)} pairs, more than the sample size")
+    if dedup_distance > 0:
+        # Filters the class-aware selection; rejected frames are not replaced
+        log("Removing near-duplicates from the selection...")
+        random.Random(random_seed).shuffle(frame_ids)
+        frame_ids, skipped = select_diverse(table, frame_ids, len(frame_ids), dedup_distance, index,
+                                            max_workers=max_workers, log=log, is_cancelled=is_cancelled)
+        check_cancelled(is_cancelled)
+        frame_ids.sort()
+
+    sampled_counts = {}
+    for frame in frame_ids:
+        for class_id in class_index.frame_classes(frame):
+            sampled_counts[class_id] = sampled_counts.get(class_id, 0) + 1
+    if dedup_distance > 0:
+        log(f"Sampled {len(frame_ids)} pairs ({skipped} near-duplicate(s) skipped)")
+    else:
+        log(f"Sampled {len(frame_ids)} pairs")
+    log("Sampled frames per class: " + ", ".join(
+        f"{c}: {n}" for c, n in sorted(sampled_counts.items())))
+    # Classes in fewer frames than their requirement (or thinned out by the deduplication)
+    for class_id in sorted(class_index.frames_per_class):
+        requested = (class_quotas or {}).get(class_id, min_per_class)
+        covered = sampled_counts.get(class_id, 0)
+        if covered < requested:
+            log(f"Warning: Class {class_id}: {requested} frames requested, {covered} sampled "
+                f"({class_index.frames_per_class[class_id]} available)")
+    return table.pairs(frame_ids)
+
+
+def frame_class_texts(index, table, is_cancelled=None):
+    """
+    Look up the class IDs of every pair's label file, parsing labels not indexed yet
+
+    Args:
+        index: DatasetIndex of the dataset
+        table: PairTable from collect_pairs
+        is_cancelled: Optional callable checked once per folder
+
+    Returns:
+        List of canonical class strings ("0 3"), aligned with the table rows
+
+    Raises:
+        SamplingCancelled: If is_cancelled returned True
+    """
+    def folder_classes(folder_id):
+        check_cancelled(is_cancelled)
+        labels_dir = table.dirs[folder_id][1]
+        missing = index.missing_meta(labels_dir, KIND_LABEL)
+        for chunk in iter_chunks(missing, 500):
+            index.store_label_meta(labels_dir, probe_labels(labels_dir, chunk))
+        return {name[:-4]: text for name, _, text, _ in index.label_rows(labels_dir)}
+
+    texts = []
+    current_id, current = None, None
+    for i in range(len(table)):
+        folder_id = table.folder_ids[i]
+        if folder_id != current_id:
+            # Rows are grouped by folder, so only one folder's labels are held at a time
+            current_id = folder_id
+            current = folder_classes(folder_id)
+        texts.append(current.get(table.stem(i), ''))
+    return texts
+
+
+def run_sampling(input_path, output_path, folders=None, sample_size=50, random_seed=42,
+                 on_existing=ON_EXISTING_KEEP, mode=MODE_COPY, max_workers=None,
+                 weighting=WEIGHT_UNIFORM, min_per_class=0, class_quotas=None, dedup_distance=0,
+                 shard_size=DEFAULT_SHARD_SIZE, log=print_log, progress=None, is_cancelled=None,
+                 dry_run=False):
+    """
+    Run a complete Video Frame - Yolo sampling job
+
+    Args:
+        input_path: Folder containing the video subfolders
+        output_path: Folder receiving 'images' and 'labels'
+        folders: Video subfolders to use (all subfolders if None)
+        sample_size: Number of pairs to sample
+        random_seed: Seed for reproducible sampling
+        on_existing: Policy for files already in the output folders
+        mode: How files are placed (see materialize_pairs)
+        max_workers: Threads placing files in parallel
+        weighting: WEIGHT_UNIFORM or WEIGHT_INVERSE_FREQUENCY (rare classes drawn more often)
+        min_per_class: Frames required for every class
+        class_quotas: Optional {class_id: frames} overriding min_per_class per class
+        dedup_distance: If > 0, skip frames whose perceptual hash is within this Hamming
+            distance of an already sampled frame
+        shard_size: Maximum bytes per shard with MODE_TAR
+        log: Callable receiving messages
+        progress: Optional callable(done, total) for the copy step
+        is_cancelled: Optional callable returning True to stop early
+        dry_run: Only sample and report how many pairs are left to place (see
+            report_remaining); nothing is written
+
+    Returns:
+        Number of pairs materialized (0 for a dry run)
+
+    Raises:
+        SamplingError: If the job cannot run
+    """
+    if not input_path:
+        raise SamplingError("Please select an input folder")
+    if not output_path:
+        raise SamplingError("Please select an output folder")
+    if not os.path.exists(input_path):
+        raise SamplingError("Input folder does not exist")
+
+    index = DatasetIndex(input_path, log=log)
+    try:
+        if folders is None:
+            folders = list_video_folders(input_path, index)
+        if not folders:
+            raise SamplingError("No video folders selected")
+
+        log("=" * 50)
+        log("Starting sampling process...")
+        log(f"Input folder: {input_path}")
+        log(f"Output folder: {output_path}")
+        log(f"Selected folders: {len(folders)}")
+        log(f"Sample size: {sample_size}")
+        log(f"Random seed: {random_seed}")
+        if dedup_distance > 0:
+            log(f"Near-duplicate distance: {dedup_distance}")
+        if weighting != WEIGHT_UNIFORM or min_per_class or class_quotas:
+            log(f"Class weighting: {weighting}, min frames per class: {min_per_class}, "
+                f"quotas: {class_quotas or 'none'}")
+        log("=" * 50)
+
+        log("Step 1: Collecting image/label pairs...")
+        if weighting != WEIGHT_UNIFORM or min_per_class or class_quotas:
+            sampled_pairs = _class_aware_pairs(index, input_path, folders, sample_size, random_seed,
+                                               weighting, min_per_class, class_quotas, dedup_distance,
+                                               max_workers, log, is_cancelled)
+        elif dedup_distance > 0:
+            sampled_pairs = _diverse_uniform_pairs(index, input_path, folders, sample_size, random_seed,
+                                                   dedup_distance, max_workers, log, is_cancelled)
+        else:
+            sampled_pairs = _uniform_pairs(index, input_path, folders, sample_size, random_seed,
+                                           log, is_cancelled)
+    finally:
+        index.close()
+
+    return place_sampled_pairs(sampled_pairs, output_path, mode=mode, on_existing=on_existing,
+                               max_workers=max_workers, shard_size=shard_size, dry_run=dry_run,
+                               log=log, progress=progress, is_cancelled=is_cancelled)
@@ -0,0 +1,191 @@
+"""
+Columnar YOLO label store
+Holds every box of a dataset in flat NumPy arrays (image id, class, cx, cy, w, h)
+with per-file offsets, so label analytics are vectorized reductions
+"""
+
+import numpy as np
+
+
+# Box area as a fraction of the image area
+AREA_BINS = (0.0, 0.001, 0.01, 0.1, 1.0)
+AREA_BIN_LABELS = ("<0.1%", "0.1-1%", "1-10%", ">10%")
+
+# Box width / height in pixels (normalized units when the image size is unknown)
+ASPECT_BINS = (0.0, 0.5, 2.0, np.inf)
+ASPECT_BIN_LABELS = ("tall (<1:2)", "square-ish", "wide (>2:1)")
+
+# COCO "small" objects: less than 32x32 pixels
+SMALL_OBJECT_PIXELS = 32 * 32
+
+# Fallback for labels whose image size is unknown: 32x32 px at 640x640 input
+SMALL_OBJECT_FRACTION = SMALL_OBJECT_PIXELS / (640 * 640)
+
+
+def parse_label_text(text):
+    """
+    Parse the contents of a YOLO label file
+
+    Args:
+        text: File contents, one "class cx cy w h" row per line
+
+    Returns:
+        float32 array of shape (n, 5); extra columns (e.g. polygon points) are ignored
+    """
+    # One bulk parse of the whole file. It stands only if it yields exactly 5 values
+    # per line: wider rows (confidence, polygon points), junk tokens (ValueError, or a
+    # short result on NumPy 1.x) and blank lines all take the row by row path below
+    try:
+        values = np.fromstring(text, dtype=np.float32, sep=' ')
+    except ValueError:
+        values = None
+    stripped = text.strip()
+    lines = stripped.count('\n') + 1 if stripped else 0
+    if values is not None and values.size == 5 * lines:
+        rows = values.reshape(-1, 5)
+        # Rows of 4 and 6 values would add up too, but misalign into non-integral class IDs
+        if np.all(rows[:, 0] == np.floor(rows[:, 0])):
+            return rows
+
+    # Slow path for files mixing row widths or containing junk lines
+    parsed = []
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) < 5:
+            continue
+        try:
+            parsed.append([float(p) for p in parts[:5]])
+        except ValueError:
+            continue
+    return np.array(parsed, dtype=np.float32).reshape(-1, 5)
+
+
+def _count_dict(values):
+    """Return {value: occurrences} for an int array, ignoring negative values"""
+    values = values[values >= 0]
+    if len(values) == 0:
+        return {}
+    counts = np.bincount(values)
+    ids = np.flatnonzero(counts)
+    return dict(zip(ids.tolist(), counts[ids].tolist()))
+
+
+class LabelStore:
+    """Columnar boxes of many label files
+
+    Attributes:
+        image_ids: int32 (n_boxes,) index of the label file each box belongs to
+        classes: int32 (n_boxes,) class IDs
+        boxes: float32 (n_boxes, 4) normalized cx, cy, w, h
+        offsets: int64 (n_files + 1,) boxes of file i are offsets[i]:offsets[i + 1]
+        image_sizes: int32 (n_files, 2) pixel width/height per file, 0 if unknown
+    """
+
+    def __init__(self, classes, boxes, offsets, image_sizes=None):
+        self.classes = classes
+        self.boxes = boxes
+        self.offsets = offsets
+        counts = np.diff(offsets)
+        self.image_ids = np.repeat(np.arange(len(counts), dtype=np.int32), counts)
+        if image_sizes is None:
+            image_sizes = np.zeros((len(counts), 2), dtype=np.int32)
+        self.image_sizes = image_sizes
+
+    @classmethod
+    def from_blobs(cls, blobs, image_sizes=None):
+        """
+        Build a store from per-file float32 (n, 5) byte blobs
+
+        Args:
+            blobs: Sequence of bytes, one per label file (as kept in the dataset index)
+            image_sizes: Optional (n_files, 2) array of pixel sizes
+
+        Returns:
+            LabelStore
+        """
+        counts = np.fromiter((len(b) // 20 for b in blobs), dtype=np.int64, count=len(blobs))
+        offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        rows = np.frombuffer(b''.join(blobs), dtype=np.float32).reshape(-1, 5)
+        return cls(rows[:, 0].astype(np.int32), rows[:, 1:].copy(), offsets,
+                   None if image_sizes is None else np.asarray(image_sizes, dtype=np.int32))
+
+    @classmethod
+    def concat(cls, stores):
+        """Concatenate stores, renumbering files in order"""
+        stores = [s for s in stores if s is not None]
+        if not stores:
+            return cls.from_blobs([])
+        offsets = [np.zeros(1, dtype=np.int64)]
+        base = 0
+        for store in stores:
+            offsets.append(store.offsets[1:] + base)
+            base += store.offsets[-1]
+        return cls(np.concatenate([s.classes for s in stores]),
+                   np.concatenate([s.boxes for s in stores]),
+                   np.concatenate(offsets),
+                   np.concatenate([s.image_sizes for s in stores]))
+
+    @property
+    def num_files(self):
+        return len(self.offsets) - 1
+
+    @property
+    def num_boxes(self):
+        return len(self.classes)
+
+    def file_boxes(self, i):
+        """Return (classes, boxes) of label file i"""
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.classes[start:end], self.boxes[start:end]
+
+    def class_counts(self):
+        """Return {class_id: number of boxes}"""
+        return _count_dict(self.classes)
+
+    def images_per_class(self):
+        """Return {class_id: number of label files containing the class}"""
+        if self.num_boxes == 0:
+            return {}
+        # Sort (file, class) keys and keep the first of each run of equal keys
+        stride = np.int64(max(int(self.classes.max()), 0)) + 1
+        keys = self.image_ids.astype(np.int64) * stride + self.classes
+        keys.sort()
+        first = np.empty(len(keys), dtype=bool)
+        first[0] = True
+        np.not_equal(keys[1:], keys[:-1], out=first[1:])
+        return _count_dict(keys[first] % stride)
+
+    def _pixel_scale(self):
+        """Per-box image width/height, NaN where the image size is unknown"""
+        sizes = self.image_sizes[self.image_ids].astype(np.float32)
+        sizes[sizes == 0] = np.nan
+        return sizes[:, 0], sizes[:, 1]
+
+    def area_fractions(self):
+        return self.boxes[:, 2] * self.boxes[:, 3]
+
+    def aspect_ratios(self):
+        """Box width / height in pixels, normalized units where the size is unknown"""
+        img_w, img_h = self._pixel_scale()
+        scale = np.where(np.isnan(img_w), 1.0, img_w / img_h)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.boxes[:, 2] / self.boxes[:, 3] * scale
+
+    def area_histogram(self, bins=AREA_BINS):
+        return np.histogram(np.clip(self.area_fractions(), bins[0], bins[-1]), bins=bins)[0]
+
+    def aspect_histogram(self, bins=ASPECT_BINS):
+        ratios = self.aspect_ratios()
+        return np.histogram(ratios[np.isfinite(ratios)], bins=bins)[0]
+
+    def small_object_ratio(self, min_pixels=SMALL_OBJECT_PIXELS):
+        """Fraction of boxes smaller than min_pixels (area fraction fallback without image size)"""
+        if self.num_boxes == 0:
+            return 0.0
+        img_w, img_h = self._pixel_scale()
+        pixel_area = self.area_fractions() * img_w * img_h
+        small = np.where(np.isnan(pixel_area),
+                         self.area_fractions() < SMALL_OBJECT_FRACTION,
+                         pixel_area < min_pixels)
+        return float(small.mean())
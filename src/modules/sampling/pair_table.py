@@ -0,0 +1,108 @@
+"""
+Compact image/label pair table
+Stores millions of pairs in flat arrays (folder id, stem bytes, extension id,
+sizes) and only builds full paths for the pairs that are actually used
+"""
+
+import os
+from array import array
+
+
+class PairTable:
+    """Array-backed list of image/label pairs
+
+    Folder names and their frames/labels directories are interned once;
+    each pair costs a few dozen bytes (ids, sizes and the UTF-8 stem in a
+    shared buffer) instead of a dict of four strings. pair(i) rebuilds the
+    dict form ('image', 'label', 'folder', 'filename') on demand.
+    """
+
+    def __init__(self):
+        self.folders = []       # folder names, indexed by folder id
+        self.dirs = []          # (frames_dir, labels_dir) per folder id
+        self.exts = []          # image extensions as found on disk ('.jpg', '.PNG', ...)
+        self._folder_ids = {}
+        self._ext_ids = {}
+        self.folder_ids = array('i')
+        self.ext_ids = array('H')
+        self.stem_offsets = array('q', [0])
+        self.stems = bytearray()
+        self.image_sizes = array('q')
+        self.label_sizes = array('q')
+
+    @classmethod
+    def from_walk(cls, walk):
+        """
+        Build a table from walk_pairs output
+
+        Args:
+            walk: Iterable of (folder, frames_dir, labels_dir, stem, image_name,
+                image_size, label_size)
+
+        Returns:
+            PairTable
+        """
+        table = cls()
+        for folder, frames_dir, labels_dir, stem, image_name, image_size, label_size in walk:
+            table.add(folder, frames_dir, labels_dir, stem, image_name[len(stem):],
+                      image_size, label_size)
+        return table
+
+    def add(self, folder, frames_dir, labels_dir, stem, ext, image_size=0, label_size=0):
+        """Append one pair; image is frames_dir/stem+ext, label is labels_dir/stem.txt"""
+        folder_id = self._folder_ids.get(folder)
+        if folder_id is None:
+            folder_id = self._folder_ids[folder] = len(self.folders)
+            self.folders.append(folder)
+            self.dirs.append((frames_dir, labels_dir))
+        ext_id = self._ext_ids.get(ext)
+        if ext_id is None:
+            ext_id = self._ext_ids[ext] = len(self.exts)
+            self.exts.append(ext)
+
+        self.folder_ids.append(folder_id)
+        self.ext_ids.append(ext_id)
+        self.stems += stem.encode('utf-8', 'surrogateescape')
+        self.stem_offsets.append(len(self.stems))
+        self.image_sizes.append(image_size)
+        self.label_sizes.append(label_size)
+
+    def __len__(self):
+        return len(self.folder_ids)
+
+    def stem(self, i):
+        raw = self.stems[self.stem_offsets[i]:self.stem_offsets[i + 1]]
+        return raw.decode('utf-8', 'surrogateescape')
+
+    def filename(self, i):
+        return self.stem(i) + self.exts[self.ext_ids[i]]
+
+    def folder(self, i):
+        return self.folders[self.folder_ids[i]]
+
+    def pair(self, i):
+        """
+        Build the dict form of pair i
+
+        Returns:
+            Dict with 'image', 'label', 'folder' and 'filename' keys
+        """
+        folder_id = self.folder_ids[i]
+        frames_dir, labels_dir = self.dirs[folder_id]
+        stem = self.stem(i)
+        filename = stem + self.exts[self.ext_ids[i]]
+        return {
+            'image': os.path.join(frames_dir, filename),
+            'label': os.path.join(labels_dir, stem + '.txt'),
+            'folder': self.folders[folder_id],
+            'filename': filename
+        }
+
+    def pairs(self, indices):
+        """Build the dict form of the given pairs, in order"""
+        return [self.pair(i) for i in indices]
+
+    def nbytes(self):
+        """Approximate memory held by the per-pair arrays"""
+        return (len(self.stems) + sum(a.itemsize * len(a) for a in (
+            self.folder_ids, self.ext_ids, self.stem_offsets, self.image_sizes, self.label_sizes)))
@@ -0,0 +1,332 @@
+"""
+Sampling strategies
+Seeded, reproducible selection of items from streams and pair tables
+"""
+
+import math
+from itertools import islice
+
+import numpy as np
+
+
+class _Counted:
+    """Iterator wrapper counting the items consumed"""
+
+    def __init__(self, iterable):
+        self._it = iter(iterable)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = next(self._it)
+        self.count += 1
+        return item
+
+
+def reservoir_sample(items, k, rng):
+    """
+    Draw a uniform sample of k items from a stream in one pass (Algorithm L)
+
+    Only the k kept items are held in memory, and the random generator is
+    called O(k log(n / k)) times instead of once per item, so the stream
+    can be far larger than memory.
+
+    Args:
+        items: Iterable of items, consumed once
+        k: Sample size
+        rng: random.Random instance (seeded for reproducibility)
+
+    Returns:
+        Tuple (sample, seen): list of min(k, n) items and the number n of items consumed
+    """
+    stream = _Counted(items)
+    reservoir = list(islice(stream, k))
+    if len(reservoir) < k or k <= 0:
+        # Exhaust the stream so that seen is the full count
+        for _ in stream:
+            pass
+        return reservoir, stream.count
+
+    # 1 - random() lies in (0, 1], so the logarithms are always defined
+    w = math.exp(math.log(1.0 - rng.random()) / k)
+    while True:
+        if w <= 0.0:
+            # Acceptance probability underflowed: nothing else would be kept
+            for _ in stream:
+                pass
+            return reservoir, stream.count
+        skip = math.floor(math.log(1.0 - rng.random()) / math.log1p(-w)) if w < 1.0 else 0
+        item = next(islice(stream, skip, None), stream)
+        if item is stream:
+            return reservoir, stream.count
+        reservoir[rng.randrange(k)] = item
+        w *= math.exp(math.log(1.0 - rng.random()) / k)
+
+
+# Frame weighting for class-aware sampling
+WEIGHT_UNIFORM = 'uniform'
+WEIGHT_INVERSE_FREQUENCY = 'inverse_frequency'
+WEIGHTINGS = (WEIGHT_UNIFORM, WEIGHT_INVERSE_FREQUENCY)
+
+
+class AliasTable:
+    """Walker/Vose alias table: O(n) to build, O(1) per weighted draw"""
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("AliasTable needs at least one positive weight")
+        scaled = [w * n / total for w in weights]
+        self.prob = [0.0] * n
+        self.alias = [0] * n
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Leftovers are 1 up to rounding error
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def draw(self, rng):
+        """Draw an index with probability proportional to its weight"""
+        i = rng.randrange(len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+
+class ClassIndex:
+    """Per-frame class index for class-aware sampling
+
+    Frames are grouped by their set of class IDs (the canonical "0 3" text
+    kept in the dataset index), so weights are computed per group rather
+    than per frame and a weighted draw is an alias draw over groups followed
+    by a uniform draw inside the group. Frames without boxes form their own
+    group and count as a pseudo-class for inverse-frequency weighting.
+
+    Attributes:
+        groups: List of class ID tuples, one per group
+        group_frames: List of int64 arrays of frame ids, one per group
+        frame_group: int32 array giving the group of each frame
+        frames_per_class: {class_id: number of frames containing it}
+    """
+
+    def __init__(self, class_texts):
+        group_ids = {}
+        frame_group = np.empty(len(class_texts), dtype=np.int32)
+        for i, text in enumerate(class_texts):
+            text = text or ''
+            group = group_ids.get(text)
+            if group is None:
+                group = group_ids[text] = len(group_ids)
+            frame_group[i] = group
+
+        self.frame_group = frame_group
+        self.groups = [tuple(int(c) for c in text.split()) for text in group_ids]
+        order = np.argsort(frame_group, kind='stable')
+        bounds = np.searchsorted(frame_group[order], np.arange(len(self.groups) + 1))
+        self.group_frames = [order[bounds[g]:bounds[g + 1]] for g in range(len(self.groups))]
+
+        self.frames_per_class = {}
+        for classes, frames in zip(self.groups, self.group_frames):
+            for class_id in classes:
+                self.frames_per_class[class_id] = self.frames_per_class.get(class_id, 0) + len(frames)
+
+    def __len__(self):
+        return len(self.frame_group)
+
+    def frame_classes(self, frame):
+        return self.groups[self.frame_group[frame]]
+
+    def class_frames(self, class_id):
+        """Return the ids of all frames containing a class"""
+        arrays = [frames for classes, frames in zip(self.groups, self.group_frames)
+                  if class_id in classes]
+        return np.concatenate(arrays) if arrays else np.empty(0, dtype=np.int64)
+
+    def group_weights(self, weighting):
+        """Total weight of each group (frame weight times group size)"""
+        if weighting == WEIGHT_UNIFORM:
+            return [len(frames) for frames in self.group_frames]
+        if weighting != WEIGHT_INVERSE_FREQUENCY:
+            raise ValueError(f"Unknown weighting: {weighting}")
+        weights = []
+        for classes, frames in zip(self.groups, self.group_frames):
+            if classes:
+                frame_weight = sum(1.0 / self.frames_per_class[c] for c in classes)
+            else:
+                frame_weight = 1.0 / len(frames)
+            weights.append(frame_weight * len(frames))
+        return weights
+
+
+def class_aware_sample(class_index, sample_size, rng, weighting=WEIGHT_UNIFORM,
+                       min_per_class=0, quotas=None):
+    """
+    Draw frames honouring per-class minimums, then fill up by weighted draws
+
+    Requirements are met rarest class first, counting every class of a chosen
+    frame, so frames with several rare classes are not wasted. The rest of
+    the budget is drawn without replacement with the given weighting.
+
+    Args:
+        class_index: ClassIndex of the candidate frames
+        sample_size: Total number of frames wanted
+        rng: random.Random instance (seeded for reproducibility)
+        weighting: WEIGHT_UNIFORM or WEIGHT_INVERSE_FREQUENCY
+        min_per_class: Frames required for every class
+        quotas: Optional {class_id: frames} overriding min_per_class per class
+
+    Returns:
+        List of frame ids; may exceed sample_size if the requirements need more
+    """
+    quotas = quotas or {}
+    chosen = set()
+    covered = dict.fromkeys(class_index.frames_per_class, 0)
+
+    def take(frame):
+        chosen.add(frame)
+        for class_id in class_index.frame_classes(frame):
+            covered[class_id] += 1
+
+    for class_id in sorted(class_index.frames_per_class, key=class_index.frames_per_class.get):
+        need = quotas.get(class_id, min_per_class) - covered[class_id]
+        if need <= 0:
+            continue
+        frames = class_index.class_frames(class_id)
+        if len(frames) > 2 * (need + len(chosen)):
+            # Large class: random picks rarely hit an already chosen frame
+            while need > 0:
+                frame = int(frames[rng.randrange(len(frames))])
+                if frame not in chosen:
+                    take(frame)
+                    need -= 1
+        else:
+            candidates = [f for f in frames.tolist() if f not in chosen]
+            for frame in rng.sample(candidates, min(need, len(candidates))):
+                take(frame)
+
+    remaining = min(sample_size, len(class_index)) - len(chosen)
+    if remaining > 0:
+        _weighted_fill(class_index, remaining, rng, weighting, take, chosen)
+    return sorted(chosen)
+
+
+def _weighted_fill(class_index, count, rng, weighting, take, chosen):
+    """Add count unchosen frames by alias draws, with an exact fallback when rejections pile up"""
+    weights = class_index.group_weights(weighting)
+    table = AliasTable(weights)
+    target = len(chosen) + count
+    attempts = 0
+    while len(chosen) < target and attempts < 20 * count + 100:
+        attempts += 1
+        frames = class_index.group_frames[table.draw(rng)]
+        frame = int(frames[rng.randrange(len(frames))])
+        if frame not in chosen:
+            take(frame)
+
+    if len(chosen) < target:
+        # Most candidates are taken: weighted sampling without replacement over what is left
+        # (Efraimidis-Spirakis keys u ** (1 / w), largest first)
+        sizes = [len(frames) for frames in class_index.group_frames]
+        frame_weights = np.array([w / n for w, n in zip(weights, sizes)])[class_index.frame_group]
+        available = np.ones(len(class_index), dtype=bool)
+        available[list(chosen)] = False
+        np_rng = np.random.default_rng(rng.getrandbits(64))
+        keys = np.log(np_rng.random(len(class_index))) / np.maximum(frame_weights, 1e-300)
+        keys[~available] = -np.inf
+        for frame in np.argsort(-keys)[:target - len(chosen)].tolist():
+            take(frame)
+
+
+def systematic_sample(n, k, rng):
+    """
+    Take every (n / k)-th item from a random start
+
+    The sample is spread evenly over the order of the items (e.g. frames
+    sorted by name), which covers a long sequence better than random draws.
+
+    Args:
+        n: Number of items
+        k: Sample size
+        rng: random.Random instance (seeded for reproducibility)
+
+    Returns:
+        Sorted list of min(k, n) indices
+    """
+    if k >= n:
+        return list(range(n))
+    if k <= 0:
+        return []
+    step = n / k
+    start = rng.random() * step
+    return [int(start + i * step) for i in range(k)]
+
+
+def stratified_sample(class_index, k, rng):
+    """
+    Draw frames so that every stratum keeps its share of the dataset
+
+    Strata are the ClassIndex groups (frames with the same set of classes,
+    frames without boxes being one stratum). Each stratum gets k times its
+    share of the frames, rounded by largest remainder (ties broken at
+    random), and its frames are drawn uniformly.
+
+    Args:
+        class_index: ClassIndex of the candidate frames
+        k: Sample size
+        rng: random.Random instance (seeded for reproducibility)
+
+    Returns:
+        Sorted list of min(k, n) frame ids
+    """
+    n = len(class_index)
+    if k >= n:
+        return list(range(n))
+    if k <= 0:
+        return []
+    shares = [len(frames) * k / n for frames in class_index.group_frames]
+    counts = [int(share) for share in shares]
+    by_remainder = sorted(range(len(shares)), key=lambda g: (counts[g] - shares[g], rng.random()))
+    for group in by_remainder[:k - sum(counts)]:
+        counts[group] += 1
+
+    chosen = []
+    for frames, count in zip(class_index.group_frames, counts):
+        if count:
+            chosen.extend(int(frames[i]) for i in rng.sample(range(len(frames)), count))
+    return sorted(chosen)
+
+
+def capped_sample(groups, k, cap, rng):
+    """
+    Draw k items uniformly with at most cap items from any group
+
+    Items are visited in a seeded random order and an item is skipped once
+    its group holds cap sampled items; the ranks inside each group are
+    computed with one stable sort instead of per-item bookkeeping.
+
+    Args:
+        groups: Sequence of group ids (e.g. PairTable.folder_ids)
+        k: Sample size
+        cap: Maximum items per group (0: no cap)
+        rng: random.Random instance (seeded for reproducibility)
+
+    Returns:
+        Sorted list of at most k indices (fewer if the caps leave fewer items)
+    """
+    groups = np.asarray(groups)
+    order = np.random.default_rng(rng.getrandbits(64)).permutation(len(groups))
+    if cap > 0:
+        visited = groups[order]
+        by_group = np.argsort(visited, kind='stable')
+        sorted_groups = visited[by_group]
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[by_group] = np.arange(len(order)) - np.searchsorted(sorted_groups, sorted_groups)
+        order = order[rank < cap]
+    return np.sort(order[:max(k, 0)]).tolist()
@@ -3,12 +3,14 @@ Sampling Tab - Main tab for various sampling modes
 """
 
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-                              QGroupBox, QComboBox, QLabel, QTextEdit,
+                              QGroupBox, QComboBox, QLabel,
                               QProgressBar, QApplication)
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QFont, QColor
 
+from src.utils.log_view import LogView
 from src.modules.sampling.video_frame_yolo import VideoFrameYoloWidget
+from src.modules.sampling.tile_widget import TileWidget
+from src.modules.sampling.standard_widget import StandardWidget
+from src.modules.sampling.string_folder_widget import StringFolderWidget
 
 
 class SamplingTab(QWidget):
@@ -31,10 +33,6 @@ class SamplingTab(QWidget):
         self.mode_selector.addItem("Tile")
         self.mode_selector.addItem("Standard")
 
-        # Style placeholder items in gray
-        for i in range(1, 4):  # Items 1, 2, 3 are placeholders
-            self.mode_selector.setItemData(i, QColor(150, 150, 150), Qt.ForegroundRole)
-
         self.mode_selector.currentIndexChanged.connect(self.on_mode_changed)
         mode_layout.addWidget(self.mode_selector)
         mode_layout.addStretch()
@@ -43,8 +41,7 @@ class SamplingTab(QWidget):
 
         # Progress and log (shared across all modes)
         self.progress_bar = QProgressBar()
-        self.log_text = QTextEdit()
-        self.log_text.setReadOnly(True)
+        self.log_text = LogView('sampling')
         self.log_text.setMaximumHeight(150)
 
         # Container for mode-specific UIs
@@ -55,9 +52,9 @@ class SamplingTab(QWidget):
 
         # Create all mode UIs
         self.create_video_frame_yolo_ui()
-        self.create_placeholder_ui("String folder")
-        self.create_placeholder_ui("Tile")
-        self.create_placeholder_ui("Standard")
+        self.create_string_folder_ui()
+        self.create_tile_ui()
+        self.create_standard_ui()
 
         # Show default mode
         self.on_mode_changed(0)
@@ -71,6 +68,7 @@ class SamplingTab(QWidget):
         self.start_btn.clicked.connect(self.start_sampling)
         self.stop_btn = QPushButton("Stop")
         self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self.stop_current_task)
         button_layout.addWidget(self.start_btn)
         button_layout.addWidget(self.stop_btn)
         layout.addLayout(button_layout)
@@ -88,44 +86,30 @@ class SamplingTab(QWidget):
     def create_video_frame_yolo_ui(self):
         """Create UI for Video Frame - Yolo mode"""
         self.video_frame_widget = VideoFrameYoloWidget(self.log_text, self.progress_bar)
-
-    def create_placeholder_ui(self, mode_name):
-        """Create placeholder UI for modes not yet implemented"""
-        placeholder_widget = QWidget()
-        placeholder_layout = QVBoxLayout()
-
-        # Add spacer to center the message
-        placeholder_layout.addStretch()
-
-        # Placeholder message
-        placeholder_label = QLabel(f"{mode_name} mode")
-        placeholder_label.setAlignment(Qt.AlignCenter)
-        placeholder_font = QFont()
-        placeholder_font.setPointSize(14)
-        placeholder_font.setBold(True)
-        placeholder_label.setFont(placeholder_font)
-        placeholder_label.setStyleSheet("color: #999999;")
-        placeholder_layout.addWidget(placeholder_label)
-
-        coming_soon_label = QLabel("Coming Soon")
-        coming_soon_label.setAlignment(Qt.AlignCenter)
-        coming_soon_font = QFont()
-        coming_soon_font.setPointSize(12)
-        coming_soon_label.setFont(coming_soon_font)
-        coming_soon_label.setStyleSheet("color: #bbbbbb;")
-        placeholder_layout.addWidget(coming_soon_label)
-
-        placeholder_layout.addStretch()
-
-        placeholder_widget.setLayout(placeholder_layout)
-
-        # Store widget reference with mode name
-        if mode_name == "String folder":
-            self.string_folder_widget = placeholder_widget
-        elif mode_name == "Tile":
-            self.tile_widget = placeholder_widget
-        elif mode_name == "Standard":
-            self.standard_widget = placeholder_widget
+        self.video_frame_widget.task_started.connect(lambda: self.stop_btn.setEnabled(True))
+        self.video_frame_widget.task_finished.connect(lambda: self.stop_btn.setEnabled(False))
+        self.video_frame_widget.sampling_finished.connect(self.reset_sampling_button)
+
+    def create_string_folder_ui(self):
+        """Create UI for String folder mode"""
+        self.string_folder_widget = StringFolderWidget(self.log_text, self.progress_bar)
+        self.string_folder_widget.task_started.connect(lambda: self.stop_btn.setEnabled(True))
+        self.string_folder_widget.task_finished.connect(lambda: self.stop_btn.setEnabled(False))
+        self.string_folder_widget.sampling_finished.connect(self.reset_sampling_button)
+
+    def create_tile_ui(self):
+        """Create UI for Tile mode"""
+        self.tile_widget = TileWidget(self.log_text, self.progress_bar)
+        self.tile_widget.task_started.connect(lambda: self.stop_btn.setEnabled(True))
+        self.tile_widget.task_finished.connect(lambda: self.stop_btn.setEnabled(False))
+        self.tile_widget.sampling_finished.connect(self.reset_sampling_button)
+
+    def create_standard_ui(self):
+        """Create UI for Standard mode"""
+        self.standard_widget = StandardWidget(self.log_text, self.progress_bar)
+        self.standard_widget.task_started.connect(lambda: self.stop_btn.setEnabled(True))
+        self.standard_widget.task_finished.connect(lambda: self.stop_btn.setEnabled(False))
+        self.standard_widget.sampling_finished.connect(self.reset_sampling_button)
 
     def on_mode_changed(self, index):
         """Handle mode selection change"""
@@ -136,14 +120,12 @@ class SamplingTab(QWidget):
                 child.widget().setParent(None)
 
         # Show selected mode UI
-        if index == 0:  # Video Frame - Yolo
-            self.mode_layout.addWidget(self.video_frame_widget)
-        elif index == 1:  # String folder
-            self.mode_layout.addWidget(self.string_folder_widget)
-        elif index == 2:  # Tile
-            self.mode_layout.addWidget(self.tile_widget)
-        elif index == 3:  # Standard
-            self.mode_layout.addWidget(self.standard_widget)
+        self.mode_layout.addWidget(self.mode_widgets()[index])
+
+    def mode_widgets(self):
+        """Return the widgets of all modes, in mode selector order"""
+        return (self.video_frame_widget, self.string_folder_widget, self.tile_widget,
+                self.standard_widget)
 
     def start_sampling(self):
         """Start the sampling process based on current mode"""
@@ -156,16 +138,18 @@ class SamplingTab(QWidget):
         # Process events to update UI immediately
         QApplication.processEvents()
 
-        current_mode = self.mode_selector.currentIndex()
+        # Runs in the background; the button is reset on sampling_finished
+        if self.mode_widgets()[self.mode_selector.currentIndex()].start_sampling():
+            return
 
-        if current_mode == 0:  # Video Frame - Yolo
-            self.video_frame_widget.start_sampling()
-        else:
-            self.log_text.append(f"Error: {self.mode_selector.currentText()} mode is not yet implemented")
-
-        # Reset button state after completion
+        # Reset button state if nothing was started
         self.reset_sampling_button()
 
+    def stop_current_task(self):
+        """Cancel the running background task (the mode may have been switched since it started)"""
+        for widget in self.mode_widgets():
+            widget.cancel_current_task()
+
     def reset_sampling_button(self):
         """Reset the sampling button to its original state"""
         self.start_btn.setEnabled(True)
@@ -0,0 +1,133 @@
+"""
+Standard sampling mode
+Samples image/label pairs from flat or nested images/labels datasets (e.g.
+images/train + labels/train) using the cached dataset index; no Qt imports
+"""
+
+import os
+import random
+
+from src.utils.materialize import MODE_COPY
+from src.utils.shards import DEFAULT_SHARD_SIZE
+from src.modules.sampling.dataset_index import DatasetIndex
+from src.modules.sampling.engine import (SamplingError, place_sampled_pairs, sample_pairs,
+                                         frame_class_texts, check_cancelled, print_log,
+                                         ON_EXISTING_KEEP)
+from src.modules.sampling.pair_table import PairTable
+from src.modules.sampling.samplers import ClassIndex, systematic_sample, stratified_sample
+from src.modules.sampling.walker import walk_tree_pairs
+
+
+# Sampling methods
+METHOD_RANDOM = 'random'
+METHOD_SYSTEMATIC = 'systematic'  # evenly spaced over the sorted pairs
+METHOD_STRATIFIED = 'stratified'  # proportional per set of classes
+METHOD_ALL = 'all'  # every pair in name order (e.g. to pack a whole dataset)
+METHODS = (METHOD_RANDOM, METHOD_SYSTEMATIC, METHOD_STRATIFIED, METHOD_ALL)
+
+
+def collect_tree_pairs(dataset_path, index, log=print_log, is_cancelled=None):
+    """
+    Collect all image/label pairs of a Standard dataset in one walk
+
+    Args:
+        dataset_path: Dataset root
+        index: DatasetIndex of the dataset (unchanged directories are not listed again)
+        log: Callable receiving warnings
+        is_cancelled: Optional callable returning True to stop early
+
+    Returns:
+        PairTable of all pairs, grouped by images directory
+
+    Raises:
+        SamplingCancelled: If is_cancelled returned True
+    """
+    table = PairTable.from_walk(walk_tree_pairs(dataset_path, index=index, log=log,
+                                                is_cancelled=is_cancelled))
+    check_cancelled(is_cancelled)
+    return table
+
+
+def run_standard_sampling(dataset_path, output_path, method=METHOD_RANDOM, sample_size=50,
+                          random_seed=42, on_existing=ON_EXISTING_KEEP, mode=MODE_COPY,
+                          max_workers=None, shard_size=DEFAULT_SHARD_SIZE, log=print_log,
+                          progress=None, is_cancelled=None, dry_run=False):
+    """
+    Run a complete Standard sampling job
+
+    Args:
+        dataset_path: Dataset root holding images and labels trees
+        output_path: Folder receiving 'images' and 'labels'
+        method: METHOD_RANDOM, METHOD_SYSTEMATIC, METHOD_STRATIFIED or METHOD_ALL
+        sample_size: Number of pairs to sample (ignored by METHOD_ALL)
+        random_seed: Seed for reproducible sampling
+        on_existing: Policy for files already in the output folders
+        mode: How files are placed (see materialize_pairs)
+        max_workers: Threads placing files in parallel
+        shard_size: Maximum bytes per shard with MODE_TAR
+        log: Callable receiving messages
+        progress: Optional callable(done, total) for the copy step
+        is_cancelled: Optional callable returning True to stop early
+        dry_run: Only sample and report how many pairs are left to place (see
+            report_remaining); nothing is written
+
+    Returns:
+        Number of pairs materialized (0 for a dry run)
+
+    Raises:
+        SamplingError: If the job cannot run
+    """
+    if not dataset_path:
+        raise SamplingError("Please select a dataset folder")
+    if not output_path:
+        raise SamplingError("Please select an output folder")
+    if not os.path.isdir(dataset_path):
+        raise SamplingError("Dataset folder does not exist")
+    if method not in METHODS:
+        raise SamplingError(f"Unknown sampling method: {method}")
+
+    log("=" * 50)
+    log("Starting sampling process...")
+    log(f"Dataset folder: {dataset_path}")
+    log(f"Output folder: {output_path}")
+    log(f"Method: {method}")
+    log(f"Sample size: {sample_size}")
+    log(f"Random seed: {random_seed}")
+    log("=" * 50)
+
+    index = DatasetIndex(dataset_path, log=log)
+    try:
+        log("Step 1: Collecting image/label pairs...")
+        table = collect_tree_pairs(dataset_path, index, log=log, is_cancelled=is_cancelled)
+        log(f"Found {len(table)} valid image/label pairs in {len(table.folders)} folder(s)")
+        if not len(table):
+            raise SamplingError("No valid image/label pairs found")
+
+        rng = random.Random(random_seed)
+        if method == METHOD_ALL:
+            log("Step 2: Taking all pairs...")
+            sampled_pairs = table.pairs(range(len(table)))
+        elif method == METHOD_RANDOM:
+            log(f"Step 2: Sampling {sample_size} pairs ({method})...")
+            sampled_pairs = sample_pairs(table, sample_size, random_seed, log=log)
+        else:
+            log(f"Step 2: Sampling {sample_size} pairs ({method})...")
+            if sample_size > len(table):
+                log(f"Warning: Sample size ({sample_size}) is larger than available pairs "
+                    f"({len(table)})")
+                log("Using all available pairs instead")
+            if method == METHOD_SYSTEMATIC:
+                rows = systematic_sample(len(table), sample_size, rng)
+            else:
+                log("Reading label classes...")
+                class_index = ClassIndex(frame_class_texts(index, table, is_cancelled))
+                log(f"Strata (distinct class sets): {len(class_index.groups)}")
+                rows = stratified_sample(class_index, sample_size, rng)
+            sampled_pairs = table.pairs(rows)
+        log(f"Sampled {len(sampled_pairs)} pairs")
+    finally:
+        index.close()
+
+    return place_sampled_pairs(sampled_pairs, output_path, mode=mode, on_existing=on_existing,
+                               max_workers=max_workers, shard_size=shard_size, dry_run=dry_run,
+                               log=log, progress=progress, is_cancelled=is_cancelled)
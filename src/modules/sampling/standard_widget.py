@@ -0,0 +1,205 @@
+"""
+Standard sampling implementation
+Samples image/label pairs from flat or nested images/labels datasets
+"""
+
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
+                              QLineEdit, QGroupBox, QSpinBox, QGridLayout, QFileDialog,
+                              QComboBox)
+from PySide6.QtCore import QTimer, Signal
+
+from src.utils.materialize import MODE_COPY, MODE_HARDLINK, MODE_REFLINK, MODE_SYMLINK
+from src.utils.shards import MODE_TAR
+from src.utils.packed import MODE_PACKED
+from src.utils.journal import journal_progress
+from src.modules.sampling.workers import SamplingWorker, start_in_thread
+from src.modules.sampling.engine import find_existing_outputs, ON_EXISTING_KEEP, ON_EXISTING_ABORT
+from src.modules.sampling.dialogs import ask_existing_files
+from src.modules.sampling.standard import (run_standard_sampling, METHOD_RANDOM, METHOD_SYSTEMATIC,
+                                           METHOD_STRATIFIED, METHOD_ALL)
+
+
+class StandardWidget(QWidget):
+    """UI and logic for Standard sampling mode"""
+
+    # Same contract as VideoFrameYoloWidget (drives the Start/Stop buttons)
+    task_started = Signal()
+    task_finished = Signal()
+    sampling_finished = Signal()
+
+    def __init__(self, log_text, progress_bar):
+        super().__init__()
+        self.log_text = log_text
+        self.progress_bar = progress_bar
+        self.sampling_thread = None
+        self.sampling_worker = None
+
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(50)
+        self.progress_timer.timeout.connect(self.update_sampling_progress)
+        self.init_ui()
+
+    def init_ui(self):
+        """Initialize the UI for Standard mode"""
+        main_layout = QVBoxLayout()
+
+        # Dataset folder
+        input_group = QGroupBox("Dataset Folder")
+        input_layout = QHBoxLayout()
+        input_layout.addWidget(QLabel("Folder Path:"))
+        self.dataset_path = QLineEdit()
+        self.dataset_path.setPlaceholderText("Folder with images/ and labels/ (nested splits too)...")
+        input_layout.addWidget(self.dataset_path)
+        self.browse_btn = QPushButton("Browse")
+        self.browse_btn.clicked.connect(lambda: self.browse_folder(self.dataset_path, "Dataset"))
+        input_layout.addWidget(self.browse_btn)
+        input_group.setLayout(input_layout)
+        main_layout.addWidget(input_group)
+
+        # Sampling options
+        sampling_group = QGroupBox("Sampling Options")
+        sampling_layout = QGridLayout()
+
+        sampling_layout.addWidget(QLabel("Method:"), 0, 0)
+        self.method = QComboBox()
+        self.method.addItem("Random", METHOD_RANDOM)
+        self.method.addItem("Systematic (evenly spaced)", METHOD_SYSTEMATIC)
+        self.method.addItem("Stratified by classes", METHOD_STRATIFIED)
+        self.method.addItem("All pairs (e.g. to pack the whole dataset)", METHOD_ALL)
+        self.method.currentIndexChanged.connect(
+            lambda: self.sample_size.setEnabled(self.method.currentData() != METHOD_ALL))
+        self.method.setToolTip("Systematic takes every n-th pair in name order from a random start.\n"
+                               "Stratified keeps the share of every combination of classes.\n"
+                               "All pairs ignores the sample size.")
+        sampling_layout.addWidget(self.method, 0, 1)
+
+        sampling_layout.addWidget(QLabel("Sample Size:"), 1, 0)
+        self.sample_size = QSpinBox()
+        self.sample_size.setRange(1, 10000000)
+        self.sample_size.setValue(50)
+        sampling_layout.addWidget(self.sample_size, 1, 1)
+
+        sampling_layout.addWidget(QLabel("Random Seed:"), 2, 0)
+        self.random_seed = QSpinBox()
+        self.random_seed.setRange(0, 999999)
+        self.random_seed.setValue(42)
+        sampling_layout.addWidget(self.random_seed, 2, 1)
+
+        sampling_group.setLayout(sampling_layout)
+        main_layout.addWidget(sampling_group)
+
+        # Output section
+        output_group = QGroupBox("Output Folder")
+        output_layout = QVBoxLayout()
+
+        output_path_layout = QHBoxLayout()
+        output_path_layout.addWidget(QLabel("Output Path:"))
+        self.output_path = QLineEdit()
+        self.output_path.setPlaceholderText("Will create 'images' and 'labels' folders here...")
+        output_path_layout.addWidget(self.output_path)
+        self.output_browse_btn = QPushButton("Browse")
+        self.output_browse_btn.clicked.connect(lambda: self.browse_folder(self.output_path, "Output"))
+        output_path_layout.addWidget(self.output_browse_btn)
+        output_layout.addLayout(output_path_layout)
+
+        mode_layout = QHBoxLayout()
+        mode_layout.addWidget(QLabel("Output Mode:"))
+        self.output_mode = QComboBox()
+        self.output_mode.addItem("Copy", MODE_COPY)
+        self.output_mode.addItem("Hardlink (same disk, no extra space)", MODE_HARDLINK)
+        self.output_mode.addItem("Reflink / copy-on-write clone", MODE_REFLINK)
+        self.output_mode.addItem("Symlink", MODE_SYMLINK)
+        self.output_mode.addItem("Tar shards (WebDataset, 1 GB each)", MODE_TAR)
+        self.output_mode.addItem("Packed dataset (memory-mapped, for training)", MODE_PACKED)
+        self.output_mode.setToolTip("Unsupported modes fall back to a full copy automatically.\n"
+                                    "Hardlinks and symlinks share data with the source files.\n"
+                                    "Tar shards are written to a 'shards' folder instead of\n"
+                                    "loose files in 'images' and 'labels'; a packed dataset\n"
+                                    "(one image blob, boxes and offset index) to 'packed'.")
+        mode_layout.addWidget(self.output_mode)
+        mode_layout.addStretch()
+        output_layout.addLayout(mode_layout)
+
+        output_group.setLayout(output_layout)
+        main_layout.addWidget(output_group)
+
+        main_layout.addStretch()
+        self.setLayout(main_layout)
+
+    def browse_folder(self, line_edit, name):
+        """Browse for a folder and put it into line_edit"""
+        folder = QFileDialog.getExistingDirectory(self, f"Select {name} Folder", line_edit.text())
+        if folder:
+            line_edit.setText(folder)
+            self.log_text.append(f"{name} folder selected: {folder}")
+
+    def is_busy(self):
+        return self.sampling_worker is not None
+
+    def cancel_current_task(self):
+        """Ask the running sampling worker to stop"""
+        if self.sampling_worker is not None and not self.sampling_worker.is_cancelled():
+            self.sampling_worker.cancel()
+            self.log_text.append("Stopping sampling...")
+
+    def start_sampling(self):
+        """
+        Start Standard sampling in a background worker
+
+        Returns:
+            True if a job was started (sampling_finished follows), False otherwise
+        """
+        if self.is_busy():
+            self.log_text.append("Error: Sampling is already running")
+            return False
+
+        on_existing = ON_EXISTING_KEEP
+        output_path = self.output_path.text()
+        if output_path and self.dataset_path.text():
+            existing_images, existing_labels = find_existing_outputs(
+                output_path, self.output_mode.currentData())
+            if existing_images or existing_labels:
+                on_existing = ask_existing_files(self, existing_images, existing_labels,
+                                                 self.output_mode.currentData(),
+                                                 journal_progress(output_path))
+                if on_existing == ON_EXISTING_ABORT:
+                    self.log_text.append("Sampling cancelled by user")
+                    return False
+
+        self.progress_bar.setValue(0)
+        self.sampling_worker = SamplingWorker(run_standard_sampling,
+                                              dataset_path=self.dataset_path.text(),
+                                              output_path=output_path,
+                                              method=self.method.currentData(),
+                                              sample_size=self.sample_size.value(),
+                                              random_seed=self.random_seed.value(),
+                                              on_existing=on_existing,
+                                              mode=self.output_mode.currentData())
+        self.sampling_worker.message.connect(self.log_text.append)
+        self.sampling_worker.failed.connect(self.log_text.append)
+        self.sampling_thread = start_in_thread(
+            self.sampling_worker, self, (self.sampling_worker.finished, self.sampling_worker.failed))
+        self.sampling_thread.finished.connect(self.on_sampling_thread_finished)
+
+        self.task_started.emit()
+        self.progress_timer.start()
+        self.sampling_thread.start()
+        return True
+
+    def update_sampling_progress(self):
+        """Poll the worker's latest progress (timer driven)"""
+        if self.sampling_worker is None:
+            return
+        done, total = self.sampling_worker.progress_snapshot()
+        if total:
+            self.progress_bar.setMaximum(total)
+            self.progress_bar.setValue(done)
+
+    def on_sampling_thread_finished(self):
+        """Clean up once the sampling worker thread has exited"""
+        self.update_sampling_progress()
+        self.progress_timer.stop()
+        self.sampling_worker = None
+        self.sampling_thread = None
+        self.task_finished.emit()
+        self.sampling_finished.emit()
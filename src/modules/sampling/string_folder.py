@@ -0,0 +1,239 @@
+"""
+String folder sampling mode
+Selects video folders by glob/regex name patterns while walking the tree,
+so excluded subtrees are never listed, and samples frames across them with
+per-folder caps; no Qt imports
+"""
+
+import fnmatch
+import os
+import random
+import re
+
+from src.utils.materialize import MODE_COPY
+from src.utils.shards import DEFAULT_SHARD_SIZE
+from src.modules.sampling.dataset_index import DatasetIndex, KIND_DIR
+from src.modules.sampling.engine import (SamplingError, place_sampled_pairs, check_cancelled,
+                                         print_log, ON_EXISTING_KEEP)
+from src.modules.sampling.pair_table import PairTable
+from src.modules.sampling.samplers import capped_sample
+from src.modules.sampling.walker import walk_pairs, list_subdirs
+
+
+# Pattern syntaxes
+SYNTAX_GLOB = 'glob'
+SYNTAX_REGEX = 'regex'
+SYNTAXES = (SYNTAX_GLOB, SYNTAX_REGEX)
+
+
+def compile_level(pattern, syntax):
+    """
+    Compile a pattern for one path component
+
+    Args:
+        pattern: Glob (whole name must match) or regex (searched in the name)
+        syntax: SYNTAX_GLOB or SYNTAX_REGEX
+
+    Returns:
+        Callable(name) -> bool; plain glob names compile to a string for direct lookup
+
+    Raises:
+        SamplingError: If a regex is invalid
+    """
+    if syntax == SYNTAX_GLOB:
+        if not any(c in pattern for c in '*?['):
+            return pattern
+        return re.compile(fnmatch.translate(pattern)).match
+    try:
+        return re.compile(pattern).search
+    except re.error as e:
+        raise SamplingError(f"Invalid regular expression '{pattern}': {e}")
+
+
+def _matches(level, name):
+    return level == name if isinstance(level, str) else level(name) is not None
+
+
+def _select(level, names):
+    """Names matching one compiled level; names is a list or a dict keyed by name"""
+    if isinstance(level, str):
+        return (level,) if level in (names if isinstance(names, dict) else set(names)) else ()
+    return filter(level, names)
+
+
+class FolderPattern:
+    """Folder selection from include/exclude patterns
+
+    include holds alternatives separated by ';'; each alternative has one
+    pattern per directory level separated by '/' (e.g. "cam0*/2024-05-*").
+    A directory is only listed while some alternative can still match below
+    it, and exclude patterns (also ';' separated) prune a directory of any
+    level by name. Levels without wildcards are checked with a stat instead
+    of listing their parent.
+    """
+
+    def __init__(self, include='', exclude='', syntax=SYNTAX_GLOB):
+        if syntax not in SYNTAXES:
+            raise SamplingError(f"Unknown pattern syntax: {syntax}")
+        self.alternatives = [tuple(compile_level(level, syntax) for level in alt.strip('/').split('/'))
+                             for alt in _split(include)]
+        if not self.alternatives:
+            self.alternatives = [(compile_level('*', SYNTAX_GLOB),)]
+        self.exclude = [compile_level(pattern, syntax) for pattern in _split(exclude)]
+
+    def match_folders(self, root, list_dirs=list_subdirs, is_cancelled=None):
+        """
+        Walk root and return the relative paths of the selected folders
+
+        Args:
+            root: Folder to select from
+            list_dirs: Callable(dir_path) returning subdirectory names
+            is_cancelled: Optional callable checked once per listed directory
+
+        Returns:
+            Sorted list of relative folder paths
+        """
+        selected = []
+        frontier = [('', self.alternatives)]
+        while frontier:
+            rel, alive = frontier.pop()
+            if is_cancelled is not None and is_cancelled():
+                break
+            depth = len(rel.split(os.sep)) if rel else 0
+            levels = [alt[depth] for alt in alive]
+
+            dir_path = os.path.join(root, rel) if rel else root
+            if all(isinstance(level, str) for level in levels):
+                names = sorted({level for level in levels
+                                if os.path.isdir(os.path.join(dir_path, level))})
+            else:
+                names = list_dirs(dir_path)
+
+            # Filter the listing once per pattern (C-level loops), not per name and pattern
+            hits = {}
+            for alt in alive:
+                for name in _select(alt[depth], names):
+                    hits.setdefault(name, []).append(alt)
+            for level in self.exclude:
+                for name in list(_select(level, hits)):
+                    del hits[name]
+
+            prefix = rel + os.sep if rel else ''
+            if all(len(alt) == depth + 1 for alt in alive):
+                # Last level of every pattern: no per-name bookkeeping
+                selected.extend(prefix + name for name in hits)
+                continue
+            for name in sorted(hits):
+                matching = hits[name]
+                if any(len(alt) == depth + 1 for alt in matching):
+                    selected.append(prefix + name)
+                deeper = [alt for alt in matching if len(alt) > depth + 1]
+                if deeper:
+                    frontier.append((prefix + name, deeper))
+        return sorted(selected)
+
+
+def name_filter(pattern, syntax=SYNTAX_GLOB):
+    """
+    Build a frame file name filter from ';' separated patterns
+
+    Returns:
+        Callable(name) -> bool, or None if pattern is empty (keep all frames)
+    """
+    levels = [compile_level(p, syntax) for p in _split(pattern)]
+    if not levels:
+        return None
+    return lambda name: any(_matches(level, name) for level in levels)
+
+
+def _split(text):
+    return [part.strip() for part in (text or '').split(';') if part.strip()]
+
+
+def run_string_folder_sampling(input_path, output_path, include='', exclude='', frame_pattern='',
+                               syntax=SYNTAX_GLOB, sample_size=50, per_folder_cap=0, random_seed=42,
+                               on_existing=ON_EXISTING_KEEP, mode=MODE_COPY, max_workers=None,
+                               shard_size=DEFAULT_SHARD_SIZE, log=print_log, progress=None,
+                               is_cancelled=None, dry_run=False):
+    """
+    Run a complete String folder sampling job
+
+    Args:
+        input_path: Folder to select video folders from
+        output_path: Folder receiving 'images' and 'labels'
+        include: Folder patterns (see FolderPattern); empty selects every top-level folder
+        exclude: Folder name patterns pruning whole subtrees
+        frame_pattern: Frame file name patterns; empty keeps all frames
+        syntax: SYNTAX_GLOB or SYNTAX_REGEX for all patterns
+        sample_size: Number of pairs to sample
+        per_folder_cap: Maximum pairs taken from one folder (0: no cap)
+        random_seed: Seed for reproducible sampling
+        on_existing: Policy for files already in the output folders
+        mode: How files are placed (see materialize_pairs)
+        max_workers: Threads placing files in parallel
+        shard_size: Maximum bytes per shard with MODE_TAR
+        log: Callable receiving messages
+        progress: Optional callable(done, total) for the copy step
+        is_cancelled: Optional callable returning True to stop early
+        dry_run: Only sample and report how many pairs are left to place (see
+            report_remaining); nothing is written
+
+    Returns:
+        Number of pairs materialized (0 for a dry run)
+
+    Raises:
+        SamplingError: If the job cannot run
+    """
+    if not input_path:
+        raise SamplingError("Please select an input folder")
+    if not output_path:
+        raise SamplingError("Please select an output folder")
+    if not os.path.isdir(input_path):
+        raise SamplingError("Input folder does not exist")
+    pattern = FolderPattern(include, exclude, syntax)
+    frame_filter = name_filter(frame_pattern, syntax)
+
+    log("=" * 50)
+    log("Starting sampling process...")
+    log(f"Input folder: {input_path}")
+    log(f"Output folder: {output_path}")
+    log(f"Folder pattern: {include or '*'}" + (f", excluding: {exclude}" if exclude else ""))
+    log(f"Frame pattern: {frame_pattern or '*'} ({syntax})")
+    log(f"Sample size: {sample_size}, per-folder cap: {per_folder_cap or 'none'}")
+    log(f"Random seed: {random_seed}")
+    log("=" * 50)
+
+    index = DatasetIndex(input_path, log=log)
+    try:
+        log("Step 1: Selecting folders...")
+        folders = pattern.match_folders(input_path, lambda d: sorted(index.names(d, KIND_DIR)),
+                                        is_cancelled)
+        check_cancelled(is_cancelled)
+        log(f"Matched {len(folders)} folder(s)")
+        if not folders:
+            raise SamplingError("No folders match the pattern")
+
+        table = PairTable.from_walk(walk_pairs(input_path, folders, index=index, log=log,
+                                               is_cancelled=is_cancelled, name_filter=frame_filter))
+        check_cancelled(is_cancelled)
+    finally:
+        index.close()
+
+    log(f"Found {len(table)} valid image/label pairs in {len(table.folders)} folder(s)")
+    if not len(table):
+        raise SamplingError("No valid image/label pairs found")
+
+    log(f"Step 2: Sampling {sample_size} pairs...")
+    rows = capped_sample(table.folder_ids, sample_size, per_folder_cap, random.Random(random_seed))
+    if len(rows) < sample_size:
+        if per_folder_cap and len(table) > len(rows):
+            log(f"Warning: The per-folder cap leaves only {len(rows)} pairs")
+        else:
+            log(f"Warning: Sample size ({sample_size}) is larger than available pairs ({len(table)})")
+            log("Using all available pairs instead")
+    sampled_pairs = table.pairs(rows)
+    log(f"Sampled {len(sampled_pairs)} pairs from "
+        f"{len(set(table.folder_ids[row] for row in rows))} folder(s)")
+    return place_sampled_pairs(sampled_pairs, output_path, mode=mode, on_existing=on_existing,
+                               max_workers=max_workers, shard_size=shard_size, dry_run=dry_run,
+                               log=log, progress=progress, is_cancelled=is_cancelled)
@@ -0,0 +1,296 @@
+"""
+String folder sampling implementation
+Selects video folders by name patterns and samples frames across them
+"""
+
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
+                              QLineEdit, QGroupBox, QSpinBox, QGridLayout, QFileDialog,
+                              QComboBox, QListWidget)
+from PySide6.QtCore import QTimer, Signal
+
+from src.utils.materialize import MODE_COPY, MODE_HARDLINK, MODE_REFLINK, MODE_SYMLINK
+from src.utils.shards import MODE_TAR
+from src.utils.packed import MODE_PACKED
+from src.utils.journal import journal_progress
+from src.modules.sampling.workers import SamplingWorker, start_in_thread
+from src.modules.sampling.engine import (find_existing_outputs, SamplingError, ON_EXISTING_KEEP,
+                                         ON_EXISTING_ABORT)
+from src.modules.sampling.dialogs import ask_existing_files
+from src.modules.sampling.walker import list_subdirs
+from src.modules.sampling.string_folder import (run_string_folder_sampling, FolderPattern,
+                                                SYNTAX_GLOB, SYNTAX_REGEX)
+
+
+# Matched folders shown in the preview list (the count is always exact)
+PREVIEW_LIMIT = 2000
+
+
+class StringFolderWidget(QWidget):
+    """UI and logic for String folder sampling mode"""
+
+    # Same contract as VideoFrameYoloWidget (drives the Start/Stop buttons)
+    task_started = Signal()
+    task_finished = Signal()
+    sampling_finished = Signal()
+
+    def __init__(self, log_text, progress_bar):
+        super().__init__()
+        self.log_text = log_text
+        self.progress_bar = progress_bar
+        self.sampling_thread = None
+        self.sampling_worker = None
+        # Subdirectory listings reused while the patterns are edited
+        self.dir_cache = {}
+
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(50)
+        self.progress_timer.timeout.connect(self.update_sampling_progress)
+
+        # Re-match once typing pauses instead of on every keystroke
+        self.match_timer = QTimer(self)
+        self.match_timer.setSingleShot(True)
+        self.match_timer.setInterval(250)
+        self.match_timer.timeout.connect(self.update_matches)
+        self.init_ui()
+
+    def init_ui(self):
+        """Initialize the UI for String folder mode"""
+        main_layout = QVBoxLayout()
+
+        # Input folder
+        input_group = QGroupBox("Input Folder")
+        input_layout = QHBoxLayout()
+        input_layout.addWidget(QLabel("Folder Path:"))
+        self.input_path = QLineEdit()
+        self.input_path.setPlaceholderText("Select folder containing the video folders...")
+        self.input_path.textChanged.connect(self.on_input_changed)
+        input_layout.addWidget(self.input_path)
+        self.browse_btn = QPushButton("Browse")
+        self.browse_btn.clicked.connect(lambda: self.browse_folder(self.input_path, "Input"))
+        input_layout.addWidget(self.browse_btn)
+        self.refresh_btn = QPushButton("Refresh")
+        self.refresh_btn.setToolTip("List the folders again (after folders were added or removed)")
+        self.refresh_btn.clicked.connect(self.on_input_changed)
+        input_layout.addWidget(self.refresh_btn)
+        input_group.setLayout(input_layout)
+        main_layout.addWidget(input_group)
+
+        # Filters
+        filter_group = QGroupBox("Folder and Frame Filters")
+        filter_layout = QGridLayout()
+
+        filter_layout.addWidget(QLabel("Folder Pattern:"), 0, 0)
+        self.include_pattern = QLineEdit()
+        self.include_pattern.setPlaceholderText("e.g. cam0[1-3]_2024-05-*  or  site*/cam01 "
+                                                "(';' separates alternatives)")
+        filter_layout.addWidget(self.include_pattern, 0, 1)
+
+        filter_layout.addWidget(QLabel("Exclude Folders:"), 1, 0)
+        self.exclude_pattern = QLineEdit()
+        self.exclude_pattern.setPlaceholderText("e.g. *_test;*_old (skips whole subtrees)")
+        filter_layout.addWidget(self.exclude_pattern, 1, 1)
+
+        filter_layout.addWidget(QLabel("Frame Pattern:"), 2, 0)
+        self.frame_pattern = QLineEdit()
+        self.frame_pattern.setPlaceholderText("e.g. *_00?0.jpg (empty: all frames)")
+        filter_layout.addWidget(self.frame_pattern, 2, 1)
+
+        filter_layout.addWidget(QLabel("Syntax:"), 3, 0)
+        self.syntax = QComboBox()
+        self.syntax.addItem("Glob (* ? [abc])", SYNTAX_GLOB)
+        self.syntax.addItem("Regular expression", SYNTAX_REGEX)
+        filter_layout.addWidget(self.syntax, 3, 1)
+
+        self.match_label = QLabel("Matching folders: N/A")
+        filter_layout.addWidget(self.match_label, 4, 0, 1, 2)
+        self.matches_list = QListWidget()
+        self.matches_list.setUniformItemSizes(True)
+        self.matches_list.setMaximumHeight(150)
+        filter_layout.addWidget(self.matches_list, 5, 0, 1, 2)
+
+        for line_edit in (self.include_pattern, self.exclude_pattern):
+            line_edit.textChanged.connect(self.match_timer.start)
+        self.syntax.currentIndexChanged.connect(self.match_timer.start)
+
+        filter_group.setLayout(filter_layout)
+        main_layout.addWidget(filter_group)
+
+        # Sampling options
+        sampling_group = QGroupBox("Sampling Options")
+        sampling_layout = QGridLayout()
+
+        sampling_layout.addWidget(QLabel("Sample Size:"), 0, 0)
+        self.sample_size = QSpinBox()
+        self.sample_size.setRange(1, 10000000)
+        self.sample_size.setValue(50)
+        sampling_layout.addWidget(self.sample_size, 0, 1)
+
+        sampling_layout.addWidget(QLabel("Max per Folder:"), 1, 0)
+        self.per_folder_cap = QSpinBox()
+        self.per_folder_cap.setRange(0, 10000000)
+        self.per_folder_cap.setValue(0)
+        self.per_folder_cap.setSpecialValueText("No limit")
+        sampling_layout.addWidget(self.per_folder_cap, 1, 1)
+
+        sampling_layout.addWidget(QLabel("Random Seed:"), 2, 0)
+        self.random_seed = QSpinBox()
+        self.random_seed.setRange(0, 999999)
+        self.random_seed.setValue(42)
+        sampling_layout.addWidget(self.random_seed, 2, 1)
+
+        sampling_group.setLayout(sampling_layout)
+        main_layout.addWidget(sampling_group)
+
+        # Output section
+        output_group = QGroupBox("Output Folder")
+        output_layout = QVBoxLayout()
+
+        output_path_layout = QHBoxLayout()
+        output_path_layout.addWidget(QLabel("Output Path:"))
+        self.output_path = QLineEdit()
+        self.output_path.setPlaceholderText("Will create 'images' and 'labels' folders here...")
+        output_path_layout.addWidget(self.output_path)
+        self.output_browse_btn = QPushButton("Browse")
+        self.output_browse_btn.clicked.connect(lambda: self.browse_folder(self.output_path, "Output"))
+        output_path_layout.addWidget(self.output_browse_btn)
+        output_layout.addLayout(output_path_layout)
+
+        mode_layout = QHBoxLayout()
+        mode_layout.addWidget(QLabel("Output Mode:"))
+        self.output_mode = QComboBox()
+        self.output_mode.addItem("Copy", MODE_COPY)
+        self.output_mode.addItem("Hardlink (same disk, no extra space)", MODE_HARDLINK)
+        self.output_mode.addItem("Reflink / copy-on-write clone", MODE_REFLINK)
+        self.output_mode.addItem("Symlink", MODE_SYMLINK)
+        self.output_mode.addItem("Tar shards (WebDataset, 1 GB each)", MODE_TAR)
+        self.output_mode.addItem("Packed dataset (memory-mapped, for training)", MODE_PACKED)
+        self.output_mode.setToolTip("Unsupported modes fall back to a full copy automatically.\n"
+                                    "Hardlinks and symlinks share data with the source files.\n"
+                                    "Tar shards are written to a 'shards' folder instead of\n"
+                                    "loose files in 'images' and 'labels'; a packed dataset\n"
+                                    "(one image blob, boxes and offset index) to 'packed'.")
+        mode_layout.addWidget(self.output_mode)
+        mode_layout.addStretch()
+        output_layout.addLayout(mode_layout)
+
+        output_group.setLayout(output_layout)
+        main_layout.addWidget(output_group)
+
+        main_layout.addStretch()
+        self.setLayout(main_layout)
+
+    def browse_folder(self, line_edit, name):
+        """Browse for a folder and put it into line_edit"""
+        folder = QFileDialog.getExistingDirectory(self, f"Select {name} Folder", line_edit.text())
+        if folder:
+            line_edit.setText(folder)
+            self.log_text.append(f"{name} folder selected: {folder}")
+
+    def on_input_changed(self):
+        """Forget cached listings and match again"""
+        self.dir_cache.clear()
+        self.match_timer.start()
+
+    def list_dirs(self, dir_path):
+        """List subdirectories once per input folder (the walk prunes what it never asks for)"""
+        names = self.dir_cache.get(dir_path)
+        if names is None:
+            names = self.dir_cache[dir_path] = list_subdirs(dir_path)
+        return names
+
+    def update_matches(self):
+        """Show the folders matching the current patterns"""
+        self.matches_list.clear()
+        input_path = self.input_path.text()
+        if not input_path:
+            self.match_label.setText("Matching folders: N/A")
+            return
+        try:
+            pattern = FolderPattern(self.include_pattern.text(), self.exclude_pattern.text(),
+                                    self.syntax.currentData())
+        except SamplingError as e:
+            self.match_label.setText(f"Matching folders: {e}")
+            return
+
+        folders = pattern.match_folders(input_path, self.list_dirs)
+        shown = folders[:PREVIEW_LIMIT]
+        self.matches_list.addItems(shown)
+        text = f"Matching folders: {len(folders)}"
+        if len(shown) < len(folders):
+            text += f" (showing first {len(shown)})"
+        self.match_label.setText(text)
+
+    def is_busy(self):
+        return self.sampling_worker is not None
+
+    def cancel_current_task(self):
+        """Ask the running sampling worker to stop"""
+        if self.sampling_worker is not None and not self.sampling_worker.is_cancelled():
+            self.sampling_worker.cancel()
+            self.log_text.append("Stopping sampling...")
+
+    def start_sampling(self):
+        """
+        Start String folder sampling in a background worker
+
+        Returns:
+            True if a job was started (sampling_finished follows), False otherwise
+        """
+        if self.is_busy():
+            self.log_text.append("Error: Sampling is already running")
+            return False
+
+        on_existing = ON_EXISTING_KEEP
+        output_path = self.output_path.text()
+        if output_path and self.input_path.text():
+            existing_images, existing_labels = find_existing_outputs(
+                output_path, self.output_mode.currentData())
+            if existing_images or existing_labels:
+                on_existing = ask_existing_files(self, existing_images, existing_labels,
+                                                 self.output_mode.currentData(),
+                                                 journal_progress(output_path))
+                if on_existing == ON_EXISTING_ABORT:
+                    self.log_text.append("Sampling cancelled by user")
+                    return False
+
+        self.progress_bar.setValue(0)
+        self.sampling_worker = SamplingWorker(run_string_folder_sampling,
+                                              input_path=self.input_path.text(),
+                                              output_path=output_path,
+                                              include=self.include_pattern.text(),
+                                              exclude=self.exclude_pattern.text(),
+                                              frame_pattern=self.frame_pattern.text(),
+                                              syntax=self.syntax.currentData(),
+                                              sample_size=self.sample_size.value(),
+                                              per_folder_cap=self.per_folder_cap.value(),
+                                              random_seed=self.random_seed.value(),
+                                              on_existing=on_existing,
+                                              mode=self.output_mode.currentData())
+        self.sampling_worker.message.connect(self.log_text.append)
+        self.sampling_worker.failed.connect(self.log_text.append)
+        self.sampling_thread = start_in_thread(
+            self.sampling_worker, self, (self.sampling_worker.finished, self.sampling_worker.failed))
+        self.sampling_thread.finished.connect(self.on_sampling_thread_finished)
+
+        self.task_started.emit()
+        self.progress_timer.start()
+        self.sampling_thread.start()
+        return True
+
+    def update_sampling_progress(self):
+        """Poll the worker's latest progress (timer driven)"""
+        if self.sampling_worker is None:
+            return
+        done, total = self.sampling_worker.progress_snapshot()
+        if total:
+            self.progress_bar.setMaximum(total)
+            self.progress_bar.setValue(done)
+
+    def on_sampling_thread_finished(self):
+        """Clean up once the sampling worker thread has exited"""
+        self.update_sampling_progress()
+        self.progress_timer.stop()
+        self.sampling_worker = None
+        self.sampling_thread = None
+        self.task_finished.emit()
+        self.sampling_finished.emit()
@@ -0,0 +1,220 @@
+"""
+Tile sampling implementation
+Cuts large images into overlapping training tiles with clipped YOLO labels
+"""
+
+import os
+
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
+                              QLineEdit, QGroupBox, QSpinBox, QGridLayout, QFileDialog,
+                              QComboBox)
+from PySide6.QtCore import QTimer, Signal
+
+from src.modules.sampling.workers import SamplingWorker, start_in_thread
+from src.modules.sampling.engine import find_existing_outputs, ON_EXISTING_KEEP, ON_EXISTING_ABORT
+from src.modules.sampling.dialogs import ask_existing_files
+from src.modules.sampling.tiling import (run_tiling, EMPTY_KEEP, EMPTY_DROP, EMPTY_SAMPLE,
+                                         SAME_FORMAT)
+
+
+class TileWidget(QWidget):
+    """UI and logic for Tile sampling mode"""
+
+    # Same contract as VideoFrameYoloWidget (drives the Start/Stop buttons)
+    task_started = Signal()
+    task_finished = Signal()
+    sampling_finished = Signal()
+
+    def __init__(self, log_text, progress_bar):
+        super().__init__()
+        self.log_text = log_text
+        self.progress_bar = progress_bar
+        self.sampling_thread = None
+        self.sampling_worker = None
+
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(50)
+        self.progress_timer.timeout.connect(self.update_sampling_progress)
+        self.init_ui()
+
+    def init_ui(self):
+        """Initialize the UI for Tile mode"""
+        main_layout = QVBoxLayout()
+
+        # Input folders
+        input_group = QGroupBox("Input")
+        input_layout = QGridLayout()
+
+        input_layout.addWidget(QLabel("Images Folder:"), 0, 0)
+        self.images_path = QLineEdit()
+        self.images_path.setPlaceholderText("Select folder containing the large images...")
+        input_layout.addWidget(self.images_path, 0, 1)
+        self.images_browse_btn = QPushButton("Browse")
+        self.images_browse_btn.clicked.connect(lambda: self.browse_folder(self.images_path, "Images"))
+        input_layout.addWidget(self.images_browse_btn, 0, 2)
+
+        input_layout.addWidget(QLabel("Labels Folder:"), 1, 0)
+        self.labels_path = QLineEdit()
+        self.labels_path.setPlaceholderText("YOLO label files with the same names (optional)...")
+        input_layout.addWidget(self.labels_path, 1, 1)
+        self.labels_browse_btn = QPushButton("Browse")
+        self.labels_browse_btn.clicked.connect(lambda: self.browse_folder(self.labels_path, "Labels"))
+        input_layout.addWidget(self.labels_browse_btn, 1, 2)
+
+        input_group.setLayout(input_layout)
+        main_layout.addWidget(input_group)
+
+        # Tile options
+        options_group = QGroupBox("Tile Options")
+        options_layout = QGridLayout()
+
+        options_layout.addWidget(QLabel("Tile Size (px):"), 0, 0)
+        self.tile_size = QSpinBox()
+        self.tile_size.setRange(32, 16384)
+        self.tile_size.setValue(640)
+        options_layout.addWidget(self.tile_size, 0, 1)
+
+        options_layout.addWidget(QLabel("Overlap (px):"), 0, 2)
+        self.overlap = QSpinBox()
+        self.overlap.setRange(0, 16383)
+        self.overlap.setValue(128)
+        options_layout.addWidget(self.overlap, 0, 3)
+
+        options_layout.addWidget(QLabel("Min Box Visibility (%):"), 1, 0)
+        self.min_visibility = QSpinBox()
+        self.min_visibility.setRange(1, 100)
+        self.min_visibility.setValue(30)
+        self.min_visibility.setToolTip("Boxes cut by a tile border are kept if at least this\n"
+                                       "share of their area lies inside the tile.")
+        options_layout.addWidget(self.min_visibility, 1, 1)
+
+        options_layout.addWidget(QLabel("Output Format:"), 1, 2)
+        self.output_format = QComboBox()
+        self.output_format.addItem("Same as source", SAME_FORMAT)
+        self.output_format.addItem("JPEG", '.jpg')
+        self.output_format.addItem("PNG", '.png')
+        options_layout.addWidget(self.output_format, 1, 3)
+
+        options_layout.addWidget(QLabel("Empty Tiles:"), 2, 0)
+        self.empty_policy = QComboBox()
+        self.empty_policy.addItem("Keep a fraction", EMPTY_SAMPLE)
+        self.empty_policy.addItem("Drop", EMPTY_DROP)
+        self.empty_policy.addItem("Keep all", EMPTY_KEEP)
+        self.empty_policy.currentIndexChanged.connect(
+            lambda: self.empty_ratio.setEnabled(self.empty_policy.currentData() == EMPTY_SAMPLE))
+        options_layout.addWidget(self.empty_policy, 2, 1)
+
+        options_layout.addWidget(QLabel("Empty Fraction (%):"), 2, 2)
+        self.empty_ratio = QSpinBox()
+        self.empty_ratio.setRange(0, 100)
+        self.empty_ratio.setValue(10)
+        options_layout.addWidget(self.empty_ratio, 2, 3)
+
+        options_layout.addWidget(QLabel("Random Seed:"), 3, 0)
+        self.random_seed = QSpinBox()
+        self.random_seed.setRange(0, 999999)
+        self.random_seed.setValue(42)
+        options_layout.addWidget(self.random_seed, 3, 1)
+
+        options_group.setLayout(options_layout)
+        main_layout.addWidget(options_group)
+
+        # Output section
+        output_group = QGroupBox("Output Folder")
+        output_layout = QHBoxLayout()
+        output_layout.addWidget(QLabel("Output Path:"))
+        self.output_path = QLineEdit()
+        self.output_path.setPlaceholderText("Will create 'images' and 'labels' folders here...")
+        output_layout.addWidget(self.output_path)
+        self.output_browse_btn = QPushButton("Browse")
+        self.output_browse_btn.clicked.connect(lambda: self.browse_folder(self.output_path, "Output"))
+        output_layout.addWidget(self.output_browse_btn)
+        output_group.setLayout(output_layout)
+        main_layout.addWidget(output_group)
+
+        main_layout.addStretch()
+        self.setLayout(main_layout)
+
+    def browse_folder(self, line_edit, name):
+        """Browse for a folder and put it into line_edit"""
+        folder = QFileDialog.getExistingDirectory(self, f"Select {name} Folder", line_edit.text())
+        if folder:
+            line_edit.setText(folder)
+            self.log_text.append(f"{name} folder selected: {folder}")
+            # Default the labels folder to a sibling 'labels' folder of 'images'
+            if line_edit is self.images_path and not self.labels_path.text():
+                labels = os.path.join(os.path.dirname(folder), 'labels')
+                if os.path.isdir(labels):
+                    self.labels_path.setText(labels)
+
+    def is_busy(self):
+        return self.sampling_worker is not None
+
+    def cancel_current_task(self):
+        """Ask the running tiling worker to stop"""
+        if self.sampling_worker is not None and not self.sampling_worker.is_cancelled():
+            self.sampling_worker.cancel()
+            self.log_text.append("Stopping tiling after the images in progress...")
+
+    def start_sampling(self):
+        """
+        Start tiling in a background worker
+
+        Returns:
+            True if a job was started (sampling_finished follows), False otherwise
+        """
+        if self.is_busy():
+            self.log_text.append("Error: Tiling is already running")
+            return False
+
+        on_existing = ON_EXISTING_KEEP
+        output_path = self.output_path.text()
+        if output_path:
+            existing_images, existing_labels = find_existing_outputs(output_path)
+            if existing_images or existing_labels:
+                on_existing = ask_existing_files(self, existing_images, existing_labels)
+                if on_existing == ON_EXISTING_ABORT:
+                    self.log_text.append("Tiling cancelled by user")
+                    return False
+
+        self.progress_bar.setValue(0)
+        self.sampling_worker = SamplingWorker(run_tiling,
+                                              images_dir=self.images_path.text(),
+                                              labels_dir=self.labels_path.text(),
+                                              output_path=output_path,
+                                              tile_size=self.tile_size.value(),
+                                              overlap=self.overlap.value(),
+                                              empty_policy=self.empty_policy.currentData(),
+                                              empty_ratio=self.empty_ratio.value() / 100,
+                                              min_visibility=self.min_visibility.value() / 100,
+                                              output_ext=self.output_format.currentData(),
+                                              random_seed=self.random_seed.value(),
+                                              on_existing=on_existing)
+        self.sampling_worker.message.connect(self.log_text.append)
+        self.sampling_worker.failed.connect(self.log_text.append)
+        self.sampling_thread = start_in_thread(
+            self.sampling_worker, self, (self.sampling_worker.finished, self.sampling_worker.failed))
+        self.sampling_thread.finished.connect(self.on_sampling_thread_finished)
+
+        self.task_started.emit()
+        self.progress_timer.start()
+        self.sampling_thread.start()
+        return True
+
+    def update_sampling_progress(self):
+        """Poll the worker's latest progress (timer driven)"""
+        if self.sampling_worker is None:
+            return
+        done, total = self.sampling_worker.progress_snapshot()
+        if total:
+            self.progress_bar.setMaximum(total)
+            self.progress_bar.setValue(done)
+
+    def on_sampling_thread_finished(self):
+        """Clean up once the tiling worker thread has exited"""
+        self.update_sampling_progress()
+        self.progress_timer.stop()
+        self.sampling_worker = None
+        self.sampling_thread = None
+        self.task_finished.emit()
+        self.sampling_finished.emit()
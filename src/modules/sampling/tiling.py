@@ -0,0 +1,449 @@
+"""
+Tile sampling mode
+Cuts large images into overlapping tiles with clipped, re-normalized YOLO labels.
+Pure-Python functions (no Qt imports); images are decoded into shared-memory
+frame slots and their tile rows written by all worker processes
+"""
+
+import os
+import threading
+import zlib
+from contextlib import contextmanager
+from concurrent.futures import wait, FIRST_COMPLETED
+
+import numpy as np
+from PIL import Image
+
+from src.utils.file_utils import split_name
+from src.utils.frame_pool import FramePool, slot_array
+from src.modules.sampling.analysis import pool_context
+from src.modules.sampling.dataset_index import KIND_IMAGE, KIND_LABEL
+from src.modules.sampling.engine import (SamplingError, prepare_output, output_folders,
+                                         check_cancelled, print_log, ON_EXISTING_KEEP)
+from src.modules.sampling.label_store import parse_label_text
+from src.modules.sampling.walker import list_files
+
+
+# What to do with tiles that contain no box
+EMPTY_KEEP = 'keep'
+EMPTY_DROP = 'drop'
+EMPTY_SAMPLE = 'sample'  # keep a seeded fraction of them
+EMPTY_POLICIES = (EMPTY_KEEP, EMPTY_DROP, EMPTY_SAMPLE)
+
+# Output extension meaning "same format as the source image"
+SAME_FORMAT = 'same'
+
+DEFAULT_MAX_WORKERS = 4  # one decoded source image (frame slot) per worker, plus one
+
+# PIL's decompression bomb limit while tiling: 20K x 20K aerial frames are expected here
+# (PIL refuses images over twice the limit)
+TILING_MAX_IMAGE_PIXELS = 50000 * 50000
+
+_limit_lock = threading.Lock()
+_limit_users = 0
+_saved_limit = None
+
+
+@contextmanager
+def large_images():
+    """Raise PIL's decompression bomb limit to TILING_MAX_IMAGE_PIXELS while in use"""
+    global _limit_users, _saved_limit
+    with _limit_lock:
+        if _limit_users == 0:
+            _saved_limit = Image.MAX_IMAGE_PIXELS
+            if _saved_limit is not None:
+                Image.MAX_IMAGE_PIXELS = max(_saved_limit, TILING_MAX_IMAGE_PIXELS)
+        _limit_users += 1
+    try:
+        yield
+    finally:
+        with _limit_lock:
+            _limit_users -= 1
+            if _limit_users == 0:
+                Image.MAX_IMAGE_PIXELS = _saved_limit
+
+
+def tile_origins(length, tile, stride):
+    """
+    Start offsets of tiles along one axis, the last one flush with the edge
+
+    Args:
+        length: Image width or height
+        tile: Tile size along the axis
+        stride: Distance between tile starts (tile - overlap)
+
+    Returns:
+        List of offsets; [0] if the image is smaller than a tile
+    """
+    if length <= tile:
+        return [0]
+    origins = list(range(0, length - tile + 1, stride))
+    if origins[-1] + tile < length:
+        origins.append(length - tile)
+    return origins
+
+
+def clip_boxes(rows, image_w, image_h, x0, y0, tile_w, tile_h, min_visibility=0.3, min_pixels=2):
+    """
+    Clip YOLO boxes to a tile and re-normalize them to tile coordinates
+
+    Args:
+        rows: float32 (n, 5) class, cx, cy, w, h normalized to the image
+        image_w, image_h: Image size in pixels
+        x0, y0, tile_w, tile_h: Tile rectangle in pixels
+        min_visibility: Minimum fraction of a box's area inside the tile to keep it
+        min_pixels: Minimum clipped width/height in pixels
+
+    Returns:
+        float32 (m, 5) rows normalized to the tile
+    """
+    if len(rows) == 0:
+        return rows.reshape(0, 5)
+    cx, cy = rows[:, 1] * image_w, rows[:, 2] * image_h
+    w, h = rows[:, 3] * image_w, rows[:, 4] * image_h
+    left = np.clip(cx - w / 2, x0, x0 + tile_w)
+    right = np.clip(cx + w / 2, x0, x0 + tile_w)
+    top = np.clip(cy - h / 2, y0, y0 + tile_h)
+    bottom = np.clip(cy + h / 2, y0, y0 + tile_h)
+    clipped_w, clipped_h = right - left, bottom - top
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        visibility = (clipped_w * clipped_h) / (w * h)
+    keep = (clipped_w >= min_pixels) & (clipped_h >= min_pixels) & (visibility >= min_visibility)
+
+    out = np.empty((int(keep.sum()), 5), dtype=np.float32)
+    out[:, 0] = rows[keep, 0]
+    out[:, 1] = ((left + right) / 2 - x0)[keep] / tile_w
+    out[:, 2] = ((top + bottom) / 2 - y0)[keep] / tile_h
+    out[:, 3] = clipped_w[keep] / tile_w
+    out[:, 4] = clipped_h[keep] / tile_h
+    return out
+
+
+def format_label_rows(rows):
+    """Format (n, 5) rows as YOLO label text"""
+    return ''.join(f"{int(r[0])} {r[1]:.6f} {r[2]:.6f} {r[3]:.6f} {r[4]:.6f}\n" for r in rows)
+
+
+class RegionReader:
+    """Read horizontal bands of an image without decoding it once per tile
+
+    Uncompressed (raw) images such as plain TIFFs are read band by band from
+    the file, so only the rows of the current tile row are in memory.
+    Compressed formats (PNG, JPEG, LZW/Deflate TIFF, ...) cannot be entered
+    mid-stream and are decoded once, then sliced.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with large_images(), Image.open(path) as img:
+            self.size = img.size
+            self.mode = img.mode
+            tiles = img.tile
+            # One top-down raw strip with the default row stride: rows can be addressed directly
+            self._raw = (len(tiles) == 1 and tiles[0][0] == 'raw' and
+                         tuple(tiles[0][1]) == (0, 0) + img.size and
+                         tuple(tiles[0][3]) in (('RGB', 0, 1), ('L', 0, 1)))
+            if self._raw:
+                self._offset = tiles[0][2]
+                self._bands = Image.getmodebands(tiles[0][3][0])
+        self._full = None
+
+    @property
+    def is_raw(self):
+        """True if bands are read from the file without decoding the whole image"""
+        return self._raw
+
+    def band(self, top, bottom):
+        """
+        Return rows [top, bottom) as an RGB (or L) array
+
+        Args:
+            top: First row
+            bottom: Row after the last one
+
+        Returns:
+            numpy array of shape (bottom - top, width[, channels])
+        """
+        if self._raw:
+            # The strip holds the pixels as stored, row after row: read the band's bytes
+            width = self.size[0]
+            stride = width * self._bands
+            band = np.fromfile(self.path, dtype=np.uint8, count=(bottom - top) * stride,
+                               offset=self._offset + top * stride)
+            shape = (bottom - top, width) if self._bands == 1 else (bottom - top, width, self._bands)
+            return band.reshape(shape)
+        if self._full is None:
+            with large_images(), Image.open(self.path) as img:
+                self._full = np.asarray(_normalize_mode(img))
+        return self._full[top:bottom]
+
+
+def _normalize_mode(img):
+    if img.mode in ('RGB', 'L'):
+        img.load()
+        return img
+    return img.convert('RGB')
+
+
+def _keep_empty(policy, ratio, seed, name, x0, y0):
+    """Seeded per-tile decision, identical in every process and run"""
+    if policy == EMPTY_KEEP:
+        return True
+    if policy == EMPTY_DROP:
+        return False
+    return zlib.crc32(f"{seed}:{name}:{x0}:{y0}".encode('utf-8')) / 0xFFFFFFFF < ratio
+
+
+def plan_tiles(image_path, label_path, tile_size, stride, empty_policy=EMPTY_KEEP,
+               empty_ratio=0.1, min_visibility=0.3, seed=0):
+    """
+    Choose the tiles of one image from its header and labels, without decoding it
+
+    Args:
+        image_path: Source image
+        label_path: Source YOLO label file, or None if the image has none
+        tile_size: Tile width and height in pixels
+        stride: Distance between tile starts in pixels
+        empty_policy: EMPTY_KEEP, EMPTY_DROP or EMPTY_SAMPLE
+        empty_ratio: Fraction of empty tiles kept with EMPTY_SAMPLE
+        min_visibility: Minimum visible fraction of a box to keep it in a tile
+        seed: Seed for EMPTY_SAMPLE
+
+    Returns:
+        Tuple (bands, (tile_w, tile_h), empty_tiles_skipped, boxes). Each band
+        is (top, bottom, frame bytes, tile_rows) with tile_rows a list of
+        (y0, [(x0, rows), ...]): raw images are read one tile row per band,
+        others are decoded whole into a single band.
+    """
+    name = os.path.basename(image_path)
+    rows = np.empty((0, 5), dtype=np.float32)
+    if label_path is not None:
+        with open(label_path, 'r', encoding='utf-8', errors='replace') as f:
+            rows = parse_label_text(f.read())
+
+    reader = RegionReader(image_path)
+    image_w, image_h = reader.size
+    tile_w, tile_h = min(tile_size, image_w), min(tile_size, image_h)
+
+    tile_rows = []
+    skipped = boxes = 0
+    for y0 in tile_origins(image_h, tile_h, stride):
+        tiles = []
+        for x0 in tile_origins(image_w, tile_w, stride):
+            tile_boxes = clip_boxes(rows, image_w, image_h, x0, y0, tile_w, tile_h, min_visibility)
+            if len(tile_boxes) == 0 and not _keep_empty(empty_policy, empty_ratio, seed, name, x0, y0):
+                skipped += 1
+                continue
+            tiles.append((x0, tile_boxes))
+            boxes += len(tile_boxes)
+        if tiles:
+            tile_rows.append((y0, tiles))
+
+    row_bytes = image_w * 3
+    if not tile_rows:
+        bands = []
+    elif reader.is_raw:
+        bands = [(y0, y0 + tile_h, tile_h * row_bytes, [(y0, tiles)]) for y0, tiles in tile_rows]
+    else:
+        bands = [(0, image_h, image_h * row_bytes, tile_rows)]
+    return bands, (tile_w, tile_h), skipped, boxes
+
+
+def load_band(ref, image_path, top, bottom):
+    """Decode rows [top, bottom) of an image into a frame slot (runs in worker processes)"""
+    band = RegionReader(image_path).band(top, bottom)
+    slot_array(ref, band.shape)[...] = band
+    return band.shape
+
+
+def write_tiles(ref, shape, top, y0, tiles, tile_size, stem, ext, images_out, labels_out):
+    """
+    Write one row of tiles from a band in a frame slot (runs in worker processes)
+
+    Args:
+        ref, shape: Frame slot and shape of the band (see load_band)
+        top: Image row of the band's first row
+        y0: Image row of the tiles' top edge
+        tiles: List of (x0, YOLO rows of the tile)
+        tile_size: (tile width, tile height)
+        stem, ext: Source file stem and output extension
+        images_out, labels_out: Output folders
+
+    Returns:
+        Number of tiles written
+    """
+    band = slot_array(ref, shape)
+    tile_w, tile_h = tile_size
+    for x0, rows in tiles:
+        tile_name = f"{stem}_x{x0}_y{y0}"
+        Image.fromarray(band[y0 - top:y0 - top + tile_h, x0:x0 + tile_w]).save(
+            os.path.join(images_out, tile_name + ext), quality=95)
+        with open(os.path.join(labels_out, tile_name + '.txt'), 'w', encoding='utf-8') as f:
+            f.write(format_label_rows(rows))
+    return len(tiles)
+
+
+def run_tiling(images_dir, labels_dir, output_path, tile_size=640, overlap=128,
+               empty_policy=EMPTY_SAMPLE, empty_ratio=0.1, min_visibility=0.3,
+               output_ext=SAME_FORMAT, random_seed=42, on_existing=ON_EXISTING_KEEP,
+               max_workers=None, log=print_log, progress=None, is_cancelled=None):
+    """
+    Run a Tile sampling job over a folder of images and a folder of YOLO labels
+
+    Args:
+        images_dir: Folder containing the source images
+        labels_dir: Folder containing label files with the same stems (images
+            without a label file are tiled as having no boxes)
+        output_path: Folder receiving 'images' and 'labels'
+        tile_size: Tile width and height in pixels
+        overlap: Overlap between neighbouring tiles in pixels
+        empty_policy: EMPTY_KEEP, EMPTY_DROP or EMPTY_SAMPLE for tiles without boxes
+        empty_ratio: Fraction of empty tiles kept with EMPTY_SAMPLE
+        min_visibility: Minimum visible fraction of a box to keep it in a tile
+        output_ext: Tile extension or SAME_FORMAT
+        random_seed: Seed for EMPTY_SAMPLE
+        on_existing: Policy for files already in the output folders
+        max_workers: Worker processes (default: min(CPU count, DEFAULT_MAX_WORKERS))
+        log: Callable receiving messages
+        progress: Optional callable(done, total) counted in source images
+        is_cancelled: Optional callable returning True to stop early
+
+    Returns:
+        Number of tiles written
+
+    Raises:
+        SamplingError: If the job cannot run
+    """
+    if not images_dir or not os.path.isdir(images_dir):
+        raise SamplingError("Invalid images folder path")
+    if not output_path:
+        raise SamplingError("Please select an output folder")
+    if tile_size < 32:
+        raise SamplingError("Tile size must be at least 32 pixels")
+    if not 0 <= overlap < tile_size:
+        raise SamplingError("Overlap must be smaller than the tile size")
+    if empty_policy not in EMPTY_POLICIES:
+        raise SamplingError(f"Unknown empty tile policy: {empty_policy}")
+
+    images = list_files(images_dir, KIND_IMAGE) or []
+    labels = set()
+    if labels_dir:
+        labels = {name[:-4] for name, _ in (list_files(labels_dir, KIND_LABEL) or [])}
+    if not images:
+        raise SamplingError("No images found")
+
+    log("=" * 50)
+    log("Starting tiling process...")
+    log(f"Images folder: {images_dir}")
+    log(f"Labels folder: {labels_dir or 'none'}")
+    log(f"Output folder: {output_path}")
+    log(f"Tile size: {tile_size}, overlap: {overlap}, empty tiles: {empty_policy}"
+        + (f" ({empty_ratio:.0%})" if empty_policy == EMPTY_SAMPLE else ""))
+    log("=" * 50)
+
+    unlabeled = sum(1 for name, _ in images if split_name(name)[0] not in labels)
+    log(f"Step 1: Found {len(images)} images ({unlabeled} without a label file)")
+
+    log("Step 2: Preparing output folders...")
+    prepare_output(output_path, on_existing, log=log)
+    images_out, labels_out = output_folders(output_path)
+
+    log("Step 3: Cutting tiles...")
+    tasks = []
+    for name, _ in sorted(images):
+        stem = split_name(name)[0]
+        label_path = os.path.join(labels_dir, stem + '.txt') if stem in labels else None
+        tasks.append((os.path.join(images_dir, name), label_path))
+
+    totals = [0, 0, 0]
+    done = 0
+    workers = max_workers or min(os.cpu_count() or 1, DEFAULT_MAX_WORKERS)
+
+    def cancelled():
+        return is_cancelled is not None and is_cancelled()
+
+    def bands():
+        """Plan the images in turn and yield (image path, band, image job) per band to decode"""
+        nonlocal done
+        for image_path, label_path in tasks:
+            try:
+                image_bands, tile_wh, skipped, boxes = plan_tiles(
+                    image_path, label_path, tile_size, tile_size - overlap, empty_policy,
+                    empty_ratio, min_visibility, random_seed)
+            except Exception as e:
+                log(f"Warning: Could not tile {os.path.basename(image_path)}: {e}")
+                image_bands = []
+            else:
+                totals[1] += skipped
+                totals[2] += boxes
+            if not image_bands:
+                done += 1
+                continue
+            stem, ext = split_name(os.path.basename(image_path))
+            # 'left' counts the bands still to decode plus the tile rows still to write
+            job = {'left': len(image_bands), 'tile_size': tile_wh, 'stem': stem,
+                   'ext': ext if output_ext == SAME_FORMAT else output_ext}
+            for band in image_bands:
+                yield image_path, band, job
+
+    def finish(job):
+        nonlocal done
+        job['left'] -= 1
+        if job['left'] == 0:
+            done += 1
+
+    with FramePool(workers, slots=workers + 1, mp_context=pool_context()) as pool:
+        pending = {}  # future -> (image path, band, image job, frame slot, True if it decodes)
+        band_iter = bands()
+        queued = None
+        while True:
+            # Backpressure: the next band is only decoded once a frame slot is free
+            while not cancelled() and len(pending) < 2 * workers:
+                if queued is None:
+                    queued = next(band_iter, None)
+                    if queued is None:
+                        break
+                image_path, (top, bottom, nbytes, _), job = queued
+                ref = pool.acquire(nbytes, block=not pending)
+                if ref is None:
+                    break
+                future = pool.submit(ref, load_band, image_path, top, bottom)
+                pending[future] = queued + (ref, True)
+                queued = None
+            if not pending:
+                break
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                image_path, band, job, ref, decoding = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    log(f"Warning: Could not tile {os.path.basename(image_path)}: {e}")
+                    result = None
+                if not decoding:
+                    totals[0] += result or 0
+                    finish(job)
+                    continue
+                top, _, _, tile_rows = band
+                if result is not None and not cancelled():
+                    job['left'] += len(tile_rows)
+                    for y0, tiles in tile_rows:
+                        task = pool.submit(ref, write_tiles, result, top, y0, tiles,
+                                           job['tile_size'], job['stem'], job['ext'],
+                                           images_out, labels_out)
+                        pending[task] = (image_path, band, job, ref, False)
+                finish(job)
+                pool.release(ref)
+            if progress is not None:
+                progress(done, len(tasks))
+
+    check_cancelled(is_cancelled)
+    written, skipped, boxes = totals
+    log("=" * 50)
+    log("✓ Tiling completed successfully!")
+    log(f"✓ {written} tiles with {boxes} boxes written from {done} images "
+        f"({skipped} empty tiles skipped)")
+    log("=" * 50)
+    return written
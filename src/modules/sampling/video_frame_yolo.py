@@ -4,27 +4,59 @@ Handles sampling of image/label pairs from video frame datasets
 """
 
 import os
-import random
-import shutil
-from pathlib import Path
-from PIL import Image
 
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
                               QLineEdit, QGroupBox, QSpinBox, QListWidget, QSplitter,
-                              QGridLayout, QListWidgetItem, QMessageBox, QFileDialog,
-                              QApplication, QProgressBar)
-from PySide6.QtCore import Qt
+                              QGridLayout, QListWidgetItem, QFileDialog,
+                              QProgressBar, QComboBox)
+from PySide6.QtCore import Qt, QTimer, Signal
 
 from src.utils.file_utils import format_file_size
+from src.utils.materialize import MODE_COPY, MODE_HARDLINK, MODE_REFLINK, MODE_SYMLINK
+from src.utils.shards import MODE_TAR
+from src.utils.packed import MODE_PACKED
+from src.utils.journal import journal_progress
+from src.modules.sampling.workers import DatasetAnalysisWorker, SamplingWorker, start_in_thread
+from src.modules.sampling.dataset_index import DatasetIndex
+from src.modules.sampling.engine import (list_video_folders, find_existing_outputs,
+                                         parse_class_quotas, SamplingError, ON_EXISTING_KEEP,
+                                         ON_EXISTING_ABORT)
+from src.modules.sampling.dialogs import ask_existing_files
+from src.modules.sampling.samplers import WEIGHT_UNIFORM, WEIGHT_INVERSE_FREQUENCY
+from src.modules.sampling.label_store import AREA_BIN_LABELS, ASPECT_BIN_LABELS
+
+
+def format_distribution(stats, fmt):
+    """Format a StreamingStats as percentiles plus min/max"""
+    if stats.count == 0:
+        return "N/A"
+    p50, p95, p99 = stats.percentiles()
+    return (f"p50: {fmt(p50)}, p95: {fmt(p95)}, p99: {fmt(p99)} "
+            f"(Min: {fmt(stats.min)}, Max: {fmt(stats.max)}, Mean: {fmt(stats.mean)})")
 
 
 class VideoFrameYoloWidget(QWidget):
     """UI and logic for Video Frame - Yolo sampling mode"""
 
+    # Emitted when a cancellable background task starts/ends (drives the Stop button)
+    task_started = Signal()
+    task_finished = Signal()
+    sampling_finished = Signal()
+
     def __init__(self, log_text, progress_bar):
         super().__init__()
         self.log_text = log_text
         self.progress_bar = progress_bar
+        self.analysis_thread = None
+        self.analysis_worker = None
+        self.sampling_thread = None
+        self.sampling_worker = None
+        self.index = None
+
+        # Coalesces sampling progress into ~20 UI updates per second
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(50)
+        self.progress_timer.timeout.connect(self.update_sampling_progress)
         self.init_ui()
 
     def init_ui(self):
@@ -120,16 +152,42 @@ class VideoFrameYoloWidget(QWidget):
 
         stats_layout.addWidget(QLabel("Image File Size:"), 5, 0)
         self.file_size_label = QLabel("N/A")
+        self.file_size_label.setWordWrap(True)
         stats_layout.addWidget(self.file_size_label, 5, 1)
 
         stats_layout.addWidget(QLabel("Annotations per File:"), 6, 0)
         self.annotations_label = QLabel("N/A")
+        self.annotations_label.setWordWrap(True)
         stats_layout.addWidget(self.annotations_label, 6, 1)
 
         stats_layout.addWidget(QLabel("Classes Found:"), 7, 0)
         self.classes_label = QLabel("N/A")
         stats_layout.addWidget(self.classes_label, 7, 1)
 
+        stats_layout.addWidget(QLabel("Instances per Class:"), 8, 0)
+        self.class_instances_label = QLabel("N/A")
+        self.class_instances_label.setWordWrap(True)
+        stats_layout.addWidget(self.class_instances_label, 8, 1)
+
+        stats_layout.addWidget(QLabel("Images per Class:"), 9, 0)
+        self.images_per_class_label = QLabel("N/A")
+        self.images_per_class_label.setWordWrap(True)
+        stats_layout.addWidget(self.images_per_class_label, 9, 1)
+
+        stats_layout.addWidget(QLabel("BBox Area:"), 10, 0)
+        self.bbox_area_label = QLabel("N/A")
+        self.bbox_area_label.setWordWrap(True)
+        stats_layout.addWidget(self.bbox_area_label, 10, 1)
+
+        stats_layout.addWidget(QLabel("BBox Aspect:"), 11, 0)
+        self.bbox_aspect_label = QLabel("N/A")
+        self.bbox_aspect_label.setWordWrap(True)
+        stats_layout.addWidget(self.bbox_aspect_label, 11, 1)
+
+        stats_layout.addWidget(QLabel("Small Objects:"), 12, 0)
+        self.small_objects_label = QLabel("N/A")
+        stats_layout.addWidget(self.small_objects_label, 12, 1)
+
         stats_group.setLayout(stats_layout)
         right_layout.addWidget(stats_group)
 
@@ -151,6 +209,36 @@ class VideoFrameYoloWidget(QWidget):
         self.random_seed.setValue(42)
         sampling_layout.addWidget(self.random_seed, 1, 1)
 
+        # Class-aware sampling (reads label class IDs, uniform streaming sample otherwise)
+        sampling_layout.addWidget(QLabel("Class Weighting:"), 2, 0)
+        self.class_weighting = QComboBox()
+        self.class_weighting.addItem("Uniform", WEIGHT_UNIFORM)
+        self.class_weighting.addItem("Inverse class frequency (favour rare classes)",
+                                     WEIGHT_INVERSE_FREQUENCY)
+        sampling_layout.addWidget(self.class_weighting, 2, 1)
+
+        sampling_layout.addWidget(QLabel("Min Frames per Class:"), 3, 0)
+        self.min_per_class = QSpinBox()
+        self.min_per_class.setRange(0, 100000)
+        self.min_per_class.setValue(0)
+        sampling_layout.addWidget(self.min_per_class, 3, 1)
+
+        sampling_layout.addWidget(QLabel("Class Quotas:"), 4, 0)
+        self.class_quotas = QLineEdit()
+        self.class_quotas.setPlaceholderText("e.g. 0=100, 3=50 (overrides the minimum per class)")
+        sampling_layout.addWidget(self.class_quotas, 4, 1)
+
+        # Diversity: skip frames that look almost the same as already sampled ones
+        sampling_layout.addWidget(QLabel("Near-Duplicate Distance:"), 5, 0)
+        self.dedup_distance = QSpinBox()
+        self.dedup_distance.setRange(0, 32)
+        self.dedup_distance.setValue(0)
+        self.dedup_distance.setSpecialValueText("Off")
+        self.dedup_distance.setToolTip("Frames whose 64-bit perceptual hash differs in at most this\n"
+                                       "many bits from an already sampled frame are skipped\n"
+                                       "(about 5-10 works well).")
+        sampling_layout.addWidget(self.dedup_distance, 5, 1)
+
         sampling_group.setLayout(sampling_layout)
         right_layout.addWidget(sampling_group)
 
@@ -168,6 +256,24 @@ class VideoFrameYoloWidget(QWidget):
         output_path_layout.addWidget(self.output_browse_btn)
         output_layout.addLayout(output_path_layout)
 
+        mode_layout = QHBoxLayout()
+        mode_layout.addWidget(QLabel("Output Mode:"))
+        self.output_mode = QComboBox()
+        self.output_mode.addItem("Copy", MODE_COPY)
+        self.output_mode.addItem("Hardlink (same disk, no extra space)", MODE_HARDLINK)
+        self.output_mode.addItem("Reflink / copy-on-write clone", MODE_REFLINK)
+        self.output_mode.addItem("Symlink", MODE_SYMLINK)
+        self.output_mode.addItem("Tar shards (WebDataset, 1 GB each)", MODE_TAR)
+        self.output_mode.addItem("Packed dataset (memory-mapped, for training)", MODE_PACKED)
+        self.output_mode.setToolTip("Unsupported modes fall back to a full copy automatically.\n"
+                                    "Hardlinks and symlinks share data with the source files.\n"
+                                    "Tar shards are written to a 'shards' folder instead of\n"
+                                    "loose files in 'images' and 'labels'; a packed dataset\n"
+                                    "(one image blob, boxes and offset index) to 'packed'.")
+        mode_layout.addWidget(self.output_mode)
+        mode_layout.addStretch()
+        output_layout.addLayout(mode_layout)
+
         output_group.setLayout(output_layout)
         right_layout.addWidget(output_group)
 
@@ -207,7 +313,7 @@ class VideoFrameYoloWidget(QWidget):
             self.log_text.append(f"Output folder selected: {folder}")
 
     def analyze_dataset(self):
-        """Analyze the dataset and display statistics"""
+        """Analyze the dataset in a background worker and display statistics"""
         input_path = self.input_path.text()
         if not input_path:
             self.log_text.append("Error: Please select an input folder first")
@@ -217,6 +323,16 @@ class VideoFrameYoloWidget(QWidget):
             self.log_text.append("Error: Input folder does not exist")
             return
 
+        if self.is_busy():
+            self.log_text.append("Error: Another task is already running")
+            return
+
+        # Get selected video folders from the list
+        selected_folders = self.get_selected_folders()
+        if not selected_folders:
+            self.log_text.append("Error: No video folders selected")
+            return
+
         # Change button appearance to yellow "Thinking" state
         self.analyze_btn.setText("Thinking")
         self.analyze_btn.setStyleSheet("QPushButton { background-color: #FFC107; color: white; }")
@@ -224,171 +340,153 @@ class VideoFrameYoloWidget(QWidget):
 
         # Show and initialize progress bar
         self.analysis_progress.setVisible(True)
+        self.analysis_progress.setMaximum(0)  # Busy indicator until the file total is known
         self.analysis_progress.setValue(0)
+        self.analysis_progress.setFormat(f"Listing {len(selected_folders)} folder(s)...")
 
         self.log_text.append("=" * 50)
         self.log_text.append(f"Analyzing dataset at: {input_path}")
-        QApplication.processEvents()
 
-        try:
-            # Get selected video folders from the list
-            selected_folders = []
-            for i in range(self.folders_list.count()):
-                item = self.folders_list.item(i)
-                if item.checkState() == Qt.Checked:
-                    selected_folders.append(item.text())
-
-            if not selected_folders:
-                self.log_text.append("Error: No video folders selected")
-                return
+        # Run the analysis on a worker thread that fans out to a process pool
+        self.analysis_worker = DatasetAnalysisWorker(input_path, selected_folders)
+        self.analysis_worker.progress.connect(self.on_analysis_progress)
+        self.analysis_worker.finished.connect(self.on_analysis_finished)
+        self.analysis_worker.cancelled.connect(self.on_analysis_cancelled)
+        self.analysis_worker.failed.connect(self.on_analysis_failed)
+        self.analysis_thread = start_in_thread(
+            self.analysis_worker, self,
+            (self.analysis_worker.finished, self.analysis_worker.cancelled, self.analysis_worker.failed))
+        self.analysis_thread.finished.connect(self.on_analysis_thread_finished)
+
+        self.task_started.emit()
+        self.analysis_thread.start()
+
+    def is_busy(self):
+        """Return True while an analysis or sampling job is running"""
+        return self.analysis_worker is not None or self.sampling_worker is not None
+
+    def cancel_current_task(self):
+        """Ask the running analysis or sampling worker to stop"""
+        if self.analysis_worker is not None:
+            self.analysis_worker.cancel()
+            self.analysis_progress.setFormat("Cancelling...")
+            self.log_text.append("Cancelling analysis...")
+        if self.sampling_worker is not None and not self.sampling_worker.is_cancelled():
+            self.sampling_worker.cancel()
+            self.log_text.append("Stopping sampling after the files in progress...")
+
+    def on_analysis_progress(self, done, total, message):
+        """Update the analysis progress bar from worker progress"""
+        if total > 0:
+            self.analysis_progress.setMaximum(total)
+            self.analysis_progress.setValue(done)
+        self.analysis_progress.setFormat(message)
+
+    def on_analysis_finished(self, stats):
+        """Display merged statistics from the analysis worker"""
+        # Calculate statistics
+        num_folders = stats.folders_with_images
+        folder_counts = stats.folder_image_counts
+        num_classes = len(stats.classes)
+
+        # Update UI labels
+        self.total_images_label.setText(str(stats.total_images))
+        self.total_labels_label.setText(str(stats.total_labels))
+        self.video_folders_label.setText(str(num_folders))
+        if folder_counts.count:
+            self.images_per_folder_label.setText(
+                f"Min: {folder_counts.min:.0f}, Max: {folder_counts.max:.0f}, Avg: {folder_counts.mean:.1f}")
+        else:
+            self.images_per_folder_label.setText("Min: 0, Max: 0, Avg: 0.0")
+
+        # Format resolutions
+        if stats.resolutions:
+            # Get top 5 most common resolutions
+            sorted_res = sorted(stats.resolutions.items(), key=lambda x: x[1], reverse=True)[:5]
+            res_text = ", ".join([f"{res} ({count})" for res, count in sorted_res])
+            p50, p95, p99 = (v / 1e6 for v in stats.pixel_counts.percentiles())
+            res_text += f"\nMegapixels p50: {p50:.2f}, p95: {p95:.2f}, p99: {p99:.2f}"
+            self.resolutions_label.setText(res_text)
+        else:
+            self.resolutions_label.setText("N/A")
+
+        # Format file sizes
+        self.file_size_label.setText(format_distribution(stats.file_sizes, lambda v: format_file_size(int(v))))
+        self.annotations_label.setText(format_distribution(stats.annotation_counts, lambda v: f"{v:.1f}"))
+        self.classes_label.setText(str(num_classes))
+        self.display_label_statistics(stats.labels)
+
+        # Log results
+        self.log_text.append(f"✓ Analysis complete!")
+        self.log_text.append(f"  Total images: {stats.total_images}")
+        self.log_text.append(f"  Total labels: {stats.total_labels}")
+        self.log_text.append(f"  Video folders analyzed: {num_folders}")
+        self.log_text.append(f"  Classes found: {num_classes}")
+        self.log_text.append("=" * 50)
 
-            # Set progress bar maximum
-            self.analysis_progress.setMaximum(len(selected_folders))
-
-            # Initialize statistics
-            total_images = 0
-            total_labels = 0
-            folder_image_counts = []
-            resolutions = {}
-            file_sizes = []
-            annotation_counts = []
-            all_classes = set()
-            image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif'}
-
-            # Analyze each selected video folder
-            for folder_idx, folder_name in enumerate(selected_folders):
-                video_folder_path = os.path.join(input_path, folder_name)
-                frames_folder = os.path.join(video_folder_path, 'frames')
-                labels_folder = os.path.join(video_folder_path, 'labels')
-
-                # Update progress
-                self.analysis_progress.setValue(folder_idx + 1)
-                self.analysis_progress.setFormat(f"Analyzing folder {folder_idx + 1}/{len(selected_folders)}: {folder_name}")
-                QApplication.processEvents()
-
-                # Check if folders exist
-                if not os.path.exists(frames_folder) or not os.path.exists(labels_folder):
-                    continue
-
-                # OPTIMIZATION: Get all files at once
-                try:
-                    frame_files = os.listdir(frames_folder)
-                except Exception:
-                    continue
-
-                # Filter image files
-                image_files = [f for f in frame_files if Path(f).suffix.lower() in image_extensions]
-                folder_images = len(image_files)
-                total_images += folder_images
-                folder_image_counts.append(folder_images)
-
-                # Process ALL image files - get file sizes and resolutions
-                for idx, image_file in enumerate(image_files):
-                    image_path = os.path.join(frames_folder, image_file)
-
-                    try:
-                        # Get file size (very fast - just reads filesystem metadata)
-                        file_size = os.path.getsize(image_path)
-                        file_sizes.append(file_size)
-
-                        # Get image resolution using PIL (only reads header, not full image - ~2-3ms per image)
-                        with Image.open(image_path) as img:
-                            resolution = f"{img.width}x{img.height}"
-                            resolutions[resolution] = resolutions.get(resolution, 0) + 1
-                    except Exception:
-                        pass  # Skip files that can't be read
-
-                    # Update progress every 50 images to keep UI responsive
-                    if (idx + 1) % 50 == 0:
-                        self.analysis_progress.setFormat(
-                            f"Analyzing folder {folder_idx + 1}/{len(selected_folders)}: {folder_name} "
-                            f"({idx + 1}/{len(image_files)} images)"
-                        )
-                        QApplication.processEvents()
-
-                # Analyze ALL label files (text files are fast to read)
-                try:
-                    label_files = [f for f in os.listdir(labels_folder) if f.endswith('.txt')]
-                    total_labels += len(label_files)
-
-                    # Read ALL label files - they're tiny text files
-                    for label_file in label_files:
-                        label_path = os.path.join(labels_folder, label_file)
-                        try:
-                            with open(label_path, 'r') as f:
-                                lines = f.readlines()
-                                annotation_counts.append(len(lines))
-
-                                # Extract class IDs (first number in each line)
-                                for line in lines:
-                                    parts = line.strip().split()
-                                    if parts:
-                                        try:
-                                            all_classes.add(int(parts[0]))
-                                        except ValueError:
-                                            pass
-                        except Exception:
-                            pass
-                except Exception:
-                    pass
-
-            # Calculate statistics
-            num_folders = len([c for c in folder_image_counts if c > 0])
-            min_images = min(folder_image_counts) if folder_image_counts else 0
-            max_images = max(folder_image_counts) if folder_image_counts else 0
-            avg_images = sum(folder_image_counts) / len(folder_image_counts) if folder_image_counts else 0
-
-            min_file_size = min(file_sizes) if file_sizes else 0
-            max_file_size = max(file_sizes) if file_sizes else 0
-
-            min_annotations = min(annotation_counts) if annotation_counts else 0
-            max_annotations = max(annotation_counts) if annotation_counts else 0
-
-            num_classes = len(all_classes)
-
-            # Update UI labels
-            self.total_images_label.setText(str(total_images))
-            self.total_labels_label.setText(str(total_labels))
-            self.video_folders_label.setText(str(num_folders))
-            self.images_per_folder_label.setText(f"Min: {min_images}, Max: {max_images}, Avg: {avg_images:.1f}")
-
-            # Format resolutions
-            if resolutions:
-                # Get top 5 most common resolutions
-                sorted_res = sorted(resolutions.items(), key=lambda x: x[1], reverse=True)[:5]
-                res_text = ", ".join([f"{res} ({count})" for res, count in sorted_res])
-                self.resolutions_label.setText(res_text)
-            else:
-                self.resolutions_label.setText("N/A")
-
-            # Format file sizes
-            min_size_str = format_file_size(min_file_size)
-            max_size_str = format_file_size(max_file_size)
-            self.file_size_label.setText(f"Min: {min_size_str}, Max: {max_size_str}")
-
-            self.annotations_label.setText(f"Min: {min_annotations}, Max: {max_annotations}")
-            self.classes_label.setText(str(num_classes))
-
-            # Log results
-            self.log_text.append(f"✓ Analysis complete!")
-            self.log_text.append(f"  Total images: {total_images}")
-            self.log_text.append(f"  Total labels: {total_labels}")
-            self.log_text.append(f"  Video folders analyzed: {num_folders}")
-            self.log_text.append(f"  Classes found: {num_classes}")
-            self.log_text.append("=" * 50)
+    def display_label_statistics(self, labels):
+        """Show vectorized box statistics from the columnar label store"""
+        if labels is None or labels.num_boxes == 0:
+            for label in (self.class_instances_label, self.images_per_class_label,
+                          self.bbox_area_label, self.bbox_aspect_label, self.small_objects_label):
+                label.setText("N/A")
+            return
 
-        except Exception as e:
-            self.log_text.append(f"Error during analysis: {str(e)}")
-            import traceback
-            self.log_text.append(traceback.format_exc())
-        finally:
-            # Restore button to original state
-            self.analyze_btn.setText("Analyze")
-            self.analyze_btn.setStyleSheet("QPushButton { background-color: #2196F3; color: white; }")
-            self.analyze_btn.setEnabled(True)
-
-            # Hide progress bar
-            self.analysis_progress.setVisible(False)
+        def format_counts(counts, limit=10):
+            items = sorted(counts.items())
+            text = ", ".join(f"{class_id}: {count}" for class_id, count in items[:limit])
+            if len(items) > limit:
+                text += f", ... (+{len(items) - limit} more)"
+            return text
+
+        def format_histogram(counts, names):
+            total = max(int(counts.sum()), 1)
+            return ", ".join(f"{name}: {100 * count / total:.1f}%" for name, count in zip(names, counts))
+
+        self.class_instances_label.setText(format_counts(labels.class_counts()))
+        self.images_per_class_label.setText(format_counts(labels.images_per_class()))
+        self.bbox_area_label.setText(format_histogram(labels.area_histogram(), AREA_BIN_LABELS))
+        self.bbox_aspect_label.setText(format_histogram(labels.aspect_histogram(), ASPECT_BIN_LABELS))
+        self.small_objects_label.setText(f"{100 * labels.small_object_ratio():.1f}% (< 32x32 px)")
+
+    def on_analysis_cancelled(self):
+        self.log_text.append("Analysis cancelled by user")
+        self.log_text.append("=" * 50)
+
+    def on_analysis_failed(self, error):
+        self.log_text.append(f"Error during analysis: {error}")
+
+    def on_analysis_thread_finished(self):
+        """Restore the analyze button once the worker thread has exited"""
+        self.analysis_worker = None
+        self.analysis_thread = None
+
+        # Restore button to original state
+        self.analyze_btn.setText("Analyze")
+        self.analyze_btn.setStyleSheet("QPushButton { background-color: #2196F3; color: white; }")
+        self.analyze_btn.setEnabled(True)
+
+        # Hide progress bar
+        self.analysis_progress.setVisible(False)
+        self.task_finished.emit()
+
+    def open_index(self, input_path):
+        """Return the dataset index for input_path, reusing the open one if possible"""
+        if self.index is not None and self.index.root != os.path.abspath(input_path):
+            self.index.close()
+            self.index = None
+        if self.index is None:
+            self.index = DatasetIndex(input_path, log=self.log_text.append)
+        return self.index
+
+    def get_selected_folders(self):
+        """Return the names of all checked video folders"""
+        selected_folders = []
+        for i in range(self.folders_list.count()):
+            item = self.folders_list.item(i)
+            if item.checkState() == Qt.Checked:
+                selected_folders.append(item.text())
+        return selected_folders
 
     def select_all_folders(self):
         """Select all video folders"""
@@ -412,17 +510,16 @@ class VideoFrameYoloWidget(QWidget):
         # Clear existing list
         self.folders_list.clear()
 
-        # Scan for subfolders
+        # Scan for subfolders (served from the dataset index when unchanged)
         try:
-            subfolders = [f for f in os.listdir(input_path)
-                         if os.path.isdir(os.path.join(input_path, f))]
+            subfolders = list_video_folders(input_path, self.open_index(input_path))
 
             if not subfolders:
                 self.log_text.append("No subfolders found in the selected directory")
                 return
 
             # Add each subfolder to the list with a checkbox
-            for folder_name in sorted(subfolders):
+            for folder_name in subfolders:
                 item = QListWidgetItem(folder_name)
                 item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
                 item.setCheckState(Qt.Checked)  # Default to checked
@@ -434,184 +531,76 @@ class VideoFrameYoloWidget(QWidget):
             self.log_text.append(f"Error scanning folders: {str(e)}")
 
     def start_sampling(self):
-        """Start sampling for Video Frame - Yolo mode"""
-        # Validate inputs
-        input_path = self.input_path.text()
+        """
+        Start sampling for Video Frame - Yolo mode in a background worker
+
+        Returns:
+            True if a job was started (sampling_finished follows), False otherwise
+        """
+        if self.is_busy():
+            self.log_text.append("Error: Another task is already running")
+            return False
+
+        # Ask about existing output files up front, the worker cannot show dialogs
+        on_existing = ON_EXISTING_KEEP
         output_path = self.output_path.text()
-
-        if not input_path:
-            self.log_text.append("Error: Please select an input folder")
-            return
-
-        if not output_path:
-            self.log_text.append("Error: Please select an output folder")
-            return
-
-        if not os.path.exists(input_path):
-            self.log_text.append("Error: Input folder does not exist")
-            return
-
-        # Get selected video folders
-        selected_folders = []
-        for i in range(self.folders_list.count()):
-            item = self.folders_list.item(i)
-            if item.checkState() == Qt.Checked:
-                selected_folders.append(item.text())
-
-        if not selected_folders:
-            self.log_text.append("Error: No video folders selected")
-            return
-
-        sample_size = self.sample_size.value()
-        random_seed = self.random_seed.value()
-
-        self.log_text.append("=" * 50)
-        self.log_text.append("Starting sampling process...")
-        self.log_text.append(f"Input folder: {input_path}")
-        self.log_text.append(f"Output folder: {output_path}")
-        self.log_text.append(f"Selected folders: {len(selected_folders)}")
-        self.log_text.append(f"Sample size: {sample_size}")
-        self.log_text.append(f"Random seed: {random_seed}")
-        self.log_text.append("=" * 50)
-
-        try:
-            # Step 1: Collect all image/label pairs from selected folders
-            self.log_text.append("Step 1: Collecting image/label pairs...")
-            QApplication.processEvents()  # Update UI immediately
-
-            image_label_pairs = []
-            image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif'}
-
-            for folder_name in selected_folders:
-                video_folder_path = os.path.join(input_path, folder_name)
-                frames_folder = os.path.join(video_folder_path, 'frames')
-                labels_folder = os.path.join(video_folder_path, 'labels')
-
-                # Check if frames and labels folders exist
-                if not os.path.exists(frames_folder):
-                    self.log_text.append(f"Warning: 'frames' folder not found in {folder_name}, skipping...")
-                    continue
-
-                if not os.path.exists(labels_folder):
-                    self.log_text.append(f"Warning: 'labels' folder not found in {folder_name}, skipping...")
-                    continue
-
-                # Get all label files once (much faster than checking existence for each image)
-                label_files = {Path(f).stem for f in os.listdir(labels_folder) if f.endswith('.txt')}
-
-                # Get all image files from frames folder
-                for image_file in os.listdir(frames_folder):
-                    if Path(image_file).suffix.lower() in image_extensions:
-                        image_stem = Path(image_file).stem
-
-                        # Check if corresponding label exists in the set (O(1) lookup)
-                        if image_stem in label_files:
-                            image_path = os.path.join(frames_folder, image_file)
-                            label_path = os.path.join(labels_folder, image_stem + '.txt')
-
-                            image_label_pairs.append({
-                                'image': image_path,
-                                'label': label_path,
-                                'folder': folder_name,
-                                'filename': image_file
-                            })
-
-            self.log_text.append(f"Found {len(image_label_pairs)} valid image/label pairs")
-            QApplication.processEvents()  # Update UI after collection
-
-            if len(image_label_pairs) == 0:
-                self.log_text.append("Error: No valid image/label pairs found")
-                return
-
-            # Step 2: Randomly sample specified number
-            self.log_text.append(f"Step 2: Randomly sampling {sample_size} pairs...")
-            random.seed(random_seed)
-
-            if sample_size > len(image_label_pairs):
-                self.log_text.append(f"Warning: Sample size ({sample_size}) is larger than available pairs ({len(image_label_pairs)})")
-                self.log_text.append("Using all available pairs instead")
-                sampled_pairs = image_label_pairs
-            else:
-                sampled_pairs = random.sample(image_label_pairs, sample_size)
-
-            self.log_text.append(f"Sampled {len(sampled_pairs)} pairs")
-
-            # Step 3: Create output folders
-            self.log_text.append("Step 3: Preparing output folders...")
-            output_images_folder = os.path.join(output_path, 'images')
-            output_labels_folder = os.path.join(output_path, 'labels')
-
-            os.makedirs(output_images_folder, exist_ok=True)
-            os.makedirs(output_labels_folder, exist_ok=True)
-
-            # Check if output folders already contain files
-            existing_images = [f for f in os.listdir(output_images_folder) if os.path.isfile(os.path.join(output_images_folder, f))]
-            existing_labels = [f for f in os.listdir(output_labels_folder) if os.path.isfile(os.path.join(output_labels_folder, f))]
-
+        if output_path and self.input_path.text() and os.path.exists(self.input_path.text()):
+            existing_images, existing_labels = find_existing_outputs(
+                output_path, self.output_mode.currentData())
             if existing_images or existing_labels:
-                # Ask user what to do with existing files
-                msg_box = QMessageBox(self)
-                msg_box.setIcon(QMessageBox.Warning)
-                msg_box.setWindowTitle("Existing Files Found")
-                msg_box.setText(f"The output folders already contain files:\n"
-                               f"- {len(existing_images)} image(s)\n"
-                               f"- {len(existing_labels)} label(s)\n\n"
-                               f"Do you want to delete all existing files before sampling?")
-                msg_box.setInformativeText("Yes: Delete all existing files and start fresh\n"
-                                          "No: Keep existing files (may overwrite files with same names)\n"
-                                          "Cancel: Abort sampling operation")
-
-                yes_btn = msg_box.addButton("Yes", QMessageBox.YesRole)
-                no_btn = msg_box.addButton("No", QMessageBox.NoRole)
-                cancel_btn = msg_box.addButton("Cancel", QMessageBox.RejectRole)
-
-                msg_box.exec()
-                clicked_button = msg_box.clickedButton()
-
-                if clicked_button == cancel_btn:
+                on_existing = self.ask_existing_files(existing_images, existing_labels)
+                if on_existing == ON_EXISTING_ABORT:
                     self.log_text.append("Sampling cancelled by user")
-                    return
-                elif clicked_button == yes_btn:
-                    # Delete all existing files
-                    self.log_text.append("Deleting existing files...")
-                    for img_file in existing_images:
-                        os.remove(os.path.join(output_images_folder, img_file))
-                    for lbl_file in existing_labels:
-                        os.remove(os.path.join(output_labels_folder, lbl_file))
-                    self.log_text.append(f"Deleted {len(existing_images)} image(s) and {len(existing_labels)} label(s)")
-                else:  # No button
-                    self.log_text.append("Keeping existing files (may overwrite files with same names)")
-
-            self.log_text.append(f"Output folder ready: {output_images_folder}")
-            self.log_text.append(f"Output folder ready: {output_labels_folder}")
-
-            # Step 4: Copy sampled files to output folders
-            self.log_text.append("Step 4: Copying files...")
-            self.progress_bar.setMaximum(len(sampled_pairs))
-            self.progress_bar.setValue(0)
-
-            for idx, pair in enumerate(sampled_pairs):
-                # Copy image
-                dest_image = os.path.join(output_images_folder, pair['filename'])
-                shutil.copy2(pair['image'], dest_image)
-
-                # Copy label
-                label_filename = Path(pair['filename']).stem + '.txt'
-                dest_label = os.path.join(output_labels_folder, label_filename)
-                shutil.copy2(pair['label'], dest_label)
-
-                self.progress_bar.setValue(idx + 1)
-
-                # Update UI every 10 files to show progress
-                if (idx + 1) % 10 == 0:
-                    QApplication.processEvents()
-
-            self.log_text.append("=" * 50)
-            self.log_text.append("✓ Sampling completed successfully!")
-            self.log_text.append(f"✓ {len(sampled_pairs)} image/label pairs copied to output folder")
-            self.log_text.append("=" * 50)
+                    return False
 
-        except Exception as e:
-            self.log_text.append(f"Error during sampling: {str(e)}")
-            import traceback
-            self.log_text.append(traceback.format_exc())
+        try:
+            class_quotas = parse_class_quotas(self.class_quotas.text())
+        except SamplingError as e:
+            self.log_text.append(f"Error: {e}")
+            return False
+
+        self.progress_bar.setValue(0)
+        self.sampling_worker = SamplingWorker(input_path=self.input_path.text(),
+                                              output_path=output_path,
+                                              folders=self.get_selected_folders(),
+                                              sample_size=self.sample_size.value(),
+                                              random_seed=self.random_seed.value(),
+                                              on_existing=on_existing,
+                                              mode=self.output_mode.currentData(),
+                                              weighting=self.class_weighting.currentData(),
+                                              min_per_class=self.min_per_class.value(),
+                                              class_quotas=class_quotas,
+                                              dedup_distance=self.dedup_distance.value())
+        self.sampling_worker.message.connect(self.log_text.append)
+        self.sampling_worker.failed.connect(self.log_text.append)
+        self.sampling_thread = start_in_thread(
+            self.sampling_worker, self, (self.sampling_worker.finished, self.sampling_worker.failed))
+        self.sampling_thread.finished.connect(self.on_sampling_thread_finished)
+
+        self.task_started.emit()
+        self.progress_timer.start()
+        self.sampling_thread.start()
+        return True
+
+    def update_sampling_progress(self):
+        """Poll the worker's latest progress (timer driven, never per file)"""
+        if self.sampling_worker is None:
+            return
+        done, total = self.sampling_worker.progress_snapshot()
+        if total:
+            self.progress_bar.setMaximum(total)
+            self.progress_bar.setValue(done)
+
+    def on_sampling_thread_finished(self):
+        """Clean up once the sampling worker thread has exited"""
+        self.update_sampling_progress()
+        self.progress_timer.stop()
+        self.sampling_worker = None
+        self.sampling_thread = None
+        self.task_finished.emit()
+        self.sampling_finished.emit()
+
+    def ask_existing_files(self, existing_images, existing_labels):
+        """Ask the user what to do with files already in the output folders"""
+        return ask_existing_files(self, existing_images, existing_labels, self.output_mode.currentData(),
+                                  journal_progress(self.output_path.text()))
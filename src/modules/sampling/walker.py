@@ -0,0 +1,188 @@
+"""
+Single-pass dataset walkers for Video Frame - Yolo and Standard datasets
+Lists directories with os.scandir (or the dataset index) and pairs frames
+with labels using plain string splitting, shared by scan, analysis and sampling
+"""
+
+import os
+
+from src.utils.file_utils import split_name, is_image_name
+from src.modules.sampling.dataset_index import scan_dir, KIND_DIR, KIND_IMAGE, KIND_LABEL
+
+
+def list_subdirs(dir_path):
+    """
+    List subdirectory names using the file type cached by os.scandir
+
+    Args:
+        dir_path: Directory to list
+
+    Returns:
+        Sorted list of names, empty if the directory cannot be read
+    """
+    try:
+        with os.scandir(dir_path) as it:
+            return sorted(entry.name for entry in it if entry.is_dir())
+    except OSError:
+        return []
+
+
+def list_files(dir_path, kind, index=None):
+    """
+    List (name, size) of the images or labels of a directory in one pass
+
+    Args:
+        dir_path: Directory to list
+        kind: KIND_IMAGE or KIND_LABEL
+        index: Optional DatasetIndex; serves unchanged directories without listing them
+
+    Returns:
+        List of (name, size), or None if the directory does not exist
+    """
+    if index is not None:
+        return index.listing(dir_path, kind)
+
+    result = scan_dir(dir_path)
+    if result is None:
+        return None
+    if kind == KIND_LABEL:
+        return [(name, size) for name, is_dir, size, _ in result[1]
+                if not is_dir and name.endswith('.txt')]
+    return [(name, size) for name, is_dir, size, _ in result[1]
+            if not is_dir and is_image_name(name)]
+
+
+def pair_files(images, labels):
+    """
+    Match images with the label file of the same stem
+
+    Args:
+        images: Iterable of (name, size) of the frames
+        labels: Iterable of (name, size) of the label files
+
+    Yields:
+        Tuples (stem, image_name, image_size, label_size)
+    """
+    label_sizes = {name[:-4]: size for name, size in labels}
+    for name, size in images:
+        stem = split_name(name)[0]
+        label_size = label_sizes.get(stem)
+        if label_size is not None:
+            yield stem, name, size, label_size
+
+
+def walk_pairs(input_path, folders, index=None, log=None, is_cancelled=None, name_filter=None):
+    """
+    Walk the 'frames' and 'labels' folders of each video folder and yield matched pairs
+
+    Args:
+        input_path: Folder containing the video subfolders
+        folders: Names (or relative paths) of the video subfolders to walk
+        index: Optional DatasetIndex to serve unchanged directories from
+        log: Optional callable receiving warnings about skipped folders
+        is_cancelled: Optional callable checked once per folder
+        name_filter: Optional callable(image_name) returning True for frames to keep
+
+    Yields:
+        Tuples (folder, frames_dir, labels_dir, stem, image_name, image_size, label_size);
+        the label file is labels_dir/stem.txt
+    """
+    for folder_name in folders:
+        if is_cancelled is not None and is_cancelled():
+            return
+
+        video_folder_path = os.path.join(input_path, folder_name)
+        frames_dir = os.path.join(video_folder_path, 'frames')
+        labels_dir = os.path.join(video_folder_path, 'labels')
+
+        images = list_files(frames_dir, KIND_IMAGE, index)
+        if images is None:
+            if log is not None:
+                log(f"Warning: 'frames' folder not found in {folder_name}, skipping...")
+            continue
+
+        if name_filter is not None:
+            images = [item for item in images if name_filter(item[0])]
+            if not images:
+                continue
+
+        labels = list_files(labels_dir, KIND_LABEL, index)
+        if labels is None:
+            if log is not None:
+                log(f"Warning: 'labels' folder not found in {folder_name}, skipping...")
+            continue
+
+        for stem, image_name, image_size, label_size in pair_files(images, labels):
+            yield folder_name, frames_dir, labels_dir, stem, image_name, image_size, label_size
+
+
+def label_dir_for(image_dir, root):
+    """
+    Return the labels directory mirroring an images directory
+
+    The last 'images' component of the path below root is replaced by
+    'labels' (images/train -> labels/train, train/images -> train/labels);
+    directories outside any 'images' tree keep their labels next to the images.
+
+    Args:
+        image_dir: Directory containing images
+        root: Dataset root
+
+    Returns:
+        Path of the labels directory
+    """
+    rel = os.path.relpath(image_dir, root)
+    parts = [] if rel == os.curdir else rel.split(os.sep)
+    for i in range(len(parts) - 1, -1, -1):
+        if parts[i] == 'images':
+            parts[i] = 'labels'
+            return os.path.join(root, *parts)
+    return image_dir
+
+
+def walk_tree_pairs(root, index=None, log=None, is_cancelled=None):
+    """
+    Walk a Standard dataset tree once and yield matched image/label pairs
+
+    Every directory below root holding images is paired with the labels
+    directory given by label_dir_for. Directories named 'labels' are not
+    descended into: they are only listed as the mirror of an images
+    directory. Directories are visited in sorted order and pairs are sorted
+    by name inside a directory, so the order is stable across runs.
+
+    Args:
+        root: Dataset root
+        index: Optional DatasetIndex to serve unchanged directories from
+        log: Optional callable receiving warnings about unlabeled directories
+        is_cancelled: Optional callable checked once per directory
+
+    Yields:
+        Tuples (folder, images_dir, labels_dir, stem, image_name, image_size, label_size)
+        where folder is the images directory relative to root
+    """
+    stack = [root]
+    while stack:
+        if is_cancelled is not None and is_cancelled():
+            return
+        dir_path = stack.pop()
+
+        if index is not None:
+            subdirs = sorted(index.names(dir_path, KIND_DIR))
+        else:
+            subdirs = list_subdirs(dir_path)
+        stack.extend(os.path.join(dir_path, name) for name in reversed(subdirs) if name != 'labels')
+
+        images = list_files(dir_path, KIND_IMAGE, index)
+        if not images:
+            continue
+        labels_dir = label_dir_for(dir_path, root)
+        labels = list_files(labels_dir, KIND_LABEL, index)
+        folder = os.path.relpath(dir_path, root)
+        if not labels:
+            if log is not None:
+                log(f"Warning: No labels found for {len(images)} image(s) in {folder}, skipping...")
+            continue
+
+        images.sort()
+        for stem, image_name, image_size, label_size in pair_files(images, labels):
+            yield folder, dir_path, labels_dir, stem, image_name, image_size, label_size
@@ -0,0 +1,124 @@
+"""
+Background workers for the sampling tab
+Long-running jobs run on a QThread and report back through Qt signals
+"""
+
+import threading
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+from src.modules.sampling.analysis import analyze_dataset
+from src.modules.sampling.engine import run_sampling, SamplingError, SamplingCancelled
+
+
+def start_in_thread(worker, parent, end_signals):
+    """
+    Move a worker to a new QThread that quits when any of end_signals fires
+
+    Args:
+        worker: QObject with a run() slot
+        parent: Owner of the thread
+        end_signals: Worker signals marking the end of the job
+
+    Returns:
+        The QThread (not started yet); worker and thread delete themselves when it finishes
+    """
+    thread = QThread(parent)
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    for signal in end_signals:
+        signal.connect(thread.quit)
+    thread.finished.connect(worker.deleteLater)
+    thread.finished.connect(thread.deleteLater)
+    return thread
+
+
+class DatasetAnalysisWorker(QObject):
+    """Analyze video folders on a process pool, fanning out per folder and per chunk"""
+
+    progress = Signal(int, int, str)  # done, total, message
+    finished = Signal(object)  # merged DatasetStats
+    cancelled = Signal()
+    failed = Signal(str)
+
+    def __init__(self, input_path, folders, max_workers=None, chunk_size=500):
+        super().__init__()
+        self.input_path = input_path
+        self.folders = list(folders)
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """Request cancellation; safe to call from the GUI thread"""
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def run(self):
+        """Run the analysis; emits exactly one of finished, cancelled or failed"""
+        try:
+            stats = analyze_dataset(self.input_path, self.folders, self.max_workers, self.chunk_size,
+                                    progress=self.progress.emit, is_cancelled=self.is_cancelled)
+        except Exception as e:
+            import traceback
+            self.failed.emit(f"{e}\n{traceback.format_exc()}")
+            return
+
+        if stats is None:
+            self.cancelled.emit()
+        else:
+            self.finished.emit(stats)
+
+
+class SamplingWorker(QObject):
+    """Run a sampling job off the GUI thread with cooperative cancellation
+
+    The job is any engine entry point taking log, progress and is_cancelled
+    callbacks and returning a count (run_sampling by default, run_tiling, ...).
+    Progress is not signalled per file: the worker only records the latest
+    (done, total) and the GUI polls progress_snapshot() on a timer, so
+    hundreds of thousands of files never flood the event loop.
+    """
+
+    message = Signal(str)
+    finished = Signal(int)  # pairs (or tiles) written
+    failed = Signal(str)
+
+    def __init__(self, target=run_sampling, **job):
+        super().__init__()
+        self.target = target
+        self.job = job
+        self._progress = (0, 0)
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """Request cancellation; safe to call from the GUI thread"""
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def progress_snapshot(self):
+        """Latest (done, total); tuple assignment is atomic, so no lock is needed"""
+        return self._progress
+
+    def _on_progress(self, done, total):
+        self._progress = (done, total)
+
+    def run(self):
+        """Run the job; emits exactly one of finished or failed"""
+        try:
+            copied = self.target(**self.job, log=self.message.emit, progress=self._on_progress,
+                                 is_cancelled=self.is_cancelled)
+        except SamplingCancelled as e:
+            self.message.emit(str(e))
+            self.finished.emit(0)
+        except SamplingError as e:
+            self.failed.emit(f"Error: {e}")
+        except Exception as e:
+            import traceback
+            self.failed.emit(f"Error during sampling: {e}\n{traceback.format_exc()}")
+        else:
+            self.finished.emit(copied)
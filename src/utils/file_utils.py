@@ -1,6 +1,34 @@
 """Utility functions for file operations"""
 
 
+# Image extensions recognised by all sampling modes
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif'}
+
+
+def split_name(name):
+    """
+    Split a file name into stem and lowercase extension
+
+    Cheaper than building a Path for every entry; matches Path.stem and
+    Path.suffix.lower() for plain file names.
+
+    Args:
+        name: File name without directories
+
+    Returns:
+        Tuple (stem, extension), extension including the dot or '' if none
+    """
+    stem, dot, ext = name.rpartition('.')
+    if not dot or not stem or not ext:
+        return name, ''
+    return stem, '.' + ext.lower()
+
+
+def is_image_name(name):
+    """Return True if a file name has one of IMAGE_EXTENSIONS"""
+    return split_name(name)[1] in IMAGE_EXTENSIONS
+
+
 def format_file_size(size_bytes):
     """
     Format file size in human-readable format
@@ -0,0 +1,143 @@
+"""
+Shared-memory frame pool
+Process pool whose tasks share decoded frames through a ring of
+shared-memory slots: only a slot reference and a shape cross the process
+boundary, so megabyte-sized images are never pickled, and the fixed number
+of slots bounds the frames in memory
+"""
+
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# Slots grow in whole MiB so frames of similar sizes reuse them
+SLOT_ALIGN = 1 << 20
+
+SlotRef = namedtuple('SlotRef', ['slot', 'name', 'size'])
+
+# Blocks attached by this (worker) process, by slot id
+_attached = {}
+
+
+def _attach(ref):
+    block = _attached.get(ref.slot)
+    if block is None or block.name != ref.name:
+        if block is not None:
+            try:
+                block.close()
+            except BufferError:
+                pass  # a frame view is still alive; the mapping goes with the process
+        block = shared_memory.SharedMemory(name=ref.name)
+        _attached[ref.slot] = block
+    return block
+
+
+def slot_array(ref, shape, dtype=np.uint8):
+    """
+    View a frame stored in a slot (for task functions running in the workers)
+
+    Args:
+        ref: SlotRef passed to the task
+        shape: Frame shape
+        dtype: Frame dtype
+
+    Returns:
+        numpy array over the shared memory (writes are seen by every process)
+    """
+    dtype = np.dtype(dtype)
+    count = int(np.prod(shape))
+    if count * dtype.itemsize > ref.size:
+        raise ValueError(f"frame of shape {tuple(shape)} does not fit a {ref.size} byte slot")
+    return np.frombuffer(_attach(ref).buf, dtype=dtype, count=count).reshape(shape)
+
+
+class FramePool:
+    """Process pool with a ring of shared-memory frame slots
+
+    acquire() takes a free slot (growing it to the requested size) and
+    holds it for the caller; every submit() against the slot holds it
+    until that task finishes, and release() drops the caller's hold. The
+    slot returns to the free queue once nobody holds it, so a producer that
+    stops acquiring when none is free never has more than `slots` frames
+    in flight.
+    """
+
+    def __init__(self, max_workers, slots=None, mp_context=None):
+        self.max_workers = max_workers
+        self.executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context)
+        count = slots or 2 * max_workers
+        self._blocks = [None] * count
+        self._holds = [0] * count
+        self._free = queue.Queue()
+        for slot in range(count):
+            self._free.put(slot)
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def acquire(self, nbytes, block=True):
+        """
+        Take a free slot of at least nbytes
+
+        Args:
+            nbytes: Bytes the frame needs
+            block: Wait for a slot to be released if none is free
+
+        Returns:
+            SlotRef, or None if block is False and every slot is in use
+        """
+        try:
+            slot = self._free.get(block=block)
+        except queue.Empty:
+            return None
+        shm = self._blocks[slot]
+        if shm is None or shm.size < nbytes:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+            size = max(1, -(-nbytes // SLOT_ALIGN)) * SLOT_ALIGN
+            shm = self._blocks[slot] = shared_memory.SharedMemory(create=True, size=size)
+        self._holds[slot] = 1
+        return SlotRef(slot, shm.name, shm.size)
+
+    def submit(self, ref, fn, *args):
+        """
+        Run fn(ref, *args) on a worker; the slot stays held until it finishes
+
+        Returns:
+            concurrent.futures.Future
+        """
+        with self._lock:
+            self._holds[ref.slot] += 1
+        future = self.executor.submit(fn, ref, *args)
+        future.add_done_callback(lambda _, slot=ref.slot: self._drop(slot))
+        return future
+
+    def release(self, ref):
+        """Drop the hold taken by acquire()"""
+        self._drop(ref.slot)
+
+    def _drop(self, slot):
+        with self._lock:
+            self._holds[slot] -= 1
+            free = self._holds[slot] == 0
+        if free:
+            self._free.put(slot)
+
+    def close(self):
+        """Wait for the workers to finish and free the shared memory"""
+        self.executor.shutdown(wait=True)
+        for shm in self._blocks:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self._blocks = [None] * len(self._blocks)
@@ -0,0 +1,141 @@
+"""
+Header-only image dimension reader
+Parses JPEG, PNG, BMP and TIFF headers directly so that collecting
+resolutions costs a few small reads per file instead of a PIL decoder setup
+"""
+
+import struct
+
+from PIL import Image
+
+
+# SOFn markers carrying the frame size (C4 = DHT, C8 = JPG, CC = DAC are not frames)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+                    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# Markers without a length field
+JPEG_STANDALONE_MARKERS = {0x01} | set(range(0xD0, 0xDA))
+
+TIFF_TAG_WIDTH = 256
+TIFF_TAG_HEIGHT = 257
+
+HEADER_READ_SIZE = 512
+
+
+def _jpeg_size(f, head):
+    """Walk JPEG segments from the start of the file until the first SOFn marker"""
+    buffer = {'data': head, 'start': 0}
+
+    def read_at(offset, length):
+        # Serve from the current buffer, refilling it only when a segment jump leaves it
+        data, start = buffer['data'], buffer['start']
+        if offset < start or offset + length > start + len(data):
+            f.seek(offset)
+            data = f.read(max(length, HEADER_READ_SIZE))
+            buffer['data'], buffer['start'] = data, offset
+            start = offset
+        return data[offset - start:offset - start + length]
+
+    pos = 2
+    while True:
+        segment = read_at(pos, 9)
+        if len(segment) < 4 or segment[0] != 0xFF:
+            return None
+
+        marker = segment[1]
+        if marker == 0xFF:  # Fill byte
+            pos += 1
+        elif marker in JPEG_STANDALONE_MARKERS:
+            pos += 2
+        elif marker in JPEG_SOF_MARKERS:
+            if len(segment) < 9:
+                return None
+            height, width = struct.unpack('>HH', segment[5:9])
+            return (width, height) if width and height else None
+        elif marker == 0xDA:  # Start of scan before any frame header
+            return None
+        else:
+            pos += 2 + struct.unpack('>H', segment[2:4])[0]
+
+
+def _tiff_size(f, head):
+    """Read width and height from the first IFD of a classic (non-Big) TIFF"""
+    endian = '<' if head[:2] == b'II' else '>'
+    ifd_offset = struct.unpack(endian + 'I', head[4:8])[0]
+
+    f.seek(ifd_offset)
+    count_bytes = f.read(2)
+    if len(count_bytes) < 2:
+        return None
+    entry_count = struct.unpack(endian + 'H', count_bytes)[0]
+    entries = f.read(entry_count * 12)
+
+    width = height = None
+    for i in range(0, len(entries) - 11, 12):
+        tag, field_type = struct.unpack(endian + 'HH', entries[i:i + 4])
+        if tag not in (TIFF_TAG_WIDTH, TIFF_TAG_HEIGHT):
+            continue
+        if field_type == 3:  # SHORT
+            value = struct.unpack(endian + 'H', entries[i + 8:i + 10])[0]
+        elif field_type == 4:  # LONG
+            value = struct.unpack(endian + 'I', entries[i + 8:i + 12])[0]
+        else:
+            return None
+        if tag == TIFF_TAG_WIDTH:
+            width = value
+        else:
+            height = value
+        if width and height:
+            return width, height
+    return None
+
+
+def _header_size(f):
+    head = f.read(HEADER_READ_SIZE)
+
+    if head[:8] == b'\x89PNG\r\n\x1a\n' and head[12:16] == b'IHDR':
+        return struct.unpack('>II', head[16:24])
+
+    if head[:2] == b'\xff\xd8':
+        return _jpeg_size(f, head)
+
+    if head[:2] == b'BM' and len(head) >= 26:
+        dib_size = struct.unpack('<I', head[14:18])[0]
+        if dib_size == 12:  # BITMAPCOREHEADER
+            return struct.unpack('<HH', head[18:22])
+        width, height = struct.unpack('<ii', head[18:26])
+        return width, abs(height)  # Negative height means top-down rows
+
+    if head[:4] in (b'II*\x00', b'MM\x00*'):
+        return _tiff_size(f, head)
+
+    return None
+
+
+def read_image_size(image_path):
+    """
+    Read image dimensions from the file header
+
+    Falls back to PIL (which also only parses the header) for formats or
+    variants the fast path does not understand.
+
+    Args:
+        image_path: Path of the image file
+
+    Returns:
+        Tuple (width, height)
+
+    Raises:
+        OSError: If the file cannot be opened or identified
+    """
+    with open(image_path, 'rb') as f:
+        try:
+            size = _header_size(f)
+        except (struct.error, IndexError, ValueError):
+            size = None
+
+    if size is not None:
+        return size
+
+    with Image.open(image_path) as img:
+        return img.width, img.height
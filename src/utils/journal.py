@@ -0,0 +1,216 @@
+"""
+Job journal
+Keeps a manifest and an append-only journal of finished tasks in a job's
+output folder, so an interrupted job restarted with the same task list skips
+the work it already did
+"""
+
+import hashlib
+import json
+import os
+import time
+
+
+MANIFEST_FILE = '.sampling_job.json'
+JOURNAL_FILE = '.sampling_journal.tsv'  # per task: "output<TAB>size<TAB>mtime_ns" for each file
+JOURNAL_VERSION = 1
+
+# Journal lines buffered before a flush; a crash loses at most these (they are redone)
+FLUSH_EVERY = 256
+
+
+def job_fingerprint(mode, tasks):
+    """
+    Identify a job by its output mode and task list
+
+    Args:
+        mode: Output mode of the job
+        tasks: Iterable of lists of (source path, output path)
+
+    Returns:
+        Hex digest, equal for jobs placing the same sources at the same outputs
+    """
+    digest = hashlib.sha1(mode.encode('utf-8'))
+    for task in tasks:
+        for src, dst in task:
+            digest.update(f"\n{src}\t{dst}".encode('utf-8', 'surrogateescape'))
+    return digest.hexdigest()
+
+
+def journal_files(output_path):
+    """Return the paths of the manifest and journal of output_path"""
+    return os.path.join(output_path, MANIFEST_FILE), os.path.join(output_path, JOURNAL_FILE)
+
+
+def read_manifest(output_path):
+    """Return the manifest dict of the last job in output_path, or None"""
+    try:
+        with open(journal_files(output_path)[0], 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('version') == JOURNAL_VERSION else None
+
+
+def journal_progress(output_path):
+    """
+    Summarize the last job journaled in output_path
+
+    Returns:
+        Tuple (journaled tasks, total tasks, completed) or None if there is no journal
+    """
+    manifest = read_manifest(output_path)
+    if manifest is None:
+        return None
+    try:
+        with open(journal_files(output_path)[1], 'rb') as f:
+            done = sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 20), b''))
+    except OSError:
+        done = 0
+    return min(done, manifest['tasks']), manifest['tasks'], manifest.get('completed', False)
+
+
+def remove_journal(output_path):
+    """Delete the manifest and journal of output_path (e.g. with the files they describe)"""
+    for path in journal_files(output_path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class JobJournal:
+    """Manifest and append-only journal of one job
+
+    load() reads the journal left by an earlier run when the manifest
+    fingerprint matches; is_done() then trusts a journaled task only while
+    its output files still have the recorded size and mtime. start() writes
+    a fresh manifest for a different job, and record() appends finished tasks.
+    """
+
+    def __init__(self, output_path, fingerprint, mode, total):
+        self.output_path = output_path
+        self.fingerprint = fingerprint
+        self.mode = mode
+        self.total = total
+        self.resumed = False
+        self.entries = {}
+        self._prefix = os.path.join(output_path, '')
+        self._file = None
+        self._pending = 0
+        self.unrecorded = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def load(self):
+        """
+        Read the entries of an earlier run of the same job
+
+        Returns:
+            True if the output folder holds a journal of this job
+        """
+        manifest = read_manifest(self.output_path)
+        if manifest is None or manifest.get('fingerprint') != self.fingerprint:
+            return False
+        try:
+            with open(journal_files(self.output_path)[1], 'r', encoding='utf-8',
+                      errors='surrogateescape') as f:
+                for line in f:
+                    fields = line.rstrip('\n').split('\t')
+                    # Skip a line cut short by a crash (its task is simply redone)
+                    try:
+                        self.entries[fields[0]] = [(fields[i], int(fields[i + 1]), int(fields[i + 2]))
+                                                   for i in range(0, len(fields), 3)]
+                    except (IndexError, ValueError):
+                        continue
+        except OSError:
+            pass
+        self.resumed = True
+        return True
+
+    def _relative(self, path):
+        # Outputs normally sit below the output folder: slice instead of os.path.relpath
+        if path.startswith(self._prefix):
+            return path[len(self._prefix):]
+        return os.path.relpath(path, self.output_path)
+
+    def is_done(self, task):
+        """True if task was journaled and its outputs are unchanged since"""
+        entry = self.entries.get(self._relative(task[0][1]))
+        if entry is None or len(entry) != len(task):
+            return False
+        return self._unchanged(entry)
+
+    def done_outputs(self):
+        """First output (relative to the output folder) of every journaled task still unchanged"""
+        return [rel for rel, entry in self.entries.items() if self._unchanged(entry)]
+
+    def _unchanged(self, entry):
+        try:
+            return all(_stat_key(os.path.join(self.output_path, rel)) == (size, mtime)
+                       for rel, size, mtime in entry)
+        except OSError:
+            return False
+
+    def start(self):
+        """Open the journal for appending, starting a new one unless load() matched"""
+        if not self.resumed:
+            remove_journal(self.output_path)
+        self._write_manifest(completed=False)
+        self._file = open(journal_files(self.output_path)[1], 'a', encoding='utf-8',
+                          errors='surrogateescape')
+
+    def _write_manifest(self, completed):
+        manifest_path = journal_files(self.output_path)[0]
+        with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'version': JOURNAL_VERSION, 'fingerprint': self.fingerprint,
+                       'mode': self.mode, 'tasks': self.total, 'completed': completed,
+                       'updated': int(time.time())}, f, indent=2)
+        os.replace(manifest_path + '.tmp', manifest_path)
+
+    def record(self, task, flush=False):
+        """
+        Append a finished task with the size and mtime of its outputs
+
+        A task whose outputs are gone (e.g. removed since it finished) is
+        left out, so a resumed run places it again.
+
+        Args:
+            task: List of (source, output path)
+            flush: Write the entry out now instead of batching FLUSH_EVERY of them
+
+        Returns:
+            True if the task was journaled
+        """
+        fields = []
+        for _, dst in task:
+            try:
+                size, mtime = _stat_key(dst)
+            except OSError:
+                self.unrecorded += 1
+                return False
+            fields.append(f"{self._relative(dst)}\t{size}\t{mtime}")
+        self._file.write('\t'.join(fields) + '\n')
+        self._pending += 1
+        if flush or self._pending >= FLUSH_EVERY:
+            self._file.flush()
+            self._pending = 0
+        return True
+
+    def close(self, completed=False):
+        """Flush the journal; completed marks the job finished unless a task went unrecorded"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        if completed and not self.unrecorded:
+            self._write_manifest(completed=True)
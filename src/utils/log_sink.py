@@ -0,0 +1,120 @@
+"""
+Thread-safe batched log sink
+Queues log lines from any thread, keeps a bounded ring buffer of recent lines
+and optionally spills the full log to a rotating file
+"""
+
+import logging
+import os
+import sys
+import threading
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+
+DEFAULT_MAX_LINES = 5000
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 3
+
+
+def default_log_dir():
+    """
+    Return the per-user folder used for log files
+
+    Returns:
+        Path of the log folder (not created)
+    """
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ai_data_processing_tool', 'logs')
+
+
+def open_log_file(path, max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT):
+    """
+    Open a rotating log file
+
+    Args:
+        path: Log file path; its folder is created if needed
+        max_bytes: Size at which the file is rotated
+        backup_count: Number of rotated files kept
+
+    Returns:
+        RotatingFileHandler, or None if the file cannot be opened
+    """
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # delay: the file is only created once something is logged
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count,
+                                      encoding='utf-8', delay=True)
+    except OSError:
+        return None
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    return handler
+
+
+class LogSink:
+    """Collect log lines from any thread and hand them out in batches
+
+    write() only takes a lock and appends to a deque, so workers can log
+    freely; a consumer (e.g. a GUI timer) calls drain() to fetch everything
+    queued since the last call. Both the pending queue and the history are
+    bounded by max_lines: if the consumer falls behind, the oldest pending
+    lines are dropped and reported as a single summary line.
+    """
+
+    def __init__(self, max_lines=DEFAULT_MAX_LINES, log_file=None):
+        self.max_lines = max_lines
+        self.history = deque(maxlen=max_lines)
+        self._pending = deque()
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._file_handler = open_log_file(log_file) if log_file else None
+
+    def write(self, message):
+        """Queue one message (may contain several lines); safe from any thread"""
+        message = str(message)
+        with self._lock:
+            if len(self._pending) >= self.max_lines:
+                self._pending.popleft()
+                self._dropped += 1
+            self._pending.append(message)
+
+    def drain(self):
+        """
+        Take every message queued since the last drain
+
+        Also records them in the history and, if configured, the log file.
+
+        Returns:
+            List of messages (empty if nothing is pending)
+        """
+        with self._lock:
+            if not self._pending:
+                return []
+            batch = list(self._pending)
+            self._pending.clear()
+            dropped, self._dropped = self._dropped, 0
+
+        if dropped:
+            batch.insert(0, f"... {dropped} log line(s) skipped ...")
+        self.history.extend(batch)
+
+        if self._file_handler is not None:
+            for message in batch:
+                self._file_handler.emit(logging.makeLogRecord({'msg': message, 'levelno': logging.INFO,
+                                                               'levelname': 'INFO'}))
+            self._file_handler.flush()
+        return batch
+
+    def lines(self):
+        """Return the most recent drained messages (up to max_lines)"""
+        return list(self.history)
+
+    def close(self):
+        """Flush pending messages to the log file and close it"""
+        self.drain()
+        if self._file_handler is not None:
+            self._file_handler.close()
+            self._file_handler = None
@@ -0,0 +1,53 @@
+"""
+Log view widget shared by all tabs
+A read-only text view fed by a LogSink and refreshed in batches on a timer
+"""
+
+import os
+
+from PySide6.QtWidgets import QPlainTextEdit
+from PySide6.QtCore import QTimer
+
+from src.utils.log_sink import LogSink, DEFAULT_MAX_LINES, default_log_dir
+
+
+FLUSH_INTERVAL_MS = 100
+
+
+class LogView(QPlainTextEdit):
+    """Drop-in replacement for a read-only QTextEdit log
+
+    append() may be called from any thread and only queues the message;
+    a timer moves queued messages into the document with one insert per
+    tick, and the document is capped at max_lines blocks.
+    """
+
+    def __init__(self, name=None, max_lines=DEFAULT_MAX_LINES, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(max_lines)
+
+        log_file = os.path.join(default_log_dir(), f"{name}.log") if name else None
+        self.sink = LogSink(max_lines=max_lines, log_file=log_file)
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(FLUSH_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self.flush)
+        self.flush_timer.start()
+
+        self.destroyed.connect(self.sink.close)
+
+    def append(self, message):
+        """Queue a message; it shows up on the next flush"""
+        self.sink.write(message)
+
+    def flush(self):
+        """Move queued messages into the view (GUI thread only)"""
+        batch = self.sink.drain()
+        if batch:
+            self.appendPlainText("\n".join(batch))
+
+    def toPlainText(self):
+        # Include messages still waiting for the timer
+        self.flush()
+        return super().toPlainText()
@@ -0,0 +1,249 @@
+"""
+Parallel file materialization
+Places files into an output folder by copy, hardlink, reflink or symlink on a
+bounded thread pool, falling back automatically when a mode is unsupported
+"""
+
+import errno
+import os
+import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+MODE_COPY = 'copy'
+MODE_HARDLINK = 'hardlink'
+MODE_REFLINK = 'reflink'
+MODE_SYMLINK = 'symlink'
+MODES = (MODE_COPY, MODE_HARDLINK, MODE_REFLINK, MODE_SYMLINK)
+
+# Modes tried, in order, for each requested mode
+FALLBACKS = {
+    MODE_COPY: (MODE_COPY,),
+    MODE_HARDLINK: (MODE_HARDLINK, MODE_REFLINK, MODE_COPY),
+    MODE_REFLINK: (MODE_REFLINK, MODE_COPY),
+    MODE_SYMLINK: (MODE_SYMLINK, MODE_COPY),
+}
+
+# Errors meaning "this mode cannot work here": the mode is dropped for the rest of the job
+UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.ENOTTY, errno.EOPNOTSUPP,
+                      getattr(errno, 'ENOTSUP', errno.EOPNOTSUPP)}
+
+# Errors of one file (not owning the source under protected hardlinks, too many links to
+# it): that file falls back to the next mode, the others keep the requested one
+FILE_FALLBACK_ERRNOS = {errno.EPERM, errno.EACCES, errno.EMLINK}
+
+FICLONE = 0x40049409  # Linux ioctl: share all extents of a file (btrfs, XFS, ...)
+
+DEFAULT_MAX_WORKERS = 16
+
+
+def _remove_existing(dst):
+    if os.path.lexists(dst):
+        os.remove(dst)
+
+
+def copy_file(src, dst):
+    """
+    Copy src into dst through a temporary file in the same folder
+
+    dst is replaced, never opened for writing: a hardlink or symlink an
+    earlier run left there would otherwise carry the copy into its source.
+    """
+    folder, name = os.path.split(dst)
+    tmp = os.path.join(folder, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        shutil.copy2(src, tmp)
+        os.replace(tmp, dst)
+    except OSError:
+        if os.path.lexists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def hardlink_file(src, dst):
+    _remove_existing(dst)
+    os.link(src, dst)
+
+
+def symlink_file(src, dst):
+    _remove_existing(dst)
+    os.symlink(os.path.abspath(src), dst)
+
+
+def reflink_file(src, dst):
+    """
+    Clone src into dst without copying bytes through user space
+
+    Uses the FICLONE ioctl where the filesystem supports shared extents, and
+    otherwise os.copy_file_range (in-kernel copy, server-side on NFS 4.2).
+
+    Raises:
+        OSError: If neither is supported for this pair of files
+    """
+    if fcntl is None and not hasattr(os, 'copy_file_range'):
+        raise OSError(errno.EOPNOTSUPP, "reflink is not supported on this platform")
+
+    _remove_existing(dst)
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            cloned = False
+            if fcntl is not None and sys.platform.startswith('linux'):
+                try:
+                    fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+                    cloned = True
+                except OSError as e:
+                    if e.errno not in UNSUPPORTED_ERRNOS:
+                        raise
+
+            if not cloned:
+                if not hasattr(os, 'copy_file_range'):
+                    raise OSError(errno.EOPNOTSUPP, "reflink is not supported on this filesystem")
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+        shutil.copystat(src, dst)
+    except OSError:
+        if os.path.lexists(dst):
+            os.remove(dst)
+        raise
+
+
+PLACERS = {
+    MODE_COPY: copy_file,
+    MODE_HARDLINK: hardlink_file,
+    MODE_REFLINK: reflink_file,
+    MODE_SYMLINK: symlink_file,
+}
+
+
+class Materializer:
+    """Place files with a requested mode, remembering which modes turned out unsupported
+
+    Hardlinks and symlinks share data with the source: editing an output file
+    in place also edits the source dataset.
+    """
+
+    def __init__(self, mode=MODE_COPY, max_workers=None, log=None):
+        if mode not in FALLBACKS:
+            raise ValueError(f"Unknown materialization mode: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers or DEFAULT_MAX_WORKERS
+        self.log = log
+        self.counts = {m: 0 for m in MODES}
+        self._unsupported = set()
+        self._warnings = []
+        self._lock = threading.Lock()
+
+    def place(self, src, dst):
+        """
+        Place one file, trying the fallback chain of the configured mode
+
+        Returns:
+            Mode actually used
+        """
+        for mode in FALLBACKS[self.mode]:
+            if mode in self._unsupported:
+                continue
+            if mode == MODE_COPY:
+                copy_file(src, dst)
+                break
+            try:
+                PLACERS[mode](src, dst)
+                break
+            except OSError as e:
+                if e.errno in FILE_FALLBACK_ERRNOS:
+                    continue
+                if e.errno not in UNSUPPORTED_ERRNOS and not getattr(e, 'winerror', None):
+                    raise
+                self._disable(mode, e)
+
+        with self._lock:
+            self.counts[mode] += 1
+        return mode
+
+    def _disable(self, mode, error):
+        with self._lock:
+            if mode in self._unsupported:
+                return
+            self._unsupported.add(mode)
+            self._warnings.append(
+                f"Warning: {mode} not supported here ({error.strerror or error}), falling back")
+
+    def _flush_warnings(self):
+        """Log fallback warnings from the calling thread (pool threads must not touch the UI)"""
+        with self._lock:
+            warnings, self._warnings = self._warnings, []
+        if self.log is not None:
+            for warning in warnings:
+                self.log(warning)
+
+    def run(self, tasks, progress=None, is_cancelled=None, on_done=None):
+        """
+        Run tasks on a bounded thread pool
+
+        Args:
+            tasks: Sequence of lists of (src, dst); each task counts as one progress step.
+                Tasks run concurrently, so no two files may share a destination
+            progress: Optional callable(done, total), called from the calling thread
+            is_cancelled: Optional callable returning True to stop submitting work
+            on_done: Optional callable(task) called from the calling thread once all
+                files of a task are placed (e.g. to journal it)
+
+        Returns:
+            Number of tasks completed
+
+        Raises:
+            ValueError: If several files have the same destination
+        """
+        destinations = [dst for task in tasks for _, dst in task]
+        if len(set(destinations)) != len(destinations):
+            raise ValueError("Several files would be placed at the same destination")
+        total = len(tasks)
+        done = 0
+        max_in_flight = self.max_workers * 4
+
+        def run_task(task):
+            for src, dst in task:
+                self.place(src, dst)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight = {}
+            task_iter = iter(tasks)
+            exhausted = False
+
+            while in_flight or not exhausted:
+                # Keep a bounded number of tasks queued so memory stays flat
+                while not exhausted and len(in_flight) < max_in_flight:
+                    if is_cancelled is not None and is_cancelled():
+                        exhausted = True
+                        break
+                    task = next(task_iter, None)
+                    if task is None:
+                        exhausted = True
+                        break
+                    in_flight[executor.submit(run_task, task)] = task
+
+                if not in_flight:
+                    break
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = in_flight.pop(future)
+                    future.result()
+                    done += 1
+                    if on_done is not None:
+                        on_done(task)
+                self._flush_warnings()
+                if progress is not None:
+                    progress(done, total)
+
+        return done
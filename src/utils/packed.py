@@ -0,0 +1,274 @@
+"""
+Packed dataset output
+Stores a dataset as one blob of encoded image bytes, one NumPy array of all
+YOLO boxes and a fixed-width offset index, so a training loader can memory-map
+the files once and fetch sample i with two slices (no per-file open or stat)
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+
+from src.utils.shards import read_ahead, WRITE_BUFFER_SIZE
+
+
+MODE_PACKED = 'packed'
+
+FORMAT_NAME = 'yolo-packed'
+FORMAT_VERSION = 1
+
+IMAGES_FILE = 'images.bin'  # encoded image bytes, back to back
+INDEX_FILE = 'index.npy'    # INDEX_DTYPE record per sample
+BOXES_FILE = 'boxes.npy'    # float32 (n_boxes, 5) rows of class, cx, cy, w, h
+KEYS_FILE = 'keys.txt'      # sample key (file stem) per line
+SOURCES_FILE = 'sources.tsv'  # "image path<TAB>label path" per line, for verification
+META_FILE = 'meta.json'
+PACKED_FILES = (IMAGES_FILE, INDEX_FILE, BOXES_FILE, KEYS_FILE, SOURCES_FILE, META_FILE)
+
+# Files are written under this suffix and renamed once complete
+PARTIAL_SUFFIX = '.partial'
+
+INDEX_DTYPE = np.dtype([('offset', '<u8'), ('length', '<u8'),
+                        ('box_start', '<u8'), ('box_count', '<u4')])
+
+
+class PackedWriter:
+    """Append samples to a packed dataset
+
+    Image bytes are streamed to the blob as they arrive; the index, boxes and
+    keys are kept in memory (a few dozen bytes per sample) and written by
+    close(). Every file is first written with PARTIAL_SUFFIX and only renamed
+    by close(), so a previous dataset in the folder stays intact until the new
+    one is complete; discard() (or leaving the with block on an exception)
+    drops the partial files instead.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.samples = 0
+        self.bytes = 0
+        self._records = []
+        self._boxes = []
+        self.box_count = 0
+        self._keys = []
+        self._sources = []
+        self.committed = False
+        self._file = open(self._partial(IMAGES_FILE), 'wb', buffering=WRITE_BUFFER_SIZE)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def _partial(self, name):
+        return os.path.join(self.output_dir, name + PARTIAL_SUFFIX)
+
+    def add(self, key, image_bytes, boxes, sources=('', '')):
+        """
+        Write one sample
+
+        Args:
+            key: Sample key (one line, no tabs)
+            image_bytes: Encoded image file contents, stored as they are
+            boxes: float32 array of shape (n, 5)
+            sources: (image path, label path) recorded for verification
+        """
+        self._records.append((self.bytes, len(image_bytes), self.box_count, len(boxes)))
+        self._file.write(image_bytes)
+        self.bytes += len(image_bytes)
+        if len(boxes):
+            self._boxes.append(boxes)
+            self.box_count += len(boxes)
+        self._keys.append(key)
+        self._sources.append(sources)
+        self.samples += 1
+
+    def discard(self):
+        """Stop writing and remove the partial files"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        for name in PACKED_FILES:
+            try:
+                os.remove(self._partial(name))
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        """Write the index, boxes and metadata and move the dataset into place"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+
+        index = np.array(self._records, dtype=INDEX_DTYPE).reshape(-1)
+        boxes = (np.concatenate(self._boxes) if self._boxes else np.empty((0, 5))).astype(np.float32)
+        for name, array in ((INDEX_FILE, index), (BOXES_FILE, boxes)):
+            with open(self._partial(name), 'wb') as f:
+                np.save(f, array)
+        with open(self._partial(KEYS_FILE), 'w', encoding='utf-8') as f:
+            f.writelines(key + '\n' for key in self._keys)
+        with open(self._partial(SOURCES_FILE), 'w', encoding='utf-8') as f:
+            f.writelines(f"{image}\t{label}\n" for image, label in self._sources)
+        with open(self._partial(META_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'format': FORMAT_NAME, 'version': FORMAT_VERSION,
+                       'samples': self.samples, 'boxes': self.box_count,
+                       'image_bytes': self.bytes, 'created': int(time.time())}, f, indent=2)
+
+        for name in PACKED_FILES:
+            os.replace(self._partial(name), os.path.join(self.output_dir, name))
+        self.committed = True
+
+
+def _read_sample(key, image_path, label_path, parse_labels):
+    with open(image_path, 'rb') as f:
+        image_bytes = f.read()
+    with open(label_path, 'r', encoding='utf-8') as f:
+        boxes = parse_labels(f.read())
+    return key, image_bytes, boxes, (image_path, label_path)
+
+
+def write_packed(samples, output_dir, parse_labels, max_workers=None, progress=None,
+                 is_cancelled=None):
+    """
+    Pack samples into output_dir, replacing a packed dataset already there
+
+    Source files are read and labels parsed ahead on a thread pool; one
+    writer appends them in order. A cancelled job discards what it packed
+    (writer.committed is False) and leaves a previous dataset untouched.
+
+    Args:
+        samples: Sequence of (key, image_path, label_path)
+        output_dir: Existing folder receiving the packed files
+        parse_labels: Callable(label text) returning a float32 (n, 5) array
+        max_workers: Threads reading source files
+        progress: Optional callable(done, total)
+        is_cancelled: Optional callable returning True to stop after the current sample
+
+    Returns:
+        PackedWriter with the sample and byte counts and whether it was committed
+    """
+    total = len(samples)
+    items = ((key, image, label, parse_labels) for key, image, label in samples)
+    with PackedWriter(output_dir) as writer:
+        for key, image_bytes, boxes, sources in read_ahead(_read_sample, items, max_workers,
+                                                             is_cancelled):
+            writer.add(key, image_bytes, boxes, sources)
+            if progress is not None:
+                progress(writer.samples, total)
+        if writer.samples < total:
+            writer.discard()
+    return writer
+
+
+class PackedDataset:
+    """Read-only view of a packed dataset
+
+    Opening maps the files without reading them; ds[i] returns the encoded
+    image as a uint8 array viewing the mapped blob (cv2.imdecode takes it
+    directly, bytes(...) copies it) and the sample's (n, 5) boxes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('format') != FORMAT_NAME or self.meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Not a {FORMAT_NAME} v{FORMAT_VERSION} dataset: {path}")
+        self.index = np.load(os.path.join(path, INDEX_FILE), mmap_mode='r')
+        self.boxes = np.load(os.path.join(path, BOXES_FILE), mmap_mode='r')
+        images_path = os.path.join(path, IMAGES_FILE)
+        # np.memmap cannot map an empty file
+        if os.path.getsize(images_path):
+            self.images = np.memmap(images_path, dtype=np.uint8, mode='r')
+        else:
+            self.images = np.empty(0, dtype=np.uint8)
+        self._keys = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, i):
+        return self.image(i), self.labels(i)
+
+    def image(self, i):
+        """Encoded image bytes of sample i (zero-copy uint8 view)"""
+        offset, length, _, _ = self.index[i].tolist()
+        return self.images[offset:offset + length]
+
+    def labels(self, i):
+        """float32 (n, 5) boxes of sample i (view of the mapped array)"""
+        _, _, start, count = self.index[i].tolist()
+        return self.boxes[start:start + count]
+
+    @property
+    def keys(self):
+        """Sample keys, read on first use"""
+        if self._keys is None:
+            with open(os.path.join(self.path, KEYS_FILE), 'r', encoding='utf-8') as f:
+                self._keys = f.read().splitlines()
+        return self._keys
+
+    def sources(self):
+        """List of (image path, label path) the samples were packed from"""
+        with open(os.path.join(self.path, SOURCES_FILE), 'r', encoding='utf-8') as f:
+            return [tuple(line.split('\t')) for line in f.read().splitlines()]
+
+    def close(self):
+        # Dropping the arrays unmaps the files (needed before deleting them on Windows)
+        self.index = self.boxes = self.images = None
+
+
+def verify_packed(path, parse_labels, count=16, seed=0):
+    """
+    Re-read random samples of a packed dataset and compare them with their sources
+
+    Args:
+        path: Packed dataset folder
+        parse_labels: Callable(label text) returning a float32 (n, 5) array
+        count: Number of samples checked (all if larger than the dataset)
+        seed: Seed choosing the samples
+
+    Returns:
+        Tuple (checked, problems) with problems a list of messages
+    """
+    problems = []
+    with PackedDataset(path) as dataset:
+        n = len(dataset)
+        if dataset.meta.get('samples') != n:
+            problems.append(f"meta.json lists {dataset.meta.get('samples')} samples, index has {n}")
+        ends = dataset.index['offset'].astype(np.int64) + dataset.index['length']
+        if n and int(ends.max()) > len(dataset.images):
+            problems.append("Index points past the end of the image blob")
+            return 0, problems
+
+        sources = dataset.sources()
+        rows = np.random.default_rng(seed).permutation(n)[:count]
+        for i in sorted(rows.tolist()):
+            image, boxes = dataset[i]
+            image_path, label_path = sources[i]
+            try:
+                with open(image_path, 'rb') as f:
+                    if f.read() != image.tobytes():
+                        problems.append(f"Sample {i} ({dataset.keys[i]}): image bytes differ "
+                                        f"from {image_path}")
+                with open(label_path, 'r', encoding='utf-8') as f:
+                    if not np.array_equal(parse_labels(f.read()), boxes):
+                        problems.append(f"Sample {i} ({dataset.keys[i]}): boxes differ "
+                                        f"from {label_path}")
+            except OSError as e:
+                problems.append(f"Sample {i} ({dataset.keys[i]}): cannot read source: {e}")
+    return len(rows), problems
@@ -0,0 +1,244 @@
+"""
+Sharded tar output
+Streams samples into size-bounded tar shards (WebDataset layout: members
+<key>.jpg, <key>.txt, ...) with one index file per shard, reading source
+files ahead on a thread pool while a single writer appends sequentially
+"""
+
+import io
+import os
+import re
+import tarfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+MODE_TAR = 'tar'
+
+DEFAULT_SHARD_SIZE = 1 << 30  # bytes per shard, tar headers included
+WRITE_BUFFER_SIZE = 8 << 20
+TAR_FORMAT = tarfile.PAX_FORMAT
+TAR_ENCODING = tarfile.ENCODING
+TAR_ERRORS = 'surrogateescape'
+DEFAULT_MAX_WORKERS = 8  # concurrent source reads
+
+SHARD_NAME = 'shard-{:06d}.tar'
+INDEX_SUFFIX = '.idx'  # shard-000000.tar.idx: "member<TAB>data offset<TAB>size" per line
+_SHARD_RE = re.compile(r'shard-(\d+)\.tar$')
+
+
+def next_shard_number(output_dir):
+    """Return the number following the highest shard already in output_dir (0 if none)"""
+    numbers = [-1]
+    try:
+        with os.scandir(output_dir) as it:
+            for entry in it:
+                match = _SHARD_RE.match(entry.name)
+                if match:
+                    numbers.append(int(match.group(1)))
+    except OSError:
+        pass
+    return max(numbers) + 1
+
+
+def indexed_keys(output_dir, names=None):
+    """
+    Read the sample keys of the shards in output_dir
+
+    Args:
+        output_dir: Shard folder
+        names: Shard names to read (default: every shard in output_dir)
+
+    Returns:
+        Tuple (keys of shards that have an index file, shard names without one); a
+        shard lacks its index only if the writer was killed before closing it
+    """
+    keys = set()
+    unindexed = []
+    if names is None:
+        try:
+            with os.scandir(output_dir) as it:
+                names = [entry.name for entry in it if _SHARD_RE.match(entry.name)]
+        except OSError:
+            names = []
+    for name in names:
+        try:
+            with open(os.path.join(output_dir, name + INDEX_SUFFIX), 'r', encoding='utf-8') as f:
+                keys.update(line.split('\t', 1)[0].split('.', 1)[0] for line in f)
+        except FileNotFoundError:
+            unindexed.append(name)
+    return keys, unindexed
+
+
+def _padded(size, block=tarfile.BLOCKSIZE):
+    return (size + block - 1) // block * block
+
+
+class ShardWriter:
+    """Append samples to tar shards, starting a new shard when one would exceed shard_size
+
+    A sample is never split across shards, so a single sample larger than
+    shard_size gets a shard of its own. Member bytes are written as they
+    are (no decoding). Each shard gets an index file listing the data offset
+    and size of every member, so a member can be read with one seek;
+    on_shard(shard path, index path) is called once both are complete.
+    """
+
+    def __init__(self, output_dir, shard_size=DEFAULT_SHARD_SIZE, start=0, on_shard=None):
+        self.output_dir = output_dir
+        self.on_shard = on_shard
+        self.shard_size = shard_size
+        self.number = start - 1
+        self.shards = []
+        self.samples = 0
+        self.bytes = 0
+        self.mtime = int(time.time())
+        self._file = None
+        self._tar = None
+        self._index = None
+        self._count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open_next(self):
+        self._close_current()
+        self.number += 1
+        path = os.path.join(self.output_dir, SHARD_NAME.format(self.number))
+        self._file = open(path, 'wb', buffering=WRITE_BUFFER_SIZE)
+        self._tar = tarfile.open(fileobj=self._file, mode='w', format=TAR_FORMAT,
+                                 encoding=TAR_ENCODING, errors=TAR_ERRORS)
+        self._tar.copybufsize = WRITE_BUFFER_SIZE
+        self._index = []
+        self._count = 0
+        self.shards.append(path)
+
+    def _close_current(self):
+        if self._tar is None:
+            return
+        self._tar.close()
+        self.bytes += self._file.tell()
+        self._file.close()
+        # A killed writer must not leave a truncated index that would be trusted
+        index_path = self.shards[-1] + INDEX_SUFFIX
+        with open(index_path + '.tmp', 'w', encoding='utf-8') as f:
+            f.writelines(f"{name}\t{offset}\t{size}\n" for name, offset, size in self._index)
+        os.replace(index_path + '.tmp', index_path)
+        self._tar = self._file = self._index = None
+        if self.on_shard is not None:
+            self.on_shard(self.shards[-1], index_path)
+
+    def add(self, key, members):
+        """
+        Write one sample
+
+        Args:
+            key: Sample key (must not contain '.', WebDataset splits names at the first dot)
+            members: List of (suffix, data) such as ('.jpg', image_bytes)
+        """
+        infos = []
+        for suffix, data in members:
+            info = tarfile.TarInfo(key + suffix)
+            info.size = len(data)
+            info.mtime = self.mtime
+            info.mode = 0o644
+            # Header blocks as written, including a PAX extended header for long or non-ASCII names
+            header = len(info.tobuf(TAR_FORMAT, TAR_ENCODING, TAR_ERRORS))
+            infos.append((info, header, data))
+
+        # Headers and data, then the end-of-archive blocks and record padding close() adds
+        needed = sum(header + _padded(info.size) for info, header, _ in infos)
+        if self._tar is None:
+            self._open_next()
+        elif self._count:
+            end = _padded(self._tar.offset + needed + 2 * tarfile.BLOCKSIZE, tarfile.RECORDSIZE)
+            if end > self.shard_size:
+                self._open_next()
+
+        for info, header, data in infos:
+            self._index.append((info.name, self._tar.offset + header, info.size))
+            self._tar.addfile(info, io.BytesIO(data))
+        self._count += 1
+        self.samples += 1
+
+    def close(self):
+        self._close_current()
+
+
+def _read_sample(key, files):
+    members = []
+    for suffix, path in files:
+        with open(path, 'rb') as f:
+            members.append((suffix, f.read()))
+    return key, members
+
+
+def read_ahead(read, items, max_workers=None, is_cancelled=None):
+    """
+    Yield read(*item) for every item, in order, reading ahead on a thread pool
+
+    Reads are latency-bound on network filesystems, so a bounded window of
+    them runs concurrently while the caller consumes results sequentially.
+
+    Args:
+        read: Callable run on the pool for each item
+        items: Iterable of argument tuples
+        max_workers: Threads reading in parallel
+        is_cancelled: Optional callable returning True to stop (pending reads are dropped)
+    """
+    workers = max_workers or DEFAULT_MAX_WORKERS
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        item_iter = iter(items)
+        exhausted = False
+        while pending or not exhausted:
+            # Keep a bounded window of reads ahead of the consumer
+            while not exhausted and len(pending) < 4 * workers:
+                item = next(item_iter, None)
+                if item is None:
+                    exhausted = True
+                    break
+                pending.append(executor.submit(read, *item))
+            if not pending:
+                break
+            if is_cancelled is not None and is_cancelled():
+                for future in pending:
+                    future.cancel()
+                break
+            yield pending.popleft().result()
+
+
+def write_shards(samples, output_dir, shard_size=DEFAULT_SHARD_SIZE, max_workers=None,
+                 progress=None, is_cancelled=None, on_shard=None):
+    """
+    Stream samples into tar shards
+
+    Source files are read ahead by a bounded thread pool (see read_ahead) and
+    appended in order by one writer.
+
+    Args:
+        samples: Sequence of (key, [(suffix, source_path), ...])
+        output_dir: Existing folder receiving the shards; numbering continues after
+            shards already in it
+        shard_size: Maximum bytes per shard
+        max_workers: Threads reading source files
+        progress: Optional callable(done, total)
+        is_cancelled: Optional callable returning True to stop after the current sample
+        on_shard: Optional callable(shard path, index path) run as each shard is closed
+
+    Returns:
+        ShardWriter with the shards written and the sample and byte counts
+    """
+    total = len(samples)
+    writer = ShardWriter(output_dir, shard_size, start=next_shard_number(output_dir),
+                         on_shard=on_shard)
+    with writer:
+        for key, members in read_ahead(_read_sample, samples, max_workers, is_cancelled):
+            writer.add(key, members)
+            if progress is not None:
+                progress(writer.samples, total)
+    return writer
@@ -0,0 +1,124 @@
+"""
+Bounded-memory streaming statistics
+Mergeable count/min/max/mean/variance plus approximate percentiles from a
+log-bucket histogram, so memory stays constant regardless of dataset size
+"""
+
+import math
+
+import numpy as np
+
+
+class StreamingStats:
+    """Streaming accumulator for non-negative values
+
+    Percentiles come from logarithmic buckets with a fixed relative error
+    (1% by default), so any value range up to 1e12 needs at most a few
+    thousand buckets. Two accumulators with the same relative error can be
+    merged, which lets each worker keep its own and combine them at the end.
+    """
+
+    def __init__(self, relative_error=0.01):
+        self.relative_error = relative_error
+        self.gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self.gamma)
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.mean = 0.0
+        self._m2 = 0.0  # Sum of squared deviations (Welford / Chan)
+        self.zero_count = 0
+        self.buckets = {}
+
+    def add(self, value):
+        """Account a single value"""
+        self.add_many([value])
+
+    def add_many(self, values):
+        """
+        Account a batch of values with vectorized updates
+
+        Args:
+            values: Iterable or array of non-negative numbers
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size == 0:
+            return
+
+        # Combine the batch moments with the running ones (Chan et al.)
+        batch_count = values.size
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        self._combine(batch_count, batch_mean, batch_m2, float(values.min()), float(values.max()))
+
+        positive = values[values > 0]
+        self.zero_count += batch_count - positive.size
+        if positive.size:
+            keys, counts = np.unique(np.ceil(np.log(positive) / self._log_gamma).astype(np.int64),
+                                     return_counts=True)
+            for key, count in zip(keys.tolist(), counts.tolist()):
+                self.buckets[key] = self.buckets.get(key, 0) + count
+
+    def _combine(self, count, mean, m2, minimum, maximum):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self._m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+
+    def merge(self, other):
+        """
+        Merge another accumulator into this one
+
+        Args:
+            other: StreamingStats with the same relative error
+
+        Returns:
+            self, to allow chaining
+        """
+        if other.count == 0:
+            return self
+        if other.relative_error != self.relative_error:
+            raise ValueError("Cannot merge StreamingStats with different relative errors")
+        self._combine(other.count, other.mean, other._m2, other.min, other.max)
+        self.zero_count += other.zero_count
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        return self
+
+    @property
+    def variance(self):
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def quantile(self, q):
+        """
+        Approximate quantile within the configured relative error
+
+        Args:
+            q: Quantile in [0, 1]
+
+        Returns:
+            Approximate value, or 0 if nothing was added
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                # Bucket key covers (gamma^(key-1), gamma^key]
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def percentiles(self, qs=(0.5, 0.95, 0.99)):
+        return [self.quantile(q) for q in qs]